@@ -1,14 +1,19 @@
 """Public API for O3 data model parsing and SQL generation workflows."""
 from api.data_model import O3DataModel
+from api.model_cache import clear_model_cache, load_cached_model
 from api.workflow import (
+    ALL_DDL_VARIANTS,
     create_individual_standard_value_tables,
+    create_key_element_table_variants,
     create_key_element_tables,
     create_model,
     create_standard_value_lookup_table,
     create_tables,
     foreign_key_constraints,
     get_table_names_from_relationships,
+    iter_ddl,
     validate_names_in_relationships,
+    write_sql_stream,
     write_sql_to_text,
 )
 
@@ -17,10 +22,16 @@ __all__ = [
     "create_model",
     "create_tables",
     "create_key_element_tables",
+    "create_key_element_table_variants",
+    "ALL_DDL_VARIANTS",
     "create_individual_standard_value_tables",
     "create_standard_value_lookup_table",
     "foreign_key_constraints",
     "get_table_names_from_relationships",
     "validate_names_in_relationships",
     "write_sql_to_text",
+    "iter_ddl",
+    "write_sql_stream",
+    "load_cached_model",
+    "clear_model_cache",
 ]
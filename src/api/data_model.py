@@ -6,6 +6,7 @@ import pathlib
 from collections.abc import Iterator
 from typing import TYPE_CHECKING
 
+from api.standard_value_catalogue import StandardValueCatalogue
 from base.o3_attribute import O3Attribute
 from base.o3_key_element import O3KeyElement
 
@@ -65,6 +66,7 @@ class O3DataModel:
         self.key_elements: dict[str, O3KeyElement] = {}
         self.key_elements_by_string_code: dict[str, O3KeyElement] = {}
         self.__standard_value_lists: dict[str, list[O3StandardValue]] | None = None
+        self.__standard_value_catalogue: StandardValueCatalogue | None = None
         self.__value_data_types: set[str] | None = None
         self.__value_priority: set[str] | None = None
         self.__reference_system_for_standard_values: set[str] | None = None
@@ -205,6 +207,23 @@ class O3DataModel:
 
         return self.__standard_value_lists
 
+    @property
+    def standard_value_catalogue(self) -> StandardValueCatalogue:
+        """
+        Retrieves the columnar catalogue of the standard values, built once from the standard value lists
+
+        Returns
+        -------
+            StandardValueCatalogue
+                the catalogue with one row per standard value, in lookup table order
+        """
+        if self.__standard_value_catalogue is None:
+            self.__standard_value_catalogue = StandardValueCatalogue(
+                value for values in self.standard_value_lists.values() for value in values
+            )
+
+        return self.__standard_value_catalogue
+
     @property
     def value_data_types(self) -> set[str]:
         """
@@ -0,0 +1,155 @@
+"""Content-addressed on-disk cache of parsed O3DataModel instances."""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import pathlib
+import pickle
+import tempfile
+from importlib import metadata
+
+from api.data_model import O3DataModel
+
+# Bump when the pickled layout of O3DataModel or the base classes changes
+_CACHE_FORMAT_VERSION = 3
+_CACHE_FILE_PREFIX = "o3_model_"
+_CACHE_FILE_SUFFIX = ".pickle"
+
+
+def library_version() -> str:
+    """
+    The installed py-o3 version, used to invalidate cached models on upgrade.
+
+    Returns
+    -------
+        str
+            the distribution version, or "0+unknown" when running from a source checkout
+    """
+    try:
+        return metadata.version("py-o3")
+    except metadata.PackageNotFoundError:
+        return "0+unknown"
+
+
+def model_cache_key(json_file: str, clean: bool) -> str:
+    """
+    Computes the cache key for a schema file: a SHA-256 over the file contents, the clean flag,
+    the cache format version, and the library version.
+
+    Parameters
+    ----------
+    json_file: str
+        the O3 JSON schema file
+    clean: bool
+        the clean flag the model is parsed with
+
+    Returns
+    -------
+        str
+            the hex digest identifying the parsed model
+    """
+    digest = hashlib.sha256()
+    with open(_resolve_schema_path(json_file), 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    digest.update(f"|clean={bool(clean)}|format={_CACHE_FORMAT_VERSION}|version={library_version()}".encode())
+    return digest.hexdigest()
+
+
+def load_cached_model(json_file: str, cache_dir: str, clean: bool) -> O3DataModel:
+    """
+    Returns the parsed O3 data model for a schema file, reading it from cache_dir when a model
+    for the same file contents, clean flag and library version has been stored there, and
+    parsing and storing it otherwise.
+
+    Cache entries are pickles, so cache_dir must only be writable by trusted users.
+
+    Parameters
+    ----------
+    json_file: str
+        the O3 JSON schema file
+    cache_dir: str
+        the directory holding cached models; created if missing
+    clean: bool
+        the flag to clean the model during parsing
+
+    Returns
+    -------
+        O3DataModel
+            the instantiated data model
+    """
+    path = _resolve_schema_path(json_file)
+    cache_path = pathlib.Path(cache_dir) / f"{_CACHE_FILE_PREFIX}{model_cache_key(str(path), clean)}{_CACHE_FILE_SUFFIX}"
+
+    if cache_path.is_file():
+        try:
+            with open(cache_path, 'rb') as file:
+                model = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+            logging.warning(f"Ignoring unreadable O3 model cache {cache_path}: {e}")
+        else:
+            if isinstance(model, O3DataModel):
+                model.json_file = path
+                return model
+            logging.warning(f"Ignoring O3 model cache {cache_path}: unexpected type {type(model).__name__}")
+
+    model = O3DataModel(str(path), clean=clean)
+    try:
+        _write_atomically(cache_path, model)
+    except OSError as e:
+        logging.warning(f"Could not write O3 model cache {cache_path}: {e}")
+    return model
+
+
+def clear_model_cache(cache_dir: str) -> int:
+    """
+    Removes every cached model from cache_dir.
+
+    Parameters
+    ----------
+    cache_dir: str
+        the directory holding cached models
+
+    Returns
+    -------
+        int
+            the number of cache files removed
+    """
+    directory = pathlib.Path(cache_dir)
+    if not directory.is_dir():
+        return 0
+
+    removed = 0
+    for cache_path in directory.glob(f"{_CACHE_FILE_PREFIX}*{_CACHE_FILE_SUFFIX}"):
+        cache_path.unlink()
+        removed += 1
+    return removed
+
+
+def _resolve_schema_path(json_file: str) -> pathlib.Path:
+    """Resolves the schema path the same way O3DataModel does."""
+    json_path = pathlib.Path(json_file)
+    path = json_path if json_path.is_absolute() else pathlib.Path.cwd() / json_file
+    if not path.exists():
+        raise FileNotFoundError(f"Path not found: {path}")
+    if not path.is_file():
+        raise TypeError(f"Is not a file: {path}")
+    return path
+
+
+def _write_atomically(cache_path: pathlib.Path, model: O3DataModel) -> None:
+    """Pickles the model to a temporary file and renames it into place."""
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            pickle.dump(model, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_name, cache_path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,139 @@
+"""Columnar catalogue of the O3 standard values with constant-time code and name lookups."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from base.o3_standard_value import O3StandardValue
+
+
+class StandardValueCatalogue:
+    """
+    The standard values of an O3 model stored as parallel columns, one row per value:
+    the key element string code, the attribute string code, the value name and the numeric code.
+    The O3StandardValue objects are kept alongside in the same row order.
+    """
+
+    def __init__(self, values: Iterable[O3StandardValue]):
+        """
+        Builds the catalogue columns and lookup indexes.
+
+        Parameters
+        ----------
+        values: Iterable[O3StandardValue]
+            the standard values to catalogue, in row order
+        """
+        self.values: tuple[O3StandardValue, ...] = tuple(values)
+        self.key_elements: tuple[str, ...] = tuple(x.key_element.string_code for x in self.values)
+        self.attributes: tuple[str, ...] = tuple(x.attribute.string_code for x in self.values)
+        self.value_names: tuple[str, ...] = tuple(x.value_name for x in self.values)
+        self.numeric_codes: tuple[str, ...] = tuple(str(x.numeric_code) for x in self.values)
+
+        # The first row wins when a code or name is repeated, matching the order rows are inserted
+        self.__row_by_numeric_code: dict[str, int] = {}
+        self.__row_by_attribute_value: dict[tuple[str, str], int] = {}
+        for row in range(len(self.values)):
+            self.__row_by_numeric_code.setdefault(self.numeric_codes[row], row)
+            self.__row_by_attribute_value.setdefault((self.attributes[row], self.value_names[row]), row)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def row_for_numeric_code(self, numeric_code: str) -> int | None:
+        """
+        Finds the catalogue row of a numeric code.
+
+        Parameters
+        ----------
+        numeric_code: str
+            the standard value numeric code
+
+        Returns
+        -------
+            int | None
+                the row index, or None when the code is not in the catalogue
+        """
+        return self.__row_by_numeric_code.get(str(numeric_code))
+
+    def row_for_value(self, attribute: str, value_name: str) -> int | None:
+        """
+        Finds the catalogue row of a standard value by its attribute and value name.
+
+        Parameters
+        ----------
+        attribute: str
+            the attribute string code
+        value_name: str
+            the standard value name
+
+        Returns
+        -------
+            int | None
+                the row index, or None when the value is not in the catalogue
+        """
+        return self.__row_by_attribute_value.get((attribute, value_name))
+
+    def by_numeric_code(self, numeric_code: str) -> O3StandardValue | None:
+        """
+        Retrieves a standard value by its numeric code.
+
+        Parameters
+        ----------
+        numeric_code: str
+            the standard value numeric code
+
+        Returns
+        -------
+            O3StandardValue | None
+                the standard value, or None when the code is not in the catalogue
+        """
+        row = self.row_for_numeric_code(numeric_code)
+        return None if row is None else self.values[row]
+
+    def by_value(self, attribute: str, value_name: str) -> O3StandardValue | None:
+        """
+        Retrieves a standard value by its attribute and value name.
+
+        Parameters
+        ----------
+        attribute: str
+            the attribute string code
+        value_name: str
+            the standard value name
+
+        Returns
+        -------
+            O3StandardValue | None
+                the standard value, or None when it is not in the catalogue
+        """
+        row = self.row_for_value(attribute, value_name)
+        return None if row is None else self.values[row]
+
+    def to_numpy(self):
+        """
+        Returns the catalogue as a NumPy structured array with the fields key_element, attribute,
+        value_name and numeric_code. Requires NumPy (``pip install py-o3[numpy]``).
+
+        Returns
+        -------
+            numpy.ndarray
+                one record per catalogue row
+        """
+        try:
+            import numpy as np
+        except ImportError as e:
+            raise ImportError(
+                "StandardValueCatalogue.to_numpy requires NumPy; "
+                "install it with `pip install py-o3[numpy]`."
+            ) from e
+
+        return np.array(
+            list(zip(self.key_elements, self.attributes, self.value_names, self.numeric_codes, strict=True)),
+            dtype=[('key_element', object), ('attribute', object),
+                   ('value_name', object), ('numeric_code', object)],
+        )
+
+
+if __name__ == "__main__":
+    pass
@@ -2,16 +2,35 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, TextIO
 
 from api.data_model import O3DataModel
+from api.model_cache import load_cached_model
 from helpers.enums import SupportedSQLServers
 from sql.data_model_to_sql.foreign_keys import ForeignKeysConstraints
 from sql.data_model_to_sql.table_generator import (
     KeyElementTableCreator,
     LookupTableCreator,
+    PatientIdentifierHash,
     StandardListTableCreator,
 )
 
+if TYPE_CHECKING:
+    from base.o3_key_element import O3KeyElement
+
+# Buffer size used when streaming SQL to a file path
+_WRITE_BUFFER_SIZE = 1 << 16
+
+# Every (SQL server type, PHI allowed) combination the DDL can be generated for
+ALL_DDL_VARIANTS: tuple[tuple[SupportedSQLServers, bool], ...] = (
+    (SupportedSQLServers.MSSQL, True),
+    (SupportedSQLServers.MSSQL, False),
+    (SupportedSQLServers.PSQL, True),
+    (SupportedSQLServers.PSQL, False),
+)
+
 
 def create_key_element_tables(model: O3DataModel,
                               sql_type: SupportedSQLServers,
@@ -39,6 +58,82 @@ def create_key_element_tables(model: O3DataModel,
     return _tables
 
 
+def create_key_element_table_variants(
+        model: O3DataModel,
+        variants: Iterable[tuple[SupportedSQLServers, bool]] = ALL_DDL_VARIANTS,
+        workers: int = 1) -> dict[tuple[SupportedSQLServers, bool, str], str]:
+    """
+    Creates the key element table commands for several SQL server types and PHI flags in one pass.
+    Each attribute's data type is resolved once per key element and reused by every variant.
+
+    Parameters
+    ----------
+    model: O3DataModel
+        The O3 model to create the tables for
+    variants: Iterable[tuple[SupportedSQLServers, bool]]
+        The (SQL server type, PHI allowed) combinations to generate (default: all four)
+    workers: int
+        The number of processes to spread the key elements across. With 1 (the default) the
+        tables are generated in this process; the result is the same for any worker count.
+
+    Returns
+    -------
+        dict[tuple[SupportedSQLServers, bool, str], str]
+            A dictionary keyed by (SQL server type, PHI allowed, table name) with the sql command as the value,
+            ordered by variant and then by key element
+
+    Raises
+    ------
+    ValueError
+        If workers is less than 1
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be >= 1, got {workers}")
+
+    variants = tuple(variants)
+    names = list(model.key_elements)
+
+    if workers == 1 or len(names) <= 1:
+        rendered = [_key_element_variants(model.key_elements[name], variants) for name in names]
+    else:
+        chunksize = max(1, len(names) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_ddl_worker,
+                                 initargs=(model, variants)) as pool:
+            rendered = list(pool.map(_render_key_element, names, chunksize=chunksize))
+
+    _tables: dict = {}
+    for position, (sql_type, phi_allowed) in enumerate(variants):
+        for name, tables in zip(names, rendered, strict=True):
+            _tables[(sql_type, phi_allowed, name)] = tables[position]
+
+    return _tables
+
+
+def _key_element_variants(key_element: O3KeyElement, variants: tuple[tuple[SupportedSQLServers, bool], ...]) -> list[str]:
+    """Renders one key element's table for each variant, resolving its attributes once."""
+    if not variants:
+        return []
+
+    first_type, first_phi = variants[0]
+    base = KeyElementTableCreator(first_type, key_element, phi_allowed=first_phi)
+    return [base.sql_table()] + [base.variant(sql_type, phi).sql_table() for sql_type, phi in variants[1:]]
+
+
+_DDL_WORKER_STATE: tuple[O3DataModel, tuple[tuple[SupportedSQLServers, bool], ...]] | None = None
+
+
+def _init_ddl_worker(model: O3DataModel, variants: tuple[tuple[SupportedSQLServers, bool], ...]) -> None:
+    """Process-pool initializer: receive the model once per worker."""
+    global _DDL_WORKER_STATE
+    _DDL_WORKER_STATE = (model, variants)
+
+
+def _render_key_element(name: str) -> list[str]:
+    """Process-pool task: render every variant of one key element's table."""
+    model, variants = _DDL_WORKER_STATE
+    return _key_element_variants(model.key_elements[name], variants)
+
+
 def create_individual_standard_value_tables(model: O3DataModel,
                                             sql_type: SupportedSQLServers) -> dict[str, str]:
 
@@ -81,11 +176,7 @@ def create_standard_value_lookup_table(model: O3DataModel,
         LookupTableCreator
             The lookup table creator instance with methods to generate SQL table and INSERT commands
     """
-    items: list = []
-    for values in model.standard_value_lists.values():
-        items.extend(values)
-
-    return LookupTableCreator(sql_type, items)
+    return LookupTableCreator(sql_type, list(model.standard_value_catalogue.values))
 
 
 def create_tables(model: O3DataModel, sql_type: SupportedSQLServers, phi_allowed: bool) -> dict[str, str]:
@@ -112,7 +203,7 @@ def create_tables(model: O3DataModel, sql_type: SupportedSQLServers, phi_allowed
     return _tables
 
 
-def create_model(file_location: str, clean: bool) -> O3DataModel:
+def create_model(file_location: str, clean: bool, cache_dir: str | None = None) -> O3DataModel:
     """
     Instantiates an O3 data model from a JSON schema
 
@@ -122,12 +213,17 @@ def create_model(file_location: str, clean: bool) -> O3DataModel:
         the file location of the JSON data model schema
     clean: bool
         a flag to clean the model during reading and parsing for common typos or omissions
+    cache_dir: str | None
+        when set, the parsed model is cached in this directory keyed on the schema contents,
+        the clean flag and the library version (see api.model_cache)
 
     Returns
     -------
         O3DataModel
             the instantiated data model
     """
+    if cache_dir is not None:
+        return load_cached_model(file_location, cache_dir, clean)
     return O3DataModel(file_location, clean=clean)
 
 
@@ -207,7 +303,97 @@ def foreign_key_constraints(model: O3DataModel, sql_type: SupportedSQLServers) -
     return _commands
 
 
-def write_sql_to_text(file_location: str, commands: list[str], write_mode: str = 'a') -> None:
+def iter_ddl(model: O3DataModel,
+             sql_type: SupportedSQLServers,
+             phi_allowed: bool,
+             include_lookup: bool = False,
+             include_patient_hash: bool = False) -> Iterator[str]:
+    """
+    Yields the SQL commands that instantiate the database one at a time, in dependency order:
+    the key element tables, then the standard values lookup table and its INSERT commands,
+    then the PatientIdentifierHash table and its foreign key, then the foreign key constraints.
+    Each command is generated only when it is requested.
+
+    Parameters
+    ----------
+    model: O3DataModel
+        The O3 data model to use to create the commands from
+    sql_type: SupportedSQLServers
+        The sql server type to create the commands for
+    phi_allowed: bool
+        Whether PHI can be stored in the DB or not
+    include_lookup: bool
+        Whether to include the standard values lookup table and its INSERT commands
+    include_patient_hash: bool
+        Whether to include the PatientIdentifierHash table
+
+    Yields
+    -------
+        str
+            the SQL commands in the order they should be executed
+    """
+    for data in model.key_elements.values():
+        yield KeyElementTableCreator(sql_type, data, phi_allowed=phi_allowed).sql_table()
+
+    if include_lookup:
+        lookup = create_standard_value_lookup_table(model, sql_type)
+        yield lookup.sql_table()
+        yield from lookup.iter_insert_commands()
+
+    if include_patient_hash:
+        patient_hash = PatientIdentifierHash(sql_type, "PatientIdentifierHash")
+        yield patient_hash.sql_table()
+        yield patient_hash.foreign_key
+
+    for ke in model.key_elements.values():
+        for rel in ke.child_of_relationships:
+            yield ForeignKeysConstraints(rel, sql_type).column_creation_text
+
+
+def write_sql_stream(commands: Iterable[str], output: str | TextIO, write_mode: str = 'w') -> int:
+    """
+    Writes the SQL commands to a file path or an open text stream one command at a time,
+    without joining them in memory
+
+    Parameters
+    ----------
+    commands: Iterable[str]
+        The SQL commands to write, typically from iter_ddl
+    output: str | TextIO
+        A file path, or an open text stream such as sys.stdout which is written to but not closed
+    write_mode: str
+        The open function mode used for a file path. Must be 'w' or 'a' (default: 'w')
+
+    Returns
+    -------
+        int
+            the number of commands written
+
+    Raises
+    ------
+    ValueError
+        If write_mode is not 'w' or 'a'
+    """
+    if write_mode not in ('w', 'a'):
+        raise ValueError(f"write_mode must be 'w' or 'a', got {write_mode!r}")
+
+    if not isinstance(output, str):
+        return _write_commands(commands, output)
+
+    with open(output, write_mode, buffering=_WRITE_BUFFER_SIZE) as file:
+        return _write_commands(commands, file)
+
+
+def _write_commands(commands: Iterable[str], file: TextIO) -> int:
+    """Writes each command to the stream and returns how many were written."""
+    count = 0
+    for command in commands:
+        file.write(command)
+        count += 1
+    return count
+
+
+def write_sql_to_text(file_location: str, commands: Iterable[str], write_mode: str = 'a') -> None:
     """
     Writes the SQL command to text file
 
@@ -215,7 +401,7 @@ def write_sql_to_text(file_location: str, commands: list[str], write_mode: str =
     ----------
     file_location: str
         The file location to write the SQL command to
-    commands: list[str]
+    commands: Iterable[str]
         The SQL commands to write
     write_mode: str
         The open function mode to use. Must be 'w' or 'a' (default: 'a')
@@ -229,11 +415,7 @@ def write_sql_to_text(file_location: str, commands: list[str], write_mode: str =
     ValueError
         If write_mode is not 'w' or 'a'
     """
-    if write_mode not in ('w', 'a'):
-        raise ValueError(f"write_mode must be 'w' or 'a', got {write_mode!r}")
-
-    with open(file_location, write_mode) as file:
-        file.write(''.join(commands))
+    write_sql_stream(commands, file_location, write_mode=write_mode)
 
 
 if __name__ == "__main__":
@@ -6,6 +6,7 @@ from typing import TYPE_CHECKING
 
 from base.o3_element import O3Element
 from base.o3_standard_value import O3StandardValue
+from helpers.string_helpers import intern_string
 
 if TYPE_CHECKING:
     from base.o3_key_element import O3KeyElement
@@ -16,6 +17,9 @@ class O3Attribute(O3Element):
     The O3 Attribute class that manages the individual attributes for each element.
     """
 
+    __slots__ = ('key_element', 'value_data_type', 'standard_values_use', 'standard_values_list',
+                 'reference_system_for_values', 'allow_null_values', 'value_example', '__weakref__')
+
     _POSSIBLE_VALUE_DATA_TYPES: frozenset[str] = frozenset(
         {'Boolean', 'Binary', 'Date', 'Decimal', 'Integer', 'String'}
     )
@@ -38,12 +42,12 @@ class O3Attribute(O3Element):
 
         self.key_element: O3KeyElement = key_element
         self.value_data_type: str = item_dict['ValueDataType']
-        self.standard_values_use: str = item_dict['StandardValuesUse']
+        self.standard_values_use: str = intern_string(item_dict['StandardValuesUse'])
         self.standard_values_list: list[O3StandardValue] = [O3StandardValue(self.key_element,
                                                                             self,
                                                                             x) for x in item_dict['StandardValuesList']]
         self.reference_system_for_values: str = item_dict['ReferenceSystemForValues']
-        self.allow_null_values: str = item_dict['AllowNullValues']
+        self.allow_null_values: str = intern_string(item_dict['AllowNullValues'])
         self.value_example: str = item_dict['ValueExample']
 
         if kwargs.get('clean', False):
@@ -51,6 +55,10 @@ class O3Attribute(O3Element):
             self.__clean_standard_values_list()
             self.__clean_value_data_types()
 
+        # Interned after cleaning, which may rewrite both values
+        self.value_data_type = intern_string(self.value_data_type)
+        self.reference_system_for_values = intern_string(self.reference_system_for_values)
+
     def __check_reference_system(self, item_dict: dict) -> None:
         """
         Part of the clean routine that will evaluate if the reference system for standard values in inserted
@@ -1,11 +1,19 @@
 """Base class for O3 ontology entities parsed from JSON."""
+from helpers.string_helpers import intern_string
 
 
 class O3Element:
     """
     The base class for O3 key elements and attributes.
+
+    Instances use ``__slots__`` rather than a per-instance ``__dict__`` to keep the
+    thousands of parsed attributes compact; fields whose values repeat across the
+    schema are interned.
     """
 
+    __slots__ = ('value_name', 'value_type', 'string_code', 'numeric_code', 'definition', 'value_priority',
+                 'more_than_one_value_allowed', 'sct_id', 'ncitc', 'ncimt')
+
     def __init__(self, item_dict: dict):
         """
         Instantiates the O3 Element using the parsed JSON file's dictionary of data
@@ -17,12 +25,12 @@ class O3Element:
         """
         try:
             self.value_name = item_dict['ValueName']
-            self.value_type = item_dict['ValueType']
+            self.value_type = intern_string(item_dict['ValueType'])
             self.string_code = item_dict['StringCode']
             self.numeric_code = item_dict['NumericCode']
             self.definition = item_dict['Definition']
-            self.value_priority = item_dict['ValuePriority']
-            self.more_than_one_value_allowed = item_dict['MoreThanOneValueAllowed']
+            self.value_priority = intern_string(item_dict['ValuePriority'])
+            self.more_than_one_value_allowed = intern_string(item_dict['MoreThanOneValueAllowed'])
             self.sct_id = item_dict['SCTID']
             self.ncitc = item_dict['NCITC']
             self.ncimt = item_dict['NCIMT']
@@ -10,6 +10,9 @@ class O3KeyElement(O3Element):
     """
     The Key Element class. Instantiates an object using the parsed JSON dictionary. Will create attributes
     and relationships.
+
+    Unlike the other O3 classes this one keeps a ``__dict__``, which the cached relationship
+    properties require; there is only one instance per key element.
     """
 
     def __init__(self, item_dict: dict, **kwargs):
@@ -1,4 +1,5 @@
 """O3 relationship linking subject and predicate key elements."""
+from helpers.string_helpers import intern_string
 
 
 class O3Relationship:
@@ -6,6 +7,8 @@ class O3Relationship:
     The O3 relationship class.
     """
 
+    __slots__ = ('subject_element', 'relationship_category', 'predicate_element', 'cardinality')
+
     def __init__(self, item_dict: dict, **kwargs):
         """
         Instantiates an O3 relationship object.
@@ -20,10 +23,10 @@ class O3Relationship:
         """
         super().__init__()
 
-        self.subject_element = item_dict['SubjectElement']
-        self.relationship_category = item_dict['RelationshipCategory']
-        self.predicate_element = item_dict['PredicateElement']
-        self.cardinality = item_dict['Cardinality']
+        self.subject_element = intern_string(item_dict['SubjectElement'])
+        self.relationship_category = intern_string(item_dict['RelationshipCategory'])
+        self.predicate_element = intern_string(item_dict['PredicateElement'])
+        self.cardinality = intern_string(item_dict['Cardinality'])
 
     def __str__(self):
         return f'{self.subject_element} {self.relationship_category} {self.predicate_element}'
@@ -13,6 +13,8 @@ class O3StandardValue:
     The O3 standard value class.
     """
 
+    __slots__ = ('key_element', 'attribute', 'numeric_code', 'value_name')
+
     def __init__(self, key_element: O3KeyElement, attrib: O3Attribute, item: str):
         self.key_element = key_element
         self.attribute = attrib
@@ -6,15 +6,8 @@ import json
 import os
 import sys
 
-from api.workflow import (
-    create_model,
-    create_standard_value_lookup_table,
-    create_tables,
-    foreign_key_constraints,
-    write_sql_to_text,
-)
+from api.workflow import create_model, iter_ddl, write_sql_stream
 from helpers.enums import SupportedSQLServers
-from sql.data_model_to_sql.table_generator import PatientIdentifierHash
 
 
 def _build_parser() -> argparse.ArgumentParser:
@@ -30,7 +23,7 @@ def _build_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "-o", "--output",
         required=True,
-        help="Path for the output SQL file.",
+        help="Path for the output SQL file, or - to write to stdout.",
     )
     parser.add_argument(
         "-s", "--server",
@@ -50,6 +43,11 @@ def _build_parser() -> argparse.ArgumentParser:
         default=False,
         help="Clean common typos and data type issues during parsing.",
     )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Cache the parsed schema in this directory and reuse it on later runs.",
+    )
     parser.add_argument(
         "--include-lookup",
         action="store_true",
@@ -77,7 +75,7 @@ def main(argv: list[str] | None = None) -> int:
     sql_type = server_map[args.server]
 
     try:
-        model = create_model(args.input, clean=args.clean)
+        model = create_model(args.input, clean=args.clean, cache_dir=args.cache_dir)
     except FileNotFoundError as e:
         print(f"Error: {e}", file=sys.stderr)
         return 1
@@ -86,28 +84,20 @@ def main(argv: list[str] | None = None) -> int:
         return 1
 
     try:
-        tables = create_tables(model, sql_type, args.phi_allowed)
-
-        all_commands: list[str] = [v for v in tables.values()]
-
-        if args.include_lookup:
-            lookup = create_standard_value_lookup_table(model, sql_type)
-            all_commands.append(lookup.sql_table())
-            all_commands.extend(lookup.insert_commands())
-
-        if args.include_patient_hash:
-            patient_hash = PatientIdentifierHash(sql_type, "PatientIdentifierHash")
-            all_commands.append(patient_hash.sql_table())
-            all_commands.append(patient_hash.foreign_key)
+        commands = iter_ddl(model, sql_type, args.phi_allowed,
+                            include_lookup=args.include_lookup,
+                            include_patient_hash=args.include_patient_hash)
 
-        fk_commands = foreign_key_constraints(model, sql_type)
-        all_commands.extend(fk_commands)
+        if args.output == "-":
+            write_sql_stream(commands, sys.stdout)
+            sys.stdout.flush()
+            return 0
 
         output_dir = os.path.dirname(args.output)
         if output_dir:
             os.makedirs(output_dir, exist_ok=True)
 
-        write_sql_to_text(args.output, all_commands, write_mode="w")
+        write_sql_stream(commands, args.output, write_mode="w")
         print(f"SQL written to {args.output}")
 
         return 0
@@ -0,0 +1,97 @@
+"""Inverted token index over O3 attributes for candidate blocking during crosswalk generation."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from weakref import WeakKeyDictionary
+
+from api.data_model import O3DataModel
+from etl.mapping.match_engine import normalize_name, tokenize
+
+# Shortest token the match engine keeps; prefixes shorter than this never match
+_MIN_TOKEN_LENGTH = 2
+
+_INDEX_CACHE: WeakKeyDictionary[O3DataModel, AttributeIndex] = WeakKeyDictionary()
+
+
+@dataclass(frozen=True)
+class IndexedAttribute:
+    """The parts of an O3 attribute the match engine scores against."""
+
+    key_element: str
+    value_name: str
+    value_data_type: str
+
+
+class AttributeIndex:
+    """Maps O3 attribute name tokens and token prefixes to attribute positions.
+
+    Two names can only receive a non-zero name score from ``MatchEngine`` when
+    their prefix-stripped forms are equal, or when a token of one equals or is
+    a prefix of a token of the other. The index answers that question for a
+    DWH column without visiting every O3 attribute.
+    """
+
+    def __init__(self, attributes: Iterable[IndexedAttribute]):
+        self.__attributes: list[IndexedAttribute] = list(attributes)
+        self.__by_token: dict[str, set[int]] = {}
+        self.__by_prefix: dict[str, set[int]] = {}
+        self.__by_normalized: dict[str, set[int]] = {}
+
+        for position, attr in enumerate(self.__attributes):
+            normalized = normalize_name(attr.value_name)
+            if normalized:
+                self.__by_normalized.setdefault(normalized, set()).add(position)
+
+            for token in tokenize(attr.value_name):
+                self.__by_token.setdefault(token, set()).add(position)
+                for end in range(_MIN_TOKEN_LENGTH, len(token) + 1):
+                    self.__by_prefix.setdefault(token[:end], set()).add(position)
+
+    @classmethod
+    def from_model(cls, o3_model: O3DataModel) -> AttributeIndex:
+        """Build an index over every attribute of every key element, in model order."""
+        return cls(
+            IndexedAttribute(ke_name, attr.value_name, attr.value_data_type)
+            for ke_name, key_element in o3_model.key_elements.items()
+            for attr in key_element.list_attributes
+        )
+
+    @classmethod
+    def for_model(cls, o3_model: O3DataModel) -> AttributeIndex:
+        """Return the index for a model, building it on first use."""
+        index = _INDEX_CACHE.get(o3_model)
+        if index is None:
+            index = cls.from_model(o3_model)
+            _INDEX_CACHE[o3_model] = index
+        return index
+
+    def __len__(self) -> int:
+        return len(self.__attributes)
+
+    @property
+    def attributes(self) -> list[IndexedAttribute]:
+        """Every indexed attribute in model order."""
+        return self.__attributes
+
+    def candidates(self, dwh_name: str) -> list[IndexedAttribute]:
+        """Attributes that can share a name signal with dwh_name, in model order."""
+        positions: set[int] = set()
+
+        normalized = normalize_name(dwh_name)
+        if normalized:
+            positions |= self.__by_normalized.get(normalized, set())
+
+        for token in tokenize(dwh_name):
+            # O3 tokens that start with (or equal) the DWH token
+            positions |= self.__by_prefix.get(token, set())
+            # O3 tokens that the DWH token starts with
+            for end in range(_MIN_TOKEN_LENGTH, len(token)):
+                positions |= self.__by_token.get(token[:end], set())
+
+        return [self.__attributes[p] for p in sorted(positions)]
+
+
+if __name__ == "__main__":
+    pass
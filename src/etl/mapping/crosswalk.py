@@ -2,13 +2,29 @@
 
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
 from etl.manifest import SemanticManifest
 from etl.registry import ModelRegistry
+from etl.mapping.attribute_index import AttributeIndex, IndexedAttribute
 from etl.mapping.match_engine import MatchEngine
 from etl.mapping.mapping_store import CrosswalkEntry, MappingStore
 from api.data_model import O3DataModel
 
 
+class _DWHColumn(NamedTuple):
+    """A DWH table column or conceptual-model select to score against O3."""
+
+    dwh_table: str
+    dwh_column: str
+    dwh_type: str
+    dwh_context: str
+    model_name: str | None
+    model_alias: str | None
+    model_expr: str | None
+
+
 class Crosswalk:
     """Generates and manages DWH→O3 crosswalk mappings."""
 
@@ -26,18 +42,51 @@ class Crosswalk:
         self.__engine = match_engine or MatchEngine()
         self.__min_confidence = min_confidence
         self.__deny_list = set(registry.field_policy_defaults.deny_list)
+        self.__index = AttributeIndex.for_model(o3_model)
+        self.__engine.precompute(o3_model)
+
+    def generate_suggestions(self, workers: int = 1) -> list[CrosswalkEntry]:
+        """Auto-suggest crosswalk entries by scoring all DWH columns against O3 attributes.
+
+        With ``workers > 1`` the DWH tables and conceptual models are sharded
+        across a process pool. Shards are reduced in submission order, so the
+        result is identical for any worker count.
+        """
+        if workers < 1:
+            raise ValueError(f"workers must be >= 1, got {workers}")
+
+        shards = self.__build_shards()
+
+        if workers == 1:
+            suggestions = [
+                entry
+                for shard in shards
+                for column in shard
+                for entry in _score_column(
+                    self.__engine, self.__index, self.__min_confidence, column
+                )
+            ]
+        else:
+            suggestions = self.__score_in_pool(shards, workers)
 
-    def generate_suggestions(self) -> list[CrosswalkEntry]:
-        """Auto-suggest crosswalk entries by scoring all DWH columns against O3 attributes."""
-        suggestions: list[CrosswalkEntry] = []
+        # Deduplicate: keep highest-scoring entry per (dwh_table, dwh_column, o3_key_element, o3_attribute)
+        best: dict[tuple, CrosswalkEntry] = {}
+        for entry in suggestions:
+            key = entry.key
+            if key not in best or entry.confidence > best[key].confidence:
+                best[key] = entry
+
+        result = sorted(best.values(), key=lambda e: e.confidence, reverse=True)
+        return result
+
+    def __build_shards(self) -> list[list[_DWHColumn]]:
+        """One shard per DWH table and per conceptual model, deny-listed columns removed."""
+        shards: list[list[_DWHColumn]] = []
 
-        # Score DWH table columns against O3 attributes
+        # DWH table columns
         for table in self.__manifest.tables.values():
-            for col in table.columns:
-                if col.name in self.__deny_list:
-                    continue
-                self.__score_against_o3(
-                    suggestions,
+            shards.append([
+                _DWHColumn(
                     dwh_table=table.full_name,
                     dwh_column=col.name,
                     dwh_type=col.data_type,
@@ -46,14 +95,14 @@ class Crosswalk:
                     model_alias=None,
                     model_expr=None,
                 )
+                for col in table.columns
+                if col.name not in self.__deny_list
+            ])
 
-        # Score conceptual model selects against O3 attributes
+        # Conceptual model selects
         for model in self.__manifest.models:
-            for select in model.selects:
-                if select.alias in self.__deny_list:
-                    continue
-                self.__score_against_o3(
-                    suggestions,
+            shards.append([
+                _DWHColumn(
                     dwh_table=model.base_table or "",
                     dwh_column=select.alias,
                     dwh_type=select.data_type,
@@ -62,53 +111,27 @@ class Crosswalk:
                     model_alias=select.alias,
                     model_expr=select.expr,
                 )
+                for select in model.selects
+                if select.alias not in self.__deny_list
+            ])
 
-        # Deduplicate: keep highest-scoring entry per (dwh_table, dwh_column, o3_key_element, o3_attribute)
-        best: dict[tuple, CrosswalkEntry] = {}
-        for entry in suggestions:
-            key = entry.key
-            if key not in best or entry.confidence > best[key].confidence:
-                best[key] = entry
-
-        result = sorted(best.values(), key=lambda e: e.confidence, reverse=True)
-        return result
+        return [shard for shard in shards if shard]
 
-    def __score_against_o3(
-        self,
-        suggestions: list[CrosswalkEntry],
-        dwh_table: str,
-        dwh_column: str,
-        dwh_type: str,
-        dwh_context: str,
-        model_name: str | None,
-        model_alias: str | None,
-        model_expr: str | None,
-    ) -> None:
-        """Score a single DWH column against all O3 attributes."""
-        for ke_name, key_element in self.__o3_model.key_elements.items():
-            for attr in key_element.list_attributes:
-                candidate = self.__engine.score(
-                    dwh_name=dwh_column,
-                    dwh_type=dwh_type,
-                    o3_name=attr.value_name,
-                    o3_type=attr.value_data_type,
-                    dwh_context=dwh_context,
-                    o3_context=ke_name,
-                )
-                if candidate.score >= self.__min_confidence:
-                    suggestions.append(
-                        CrosswalkEntry(
-                            dwh_table=dwh_table,
-                            dwh_column=dwh_column,
-                            model_name=model_name,
-                            model_alias=model_alias,
-                            model_expr=model_expr,
-                            o3_key_element=ke_name,
-                            o3_attribute=attr.value_name,
-                            confidence=candidate.score,
-                            status="auto",
-                        )
-                    )
+    def __score_in_pool(
+        self, shards: list[list[_DWHColumn]], workers: int
+    ) -> list[CrosswalkEntry]:
+        """Score shards on a process pool; the O3 catalogue is sent once per worker."""
+        chunksize = max(1, len(shards) // (workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self.__engine, self.__index.attributes, self.__min_confidence),
+        ) as pool:
+            return [
+                entry
+                for shard_entries in pool.map(_score_shard, shards, chunksize=chunksize)
+                for entry in shard_entries
+            ]
 
     def load_curated(self, path: str) -> list[CrosswalkEntry]:
         return MappingStore().load(path)
@@ -140,5 +163,73 @@ class Crosswalk:
         return sorted(merged.values(), key=lambda e: e.confidence, reverse=True)
 
 
+def _score_column(
+    engine: MatchEngine,
+    index: AttributeIndex,
+    min_confidence: float,
+    column: _DWHColumn,
+) -> list[CrosswalkEntry]:
+    """Score a single DWH column against every O3 attribute that can reach min_confidence.
+
+    When the type and context signals alone cannot reach the threshold, only
+    attributes sharing a name token with the column (per the attribute index)
+    are scored; the rest would score below min_confidence anyway.
+    """
+    if engine.requires_name_overlap(min_confidence):
+        attributes = index.candidates(column.dwh_column)
+    else:
+        attributes = index.attributes
+
+    entries: list[CrosswalkEntry] = []
+    for attr in attributes:
+        candidate = engine.score(
+            dwh_name=column.dwh_column,
+            dwh_type=column.dwh_type,
+            o3_name=attr.value_name,
+            o3_type=attr.value_data_type,
+            dwh_context=column.dwh_context,
+            o3_context=attr.key_element,
+        )
+        if candidate.score >= min_confidence:
+            entries.append(
+                CrosswalkEntry(
+                    dwh_table=column.dwh_table,
+                    dwh_column=column.dwh_column,
+                    model_name=column.model_name,
+                    model_alias=column.model_alias,
+                    model_expr=column.model_expr,
+                    o3_key_element=attr.key_element,
+                    o3_attribute=attr.value_name,
+                    confidence=candidate.score,
+                    status="auto",
+                )
+            )
+    return entries
+
+
+# Per-process scoring state, populated once by _init_worker
+_WORKER_STATE: tuple[MatchEngine, AttributeIndex, float] | None = None
+
+
+def _init_worker(
+    engine: MatchEngine,
+    attributes: list[IndexedAttribute],
+    min_confidence: float,
+) -> None:
+    """Process-pool initializer: rebuild the attribute index from the O3 catalogue."""
+    global _WORKER_STATE
+    _WORKER_STATE = (engine, AttributeIndex(attributes), min_confidence)
+
+
+def _score_shard(shard: list[_DWHColumn]) -> list[CrosswalkEntry]:
+    """Process-pool task: score every column of one DWH table or conceptual model."""
+    engine, index, min_confidence = _WORKER_STATE
+    return [
+        entry
+        for column in shard
+        for entry in _score_column(engine, index, min_confidence, column)
+    ]
+
+
 if __name__ == "__main__":
     pass
@@ -3,11 +3,15 @@
 from __future__ import annotations
 
 import json
+import os
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass, asdict
 from typing import Literal
 
 CrosswalkStatus = Literal["auto", "confirmed", "rejected", "manual"]
 
+JSONL_EXTENSIONS = (".jsonl", ".ndjson")
+
 
 @dataclass
 class CrosswalkEntry:
@@ -66,17 +70,63 @@ class MappingDiff:
 
 
 class MappingStore:
-    """JSON persistence for crosswalk entries."""
-
-    def save(self, entries: list[CrosswalkEntry], path: str) -> None:
+    """JSON persistence for crosswalk entries.
+
+    The format follows the file extension: ``.jsonl`` and ``.ndjson`` files
+    hold one entry per line and can be streamed with ``iter_load`` or
+    extended with ``append``; any other path is an indented JSON array.
+    """
+
+    def save(self, entries: Iterable[CrosswalkEntry], path: str) -> None:
+        if is_jsonl(path):
+            with open(path, "w", encoding="utf-8") as f:
+                for e in entries:
+                    f.write(_jsonl_line(e))
+            return
         with open(path, "w", encoding="utf-8") as f:
             json.dump([e.to_dict() for e in entries], f, indent=2)
 
     def load(self, path: str) -> list[CrosswalkEntry]:
+        if is_jsonl(path):
+            return list(self.iter_load(path))
         with open(path, encoding="utf-8") as f:
             data = json.load(f)
         return [CrosswalkEntry.from_dict(d) for d in data]
 
+    def iter_load(self, path: str) -> Iterator[CrosswalkEntry]:
+        """Yield entries one at a time; JSON arrays are still parsed whole."""
+        if not is_jsonl(path):
+            yield from self.load(path)
+            return
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield CrosswalkEntry.from_dict(json.loads(line))
+                # JSONDecodeError and out-of-range confidence are both ValueError
+                except (ValueError, KeyError, TypeError) as e:
+                    raise ValueError(
+                        f"{path}:{line_number}: invalid crosswalk entry: {e}"
+                    ) from e
+
+    def append(self, entries: Iterable[CrosswalkEntry], path: str) -> None:
+        """Add entries to the end of a JSON Lines file, creating it if needed."""
+        if not is_jsonl(path):
+            raise ValueError(
+                f"append requires a JSON Lines file ({', '.join(JSONL_EXTENSIONS)}), got {path}"
+            )
+        needs_newline = False
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        with open(path, "a", encoding="utf-8") as f:
+            if needs_newline:
+                f.write("\n")
+            for e in entries:
+                f.write(_jsonl_line(e))
+
     def diff(
         self, old: list[CrosswalkEntry], new: list[CrosswalkEntry]
     ) -> MappingDiff:
@@ -94,5 +144,14 @@ class MappingStore:
         return MappingDiff(added=added, removed=removed, changed=changed)
 
 
+def is_jsonl(path: str) -> bool:
+    """Whether ``path`` names a JSON Lines crosswalk."""
+    return os.path.splitext(path)[1].lower() in JSONL_EXTENSIONS
+
+
+def _jsonl_line(entry: CrosswalkEntry) -> str:
+    return json.dumps(entry.to_dict(), separators=(",", ":")) + "\n"
+
+
 if __name__ == "__main__":
     pass
@@ -4,7 +4,14 @@
 from __future__ import annotations
 
 import re
+import sys
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
 from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from api.data_model import O3DataModel
 
 
 # Prefixes stripped before name comparison
@@ -52,6 +59,23 @@ for group, members in _TYPE_GROUPS.items():
     for member in members:
         _TYPE_TO_GROUP[member] = group
 
+# Type group → small integer id for batch scoring (-1 marks an unrecognized type)
+_GROUP_IDS: dict[str, int] = {group: i for i, group in enumerate(_TYPE_GROUPS)}
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase a name after stripping common DWH prefixes (used for exact-equivalence checks)."""
+    return _STRIP_PREFIXES.sub("", name).lower()
+
+
+def tokenize(name: str) -> set[str]:
+    """Split a name into lowercase tokens, stripping common prefixes."""
+    stripped = _STRIP_PREFIXES.sub("", name)
+    if not stripped:
+        stripped = name
+    tokens = _TOKEN_SPLIT.findall(stripped)
+    return {t.lower() for t in tokens if len(t) > 1}
+
 
 @dataclass(frozen=True)
 class MatchCandidate:
@@ -63,18 +87,92 @@ class MatchCandidate:
     signals: dict[str, float] = field(hash=False)
 
 
+@dataclass(frozen=True)
+class TokenCacheInfo:
+    """Snapshot of a MatchEngine's token cache counters."""
+
+    hits: int
+    misses: int
+    size: int
+    max_size: int
+    precomputed: int
+
+
+class ScoreInput(NamedTuple):
+    """One side of a pair for ``MatchEngine.score_batch``: name, data type, optional context."""
+
+    name: str
+    data_type: str
+    context: str | None = None
+
+
+# (prefix-stripped lowercase name, name tokens)
+_AnalyzedName = tuple[str, frozenset[str]]
+
+
 class MatchEngine:
-    """Scores potential DWH→O3 column mappings using name, type, and context signals."""
+    """Scores potential DWH→O3 column mappings using name, type, and context signals.
+
+    Tokenized names are memoized per engine: names registered through
+    ``precompute`` are kept for the engine's lifetime, everything else goes
+    through a bounded LRU cache of ``token_cache_size`` entries.
+    """
 
     def __init__(
         self,
         name_weight: float = 0.6,
         type_weight: float = 0.25,
         context_weight: float = 0.15,
+        token_cache_size: int = 8192,
     ):
+        if token_cache_size < 0:
+            raise ValueError(
+                f"token_cache_size must be >= 0, got {token_cache_size}"
+            )
         self.__name_weight = name_weight
         self.__type_weight = type_weight
         self.__context_weight = context_weight
+        self.__token_cache: OrderedDict[str, _AnalyzedName] = OrderedDict()
+        self.__token_cache_size = token_cache_size
+        self.__precomputed: dict[str, _AnalyzedName] = {}
+        self.__cache_hits = 0
+        self.__cache_misses = 0
+
+    def precompute(self, o3_model: O3DataModel) -> int:
+        """Tokenize every O3 attribute name and key element name ahead of scoring.
+
+        Precomputed names are never evicted, so scoring against the O3 side of
+        the model only does set arithmetic. Returns the number of names held.
+        """
+        names: list[str] = []
+        for ke_name, key_element in o3_model.key_elements.items():
+            names.append(ke_name)
+            names.extend(attr.value_name for attr in key_element.list_attributes)
+        return self.precompute_names(names)
+
+    def precompute_names(self, names: Iterable[str]) -> int:
+        """Tokenize and pin arbitrary names; see ``precompute``. Returns the number of names held."""
+        for name in names:
+            if name not in self.__precomputed:
+                self.__precomputed[name] = self.__token_cache.pop(name, None) or _analyze_name(name)
+        return len(self.__precomputed)
+
+    def token_cache_info(self) -> TokenCacheInfo:
+        """Current hit/miss counters and sizes of the token cache."""
+        return TokenCacheInfo(
+            hits=self.__cache_hits,
+            misses=self.__cache_misses,
+            size=len(self.__token_cache),
+            max_size=self.__token_cache_size,
+            precomputed=len(self.__precomputed),
+        )
+
+    def clear_token_cache(self) -> None:
+        """Drop cached and precomputed tokens and reset the counters."""
+        self.__token_cache.clear()
+        self.__precomputed.clear()
+        self.__cache_hits = 0
+        self.__cache_misses = 0
 
     def score(
         self,
@@ -107,26 +205,101 @@ class MatchEngine:
             },
         )
 
+    def score_batch(
+        self,
+        dwh_columns: Sequence[ScoreInput],
+        o3_attributes: Sequence[ScoreInput],
+        min_score: float,
+    ) -> list[tuple[int, int, MatchCandidate]]:
+        """Score every DWH column against every O3 attribute with NumPy matrix operations.
+
+        Scores are identical to calling ``score`` for each pair, but tokens and
+        type groups are encoded as integer ids and the name, type and context
+        signals are computed as (dwh × o3) matrices. ``MatchCandidate`` objects
+        are only built for pairs whose score reaches min_score.
+
+        Requires NumPy (``pip install py-o3[numpy]``).
+
+        Returns
+        -------
+        list[tuple[int, int, MatchCandidate]]
+            (index into dwh_columns, index into o3_attributes, candidate),
+            in row-major order
+        """
+        np = _import_numpy()
+        if not dwh_columns or not o3_attributes:
+            return []
+
+        name_scores = self.__batch_name_similarity(
+            np, [c.name for c in dwh_columns], [a.name for a in o3_attributes]
+        )
+        type_scores = _batch_type_compatibility(
+            np, [c.data_type for c in dwh_columns], [a.data_type for a in o3_attributes]
+        )
+        context_scores = self.__batch_context_similarity(
+            np, [c.context for c in dwh_columns], [a.context for a in o3_attributes]
+        )
+
+        composite = (
+            name_scores * self.__name_weight
+            + type_scores * self.__type_weight
+            + context_scores * self.__context_weight
+        )
+
+        # The mask keeps a small margin below min_score; the exact rounded
+        # comparison is repeated per surviving pair, as in score().
+        rows, cols = np.nonzero(composite >= min_score - 1e-4)
+
+        results: list[tuple[int, int, MatchCandidate]] = []
+        for i, j in zip(rows.tolist(), cols.tolist(), strict=True):
+            score = round(float(composite[i, j]), 4)
+            if score < min_score:
+                continue
+            results.append((
+                i,
+                j,
+                MatchCandidate(
+                    dwh_source=dwh_columns[i].name,
+                    o3_target=o3_attributes[j].name,
+                    score=score,
+                    signals={
+                        "name": round(float(name_scores[i, j]), 4),
+                        "type": round(float(type_scores[i, j]), 4),
+                        "context": round(float(context_scores[i, j]), 4),
+                    },
+                ),
+            ))
+        return results
+
+    def requires_name_overlap(self, min_score: float) -> bool:
+        """True when type and context signals alone can never reach min_score.
+
+        In that case only O3 attributes that share a name token (or token
+        prefix) with the DWH column need to be scored at all.
+        """
+        ceiling = max(self.__type_weight, 0.0) + max(self.__context_weight, 0.0)
+        return round(ceiling, 4) < min_score
+
     def _name_similarity(self, dwh_name: str, o3_name: str) -> float:
         """Token-overlap similarity after stripping common prefixes."""
+        dwh_stripped, dwh_tokens = self.__analyze(dwh_name)
+        o3_stripped, o3_tokens = self.__analyze(o3_name)
+
         # Compare lowered prefix-stripped strings for exact equivalence
-        dwh_stripped = _STRIP_PREFIXES.sub("", dwh_name).lower()
-        o3_stripped = _STRIP_PREFIXES.sub("", o3_name).lower()
         if dwh_stripped and o3_stripped and dwh_stripped == o3_stripped:
             return 1.0
 
-        dwh_tokens = self.__tokenize(dwh_name)
-        o3_tokens = self.__tokenize(o3_name)
-
         if not dwh_tokens or not o3_tokens:
             return 0.0
 
-        # Count partial matches: token A matches token B if one starts with the other
-        matched = 0
+        # Count partial matches: token A matches token B if one starts with the other.
+        # Exact matches are counted by set intersection; only the rest need a prefix scan.
+        shared = dwh_tokens & o3_tokens
+        matched = len(shared)
         all_tokens = dwh_tokens | o3_tokens
-        for dt in dwh_tokens:
+        for dt in dwh_tokens - shared:
             for ot in o3_tokens:
-                if dt == ot or dt.startswith(ot) or ot.startswith(dt):
+                if dt.startswith(ot) or ot.startswith(dt):
                     matched += 1
                     break
 
@@ -155,8 +328,8 @@ class MatchEngine:
         if dwh_context is None or o3_context is None:
             return 0.0
 
-        dwh_tokens = self.__tokenize(dwh_context)
-        o3_tokens = self.__tokenize(o3_context)
+        dwh_tokens = self.__analyze(dwh_context)[1]
+        o3_tokens = self.__analyze(o3_context)[1]
 
         if not dwh_tokens or not o3_tokens:
             return 0.0
@@ -166,13 +339,142 @@ class MatchEngine:
 
         return len(intersection) / len(union)
 
-    def __tokenize(self, name: str) -> set[str]:
-        """Split a name into lowercase tokens, stripping common prefixes."""
-        stripped = _STRIP_PREFIXES.sub("", name)
-        if not stripped:
-            stripped = name
-        tokens = _TOKEN_SPLIT.findall(stripped)
-        return {t.lower() for t in tokens if len(t) > 1}
+    def __batch_name_similarity(self, np, dwh_names: list[str], o3_names: list[str]):
+        """(dwh × o3) matrix of ``_name_similarity`` values."""
+        dwh_analyzed = [self.__analyze(n) for n in dwh_names]
+        o3_analyzed = [self.__analyze(n) for n in o3_names]
+
+        vocabulary: dict[str, int] = {}
+        for _, tokens in dwh_analyzed + o3_analyzed:
+            for token in tokens:
+                vocabulary.setdefault(token, len(vocabulary))
+
+        dwh_incidence = _incidence(np, [tokens for _, tokens in dwh_analyzed], vocabulary)
+        o3_incidence = _incidence(np, [tokens for _, tokens in o3_analyzed], vocabulary)
+
+        # For each O3 name, every vocabulary token that equals, starts with, or
+        # is a prefix of one of its tokens; a DWH token in that set is "matched".
+        by_prefix: dict[str, list[int]] = {}
+        for token, token_id in vocabulary.items():
+            for end in range(2, len(token) + 1):
+                by_prefix.setdefault(token[:end], []).append(token_id)
+
+        related = np.zeros((len(o3_analyzed), len(vocabulary)), dtype=np.float32)
+        for j, (_, tokens) in enumerate(o3_analyzed):
+            for token in tokens:
+                related[j, by_prefix[token]] = 1.0
+                for end in range(2, len(token)):
+                    prefix_id = vocabulary.get(token[:end])
+                    if prefix_id is not None:
+                        related[j, prefix_id] = 1.0
+
+        matched = (dwh_incidence @ related.T).astype(np.float64)
+        intersection = (dwh_incidence @ o3_incidence.T).astype(np.float64)
+        union = (
+            dwh_incidence.sum(axis=1, dtype=np.float64)[:, None]
+            + o3_incidence.sum(axis=1, dtype=np.float64)[None, :]
+            - intersection
+        )
+        scores = np.divide(matched, union, out=np.zeros_like(matched), where=union > 0)
+
+        # Exact equivalence of prefix-stripped names overrides token overlap
+        normalized_ids: dict[str, int] = {}
+        dwh_normalized = np.array(
+            [normalized_ids.setdefault(n, len(normalized_ids)) if n else -1 for n, _ in dwh_analyzed]
+        )
+        o3_normalized = np.array(
+            [normalized_ids.setdefault(n, len(normalized_ids)) if n else -2 for n, _ in o3_analyzed]
+        )
+        scores[dwh_normalized[:, None] == o3_normalized[None, :]] = 1.0
+        return scores
+
+    def __batch_context_similarity(
+        self, np, dwh_contexts: list[str | None], o3_contexts: list[str | None]
+    ):
+        """(dwh × o3) matrix of ``_context_similarity`` values, computed per distinct context pair."""
+        dwh_unique = list(dict.fromkeys(dwh_contexts))
+        o3_unique = list(dict.fromkeys(o3_contexts))
+
+        # None contexts get an empty token set, which always scores 0.0
+        dwh_tokens = [self.__analyze(c)[1] if c is not None else frozenset() for c in dwh_unique]
+        o3_tokens = [self.__analyze(c)[1] if c is not None else frozenset() for c in o3_unique]
+
+        vocabulary: dict[str, int] = {}
+        for tokens in dwh_tokens + o3_tokens:
+            for token in tokens:
+                vocabulary.setdefault(token, len(vocabulary))
+
+        dwh_incidence = _incidence(np, dwh_tokens, vocabulary)
+        o3_incidence = _incidence(np, o3_tokens, vocabulary)
+        intersection = (dwh_incidence @ o3_incidence.T).astype(np.float64)
+        union = (
+            dwh_incidence.sum(axis=1, dtype=np.float64)[:, None]
+            + o3_incidence.sum(axis=1, dtype=np.float64)[None, :]
+            - intersection
+        )
+        jaccard = np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+        dwh_positions = {c: i for i, c in enumerate(dwh_unique)}
+        o3_positions = {c: i for i, c in enumerate(o3_unique)}
+        dwh_index = np.array([dwh_positions[c] for c in dwh_contexts])
+        o3_index = np.array([o3_positions[c] for c in o3_contexts])
+        return jaccard[dwh_index[:, None], o3_index[None, :]]
+
+    def __analyze(self, name: str) -> _AnalyzedName:
+        """Return the prefix-stripped name and tokens for name, using the token cache."""
+        analyzed = self.__precomputed.get(name)
+        if analyzed is not None:
+            self.__cache_hits += 1
+            return analyzed
+
+        analyzed = self.__token_cache.get(name)
+        if analyzed is not None:
+            self.__cache_hits += 1
+            self.__token_cache.move_to_end(name)
+            return analyzed
+
+        self.__cache_misses += 1
+        analyzed = _analyze_name(name)
+        if self.__token_cache_size > 0:
+            self.__token_cache[name] = analyzed
+            if len(self.__token_cache) > self.__token_cache_size:
+                self.__token_cache.popitem(last=False)
+        return analyzed
+
+
+def _analyze_name(name: str) -> _AnalyzedName:
+    """Normalize and tokenize a name, interning tokens so equal tokens share one string."""
+    return normalize_name(name), frozenset(sys.intern(t) for t in tokenize(name))
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError(
+            "MatchEngine.score_batch requires NumPy; "
+            "install it with `pip install py-o3[numpy]`."
+        ) from e
+    return numpy
+
+
+def _incidence(np, token_sets: list[frozenset[str]], vocabulary: dict[str, int]):
+    """Binary (names × vocabulary) matrix marking which tokens each name contains."""
+    matrix = np.zeros((len(token_sets), len(vocabulary)), dtype=np.float32)
+    for row, tokens in enumerate(token_sets):
+        matrix[row, [vocabulary[t] for t in tokens]] = 1.0
+    return matrix
+
+
+def _batch_type_compatibility(np, dwh_types: list[str], o3_types: list[str]):
+    """(dwh × o3) matrix of ``_type_compatibility`` values from integer type-group ids."""
+    dwh_groups = np.array([_GROUP_IDS.get(_TYPE_TO_GROUP.get(t.lower()), -1) for t in dwh_types])
+    o3_groups = np.array([_GROUP_IDS.get(_TYPE_TO_GROUP.get(t.lower()), -1) for t in o3_types])
+
+    dwh_known = (dwh_groups >= 0)[:, None]
+    o3_known = (o3_groups >= 0)[None, :]
+    same_group = dwh_known & (dwh_groups[:, None] == o3_groups[None, :])
+    return np.where(same_group, 1.0, np.where(dwh_known & o3_known, 0.0, 0.3))
 
 
 if __name__ == "__main__":
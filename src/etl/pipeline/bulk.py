@@ -0,0 +1,106 @@
+"""Client-mediated bulk copy of extract rows into a staging table."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+
+from helpers.memory import row_bytes
+
+
+@dataclass
+class BulkLoadOptions:
+    """Settings for loading through a staging table on the target connection.
+
+    ``chunk_size`` rows are sent per ``executemany`` call, fewer when a chunk
+    would exceed ``max_chunk_bytes`` (an estimate of the Python memory the
+    buffered rows hold). ``merge_keys`` maps an O3 table to the columns its
+    staged rows are upserted on; tables without keys are appended to.
+    """
+
+    chunk_size: int = 10_000
+    max_chunk_bytes: int = 64 * 1024 * 1024
+    merge_keys: dict[str, list[str]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if self.chunk_size < 1:
+            raise ValueError(f"chunk_size must be >= 1, got {self.chunk_size}")
+        if self.max_chunk_bytes < 1:
+            raise ValueError(
+                f"max_chunk_bytes must be >= 1, got {self.max_chunk_bytes}"
+            )
+
+
+@dataclass
+class CopyResult:
+    """Rows copied into staging and the highest value seen in a tracked column."""
+
+    rows: int = 0
+    chunks: int = 0
+    high_value: object = None
+
+
+def copy_rows(
+    source_cursor,
+    target_cursor,
+    insert_sql: str,
+    source_columns: Sequence[str],
+    options: BulkLoadOptions,
+    track_column: str | None = None,
+) -> CopyResult:
+    """Stream the executed ``source_cursor`` into ``target_cursor`` in chunks.
+
+    ``source_columns`` names the result columns bound to ``insert_sql``'s
+    parameters, in order. ``track_column`` optionally names a result column
+    whose maximum is reported in ``CopyResult.high_value``.
+    """
+    names = [d[0] for d in source_cursor.description]
+    missing = [c for c in source_columns if c not in names]
+    if missing:
+        raise ValueError(
+            f"Extract result has no column(s) {missing}. Available: {names}"
+        )
+    indexes = [names.index(c) for c in source_columns]
+    track_index = names.index(track_column) if track_column in names else None
+
+    target_cursor.fast_executemany = True
+    result = CopyResult()
+    for chunk in _iter_chunks(source_cursor, options):
+        params = [tuple(row[i] for i in indexes) for row in chunk]
+        target_cursor.executemany(insert_sql, params)
+        result.rows += len(params)
+        result.chunks += 1
+        if track_index is not None:
+            values = [row[track_index] for row in chunk if row[track_index] is not None]
+            if values:
+                chunk_high = max(values)
+                if result.high_value is None or chunk_high > result.high_value:
+                    result.high_value = chunk_high
+    return result
+
+
+def _iter_chunks(cursor, options: BulkLoadOptions) -> Iterator[list]:
+    """Yield lists of fetched rows bounded by chunk_size and max_chunk_bytes."""
+    # Fetch in smaller steps than a chunk so the byte ceiling is checked often
+    fetch_size = min(options.chunk_size, 1000)
+    cursor.arraysize = fetch_size
+
+    chunk: list = []
+    chunk_bytes = 0
+    while True:
+        rows = cursor.fetchmany(fetch_size)
+        if not rows:
+            break
+        for row in rows:
+            chunk.append(row)
+            chunk_bytes += row_bytes(row)
+            if len(chunk) >= options.chunk_size or chunk_bytes >= options.max_chunk_bytes:
+                yield chunk
+                chunk = []
+                chunk_bytes = 0
+    if chunk:
+        yield chunk
+
+
+if __name__ == "__main__":
+    pass
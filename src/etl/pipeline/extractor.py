@@ -2,12 +2,18 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 
 from etl.mapping.mapping_store import CrosswalkEntry
 from etl.manifest import SemanticManifest
+from etl.pipeline.plan_cache import QueryPlanCache, fingerprint
+from etl.pipeline.watermark import WatermarkStore
 from etl.registry import ModelRegistry, JoinSpec
 
+# Extra column an incremental extract projects so the load can read the
+# highest date key it loaded.
+WATERMARK_ALIAS = "_WatermarkDateKey"
+
 
 @dataclass
 class ExtractQuery:
@@ -20,41 +26,122 @@ class ExtractQuery:
     date_key: str
     joins: list[JoinSpec]
     columns_mapped: list[CrosswalkEntry]
+    incremental: bool = False
+    watermark: int | None = None  # inclusive lower bound on date_key
+    # Values for the ``?`` placeholders in sql, in order, and what each one is
+    params: tuple = ()
+    param_names: tuple[str, ...] = ()
+
+
+def inline_params(sql: str, params: tuple) -> str:
+    """Replace the ``?`` placeholders in generated SQL with literal values.
+
+    Used to write standalone SQL files. Placeholders inside quoted strings
+    and identifiers are left alone; values must be ints, as every
+    parameter the extractor binds is.
+    """
+    values = iter(params)
+    parts = []
+    quote = None
+    for char in sql:
+        if quote is not None:
+            if char == quote:
+                quote = None
+        elif char in ("'", "["):
+            quote = "'" if char == "'" else "]"
+        elif char == "?":
+            value = next(values, None)
+            if value is None:
+                raise ValueError("SQL has more placeholders than parameters")
+            if not isinstance(value, int):
+                raise ValueError(f"Cannot inline non-integer parameter {value!r}")
+            char = str(value)
+        parts.append(char)
+    if next(values, None) is not None:
+        raise ValueError("SQL has fewer placeholders than parameters")
+    return "".join(parts)
 
 
 class Extractor:
-    """Generates SELECT SQL from DWH models guided by crosswalk entries."""
+    """Generates SELECT SQL from DWH models guided by crosswalk entries.
+
+    Active crosswalk entries are indexed by model name and by DWH table,
+    and dimension joins by their ``from_column``, when the extractor is
+    created, so generating a query costs time in proportion to the entries
+    and joins it uses rather than the size of the crosswalk.
+
+    With ``plan_cache`` generated queries are reused while the crosswalk,
+    registry and manifest are unchanged. The row limit, lookback and
+    watermark are bound parameters, so one cached query serves every value.
+    """
 
     def __init__(
         self,
         crosswalk: list[CrosswalkEntry],
         manifest: SemanticManifest,
         registry: ModelRegistry,
+        plan_cache: QueryPlanCache | None = None,
     ):
         self.__crosswalk = crosswalk
         self.__manifest = manifest
         self.__registry = registry
+        self.__plan_cache = plan_cache
+        self.__fingerprint: str | None = None
+
+        # Positions of active entries, ascending, so merged lookups keep
+        # crosswalk order
+        self.__by_model: dict[str | None, list[int]] = {}
+        self.__by_table: dict[str, list[int]] = {}
+        for position, entry in enumerate(crosswalk):
+            if entry.is_active:
+                self.__by_model.setdefault(entry.model_name, []).append(position)
+                self.__by_table.setdefault(entry.dwh_table, []).append(position)
+
+        default_deny = frozenset(registry.field_policy_defaults.deny_list)
+        self.__default_deny = default_deny
+        self.__deny_by_model: dict[str, frozenset[str]] = {
+            name: default_deny | frozenset(config.field_policy.deny_list)
+            for name, config in registry.models.items()
+        }
+        self.__joins_by_model: dict[str, dict[str, list[JoinSpec]]] = {}
+        for name, config in registry.models.items():
+            joins: dict[str, list[JoinSpec]] = {}
+            for join in config.join_policy.allowed_dimension_joins:
+                joins.setdefault(join.from_column, []).append(join)
+            self.__joins_by_model[name] = joins
 
     def generate_query(
         self,
         entry_point: str,
         date_basis: str | None = None,
         lookback_days: int | None = None,
+        watermarks: WatermarkStore | None = None,
     ) -> ExtractQuery:
-        """Generate a SELECT query for a given entry point."""
+        """Generate a SELECT query for a given entry point.
+
+        With ``watermarks`` the query is incremental: it selects only rows
+        whose date key is on or after the entry point's stored watermark (or
+        inside the lookback window when none is stored yet), projects the
+        date key as ``WATERMARK_ALIAS`` and returns the oldest rows first,
+        so a row limit never leaves a gap below the new watermark. The
+        watermark is a day-granular key, so the watermark day is read
+        again: rows for it that arrived after the last run are not lost,
+        and the incremental loads skip the ones already loaded. Rows of the
+        watermark day do not count towards the row limit, so a busy day
+        cannot stall the watermark.
+
+        The row limit, lookback and watermark are bound through
+        ``ExtractQuery.params`` rather than written into the SQL, so the
+        server reuses one compiled plan whatever their values.
+        """
         if entry_point not in self.__registry.entry_points:
             raise ValueError(
                 f"Unknown entry point '{entry_point}'; "
                 f"valid: {list(self.__registry.entry_points.keys())}"
             )
 
-        ep = self.__registry.entry_points[entry_point]
-        model_name = ep.preferred_conceptual_model
-        model_config = self.__registry.models.get(model_name)
-        base_table = ep.base_table
-
         # Resolve date key
-        time_policy = ep.time_policy
+        time_policy = self.__registry.entry_points[entry_point].time_policy
         if date_basis and time_policy.date_basis:
             date_key = time_policy.date_basis.resolve(date_basis)
         else:
@@ -67,24 +154,77 @@ class Extractor:
         else:
             lookback = 90
 
-        # Collect deny list
-        deny = set(self.__registry.field_policy_defaults.deny_list)
-        if model_config:
-            deny |= set(model_config.field_policy.deny_list)
+        incremental = watermarks is not None
+        watermark = None
+        if incremental:
+            if not date_key:
+                raise ValueError(
+                    f"Entry point '{entry_point}' has no date key; "
+                    f"it cannot be extracted incrementally."
+                )
+            watermark = watermarks.get(entry_point, date_key)
 
-        # Filter crosswalk entries for this entry point's base table
-        relevant = [
-            e
-            for e in self.__crosswalk
-            if e.is_active
-            and e.dwh_column not in deny
-            and (e.model_alias or e.dwh_column) not in deny
-        ]
+        has_watermark = watermark is not None
+
+        def build() -> ExtractQuery:
+            return self.__build_query(
+                entry_point, date_key, incremental, has_watermark
+            )
 
-        # Filter to entries related to this model or base table
+        if self.__plan_cache is None:
+            query = build()
+        else:
+            query = self.__plan_cache.get_or_create(
+                self.__cache_namespace(),
+                ("extract", entry_point, date_key, incremental, has_watermark),
+                build,
+            )
+
+        values = {
+            "row_limit": self.__registry.global_policy.query_safety.default_row_limit,
+            "lookback_days": lookback,
+            "watermark": watermark,
+        }
+        return replace(
+            query,
+            watermark=watermark,
+            params=tuple(values[name] for name in query.param_names),
+        )
+
+    def __cache_namespace(self) -> str:
+        """Fingerprint of the inputs queries are generated from."""
+        if self.__fingerprint is None:
+            self.__fingerprint = fingerprint(
+                "extract", self.__crosswalk, self.__registry, self.__manifest
+            )
+        return self.__fingerprint
+
+    def __build_query(
+        self,
+        entry_point: str,
+        date_key: str,
+        incremental: bool,
+        has_watermark: bool,
+    ) -> ExtractQuery:
+        """Generate the SQL for an entry point; parameter values are bound later."""
+        ep = self.__registry.entry_points[entry_point]
+        model_name = ep.preferred_conceptual_model
+        model_config = self.__registry.models.get(model_name)
+        base_table = ep.base_table
+
+        deny = self.__deny_by_model.get(model_name, self.__default_deny)
+
+        # Active entries for this model or base table, in crosswalk order,
+        # without denied columns
+        positions = sorted(
+            set(self.__by_model.get(model_name, ()))
+            | set(self.__by_table.get(base_table, ()))
+        )
         model_entries = [
-            e for e in relevant
-            if e.model_name == model_name or e.dwh_table == base_table
+            e
+            for e in (self.__crosswalk[p] for p in positions)
+            if e.dwh_column not in deny
+            and (e.model_alias or e.dwh_column) not in deny
         ]
 
         if not model_entries:
@@ -97,13 +237,11 @@ class Extractor:
         # Determine which dimension joins are needed
         needed_joins: list[JoinSpec] = []
         if model_config:
+            joins_by_column = self.__joins_by_model[model_name]
             joined_tables = set()
             for entry in model_entries:
-                for join in model_config.join_policy.allowed_dimension_joins:
-                    if (
-                        join.from_column == entry.dwh_column
-                        and join.table not in joined_tables
-                    ):
+                for join in joins_by_column.get(entry.dwh_column, ()):
+                    if join.table not in joined_tables:
                         needed_joins.append(join)
                         joined_tables.add(join.table)
 
@@ -115,10 +253,24 @@ class Extractor:
                 select_columns.append(f"  {entry.model_expr} AS [{alias}]")
             else:
                 select_columns.append(f"  base.[{entry.dwh_column}]")
+        if incremental:
+            select_columns.append(f"  base.[{date_key}] AS [{WATERMARK_ALIAS}]")
 
         # Build SQL
-        row_limit = self.__registry.global_policy.query_safety.default_row_limit
-        select_clause = f"SELECT TOP {row_limit}\n" + ",\n".join(select_columns)
+        param_names = ["row_limit"]
+        if has_watermark:
+            # The re-read watermark day is added to the limit, so new days always fit
+            top = (
+                f"TOP (? + (SELECT COUNT_BIG(*) FROM {base_table} "
+                f"WHERE [{date_key}] = ?)) WITH TIES"
+            )
+            param_names.append("watermark")
+        elif incremental:
+            # WITH TIES keeps every row sharing the last date key loaded
+            top = "TOP (?) WITH TIES"
+        else:
+            top = "TOP (?)"
+        select_clause = f"SELECT {top}\n" + ",\n".join(select_columns)
         from_clause = f"FROM {base_table} AS base"
 
         join_clauses = []
@@ -134,17 +286,24 @@ class Extractor:
             in self.__registry.global_policy.query_safety.require_date_filter_for_tables
         )
         where_clause = ""
-        if date_key and requires_date:
+        if has_watermark:
+            # Inclusive: the day-granular watermark day may still be receiving rows
+            where_clause = f"WHERE base.[{date_key}] >= ?"
+            param_names.append("watermark")
+        elif date_key and (requires_date or incremental):
             where_clause = (
                 f"WHERE base.[{date_key}] >= "
-                f"(SELECT DimDateID FROM DWH.DimDate WHERE FullDate = CAST(DATEADD(DAY, -{lookback}, GETDATE()) AS DATE))"
+                f"(SELECT DimDateID FROM DWH.DimDate WHERE FullDate = CAST(DATEADD(DAY, -CAST(? AS INT), GETDATE()) AS DATE))"
             )
+            param_names.append("lookback_days")
 
         parts = [select_clause, from_clause]
         if join_clauses:
             parts.extend(join_clauses)
         if where_clause:
             parts.append(where_clause)
+        if incremental:
+            parts.append(f"ORDER BY base.[{date_key}]")
 
         sql = "\n".join(parts)
 
@@ -156,19 +315,24 @@ class Extractor:
             date_key=date_key,
             joins=needed_joins,
             columns_mapped=model_entries,
+            incremental=incremental,
+            param_names=tuple(param_names),
         )
 
     def generate_all_queries(
         self,
         date_basis: str | None = None,
         lookback_days: int | None = None,
+        watermarks: WatermarkStore | None = None,
     ) -> list[ExtractQuery]:
         """Generate extract queries for all entry points."""
         results = []
         errors = []
         for ep in self.__registry.entry_points:
             try:
-                results.append(self.generate_query(ep, date_basis, lookback_days))
+                results.append(
+                    self.generate_query(ep, date_basis, lookback_days, watermarks)
+                )
             except Exception as e:
                 errors.append(
                     f"Entry point '{ep}': {type(e).__name__}: {e}"
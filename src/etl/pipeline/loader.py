@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections.abc import Callable
+from dataclasses import astuple, dataclass, field
+from typing import TypeVar
 
-from etl.pipeline.extractor import ExtractQuery
+from etl.pipeline.extractor import ExtractQuery, WATERMARK_ALIAS
+from etl.pipeline.plan_cache import QueryPlanCache, fingerprint
 from helpers.string_helpers import leave_only_letters_numbers_or_underscore
 from api.data_model import O3DataModel
 
@@ -18,17 +21,68 @@ class LoadCommand:
     column_map: dict[str, str]  # {o3_column: source_alias}
 
 
+@dataclass
+class StagedLoadCommand:
+    """SQL for a client-mediated load through a session staging table.
+
+    Rows are inserted into ``staging_table`` with ``insert_sql`` (one
+    ``?`` parameter per ``column_map`` entry, in order) and moved into the
+    target by ``load_sql``.
+    """
+
+    target_table: str
+    staging_table: str
+    create_sql: str
+    insert_sql: str
+    load_sql: str
+    drop_sql: str
+    column_map: dict[str, str]  # {o3_column: source_alias}
+
+
+@dataclass
+class BatchedMergeOptions:
+    """Settings for upserting through an indexed temp table in batches.
+
+    ``merge_keys`` maps an O3 table to the columns its rows are matched
+    on; only those tables use the batched merge. The default
+    ``batch_size`` stays below SQL Server's 5,000-lock escalation threshold.
+    """
+
+    merge_keys: dict[str, list[str]] = field(default_factory=dict)
+    batch_size: int = 4000
+
+    def __post_init__(self):
+        if self.batch_size < 1:
+            raise ValueError(f"batch_size must be >= 1, got {self.batch_size}")
+
+
+_Plan = TypeVar("_Plan")
+
+
 class Loader:
-    """Generates INSERT/MERGE SQL for loading into O3 tables (MSSQL dialect)."""
+    """Generates INSERT/MERGE SQL for loading into O3 tables (MSSQL dialect).
+
+    With ``plan_cache`` generated commands are reused for the same extract
+    SQL, mapped columns and arguments while the O3 model's key element
+    tables are unchanged.
+    """
 
     def __init__(
         self,
         o3_model: O3DataModel,
+        plan_cache: QueryPlanCache | None = None,
     ):
         self.__o3_model = o3_model
+        self.__plan_cache = plan_cache
+        self.__fingerprint: str | None = None
 
     def generate_insert(self, extract: ExtractQuery) -> LoadCommand:
         """Generate an INSERT INTO ... SELECT statement."""
+        return self.__cached(
+            "insert", extract, (), lambda: self.__insert(extract)
+        )
+
+    def __insert(self, extract: ExtractQuery) -> LoadCommand:
         column_map, target_table = self.__build_column_map(extract)
 
         if not column_map:
@@ -50,10 +104,148 @@ class Loader:
 
         return LoadCommand(target_table=target_table, sql=sql, column_map=column_map)
 
+    def generate_counted_insert(self, extract: ExtractQuery) -> LoadCommand:
+        """Generate an INSERT INTO ... SELECT batch that reports its own row count.
+
+        The batch runs the extract once, inside the INSERT, and returns a
+        single row holding ``ROWCOUNT_BIG()`` so the caller can count rows
+        without fetching them.
+        """
+        return self.__cached(
+            "counted_insert", extract, (), lambda: self.__counted_insert(extract)
+        )
+
+    def __counted_insert(self, extract: ExtractQuery) -> LoadCommand:
+        insert = self.generate_insert(extract)
+        # NOCOUNT is session-wide, so restore it for later statements on the
+        # connection; SET resets ROWCOUNT_BIG(), hence the variable.
+        sql = (
+            "SET NOCOUNT ON;\n"
+            f"{insert.sql};\n"
+            "DECLARE @RowsLoaded BIGINT = ROWCOUNT_BIG();\n"
+            "SET NOCOUNT OFF;\n"
+            "SELECT @RowsLoaded AS RowsLoaded;"
+        )
+        return LoadCommand(
+            target_table=insert.target_table, sql=sql, column_map=insert.column_map
+        )
+
+    def generate_incremental_insert(self, extract: ExtractQuery) -> LoadCommand:
+        """Generate a batch that loads an incremental extract and reports its
+        row count and the highest date key it loaded.
+
+        The extract is staged once in ``#Extract`` so the watermark is read
+        from exactly the rows inserted. The batch returns a single row of
+        ``(RowsLoaded, HighWatermark)``; ``HighWatermark`` is NULL when no
+        rows were loaded.
+        """
+        return self.__cached(
+            "incremental_insert",
+            extract,
+            (),
+            lambda: self.__incremental_insert(extract),
+        )
+
+    def __incremental_insert(self, extract: ExtractQuery) -> LoadCommand:
+        if not extract.incremental:
+            raise ValueError(
+                f"Extract for '{extract.entry_point}' is not incremental; "
+                f"generate it with a watermark store."
+            )
+        column_map, target_table = self.__build_column_map(extract)
+
+        if not column_map:
+            raise ValueError(
+                f"No mapped columns for target table '{target_table}'. "
+                f"Check the crosswalk entries in the extract query."
+            )
+
+        o3_columns = ", ".join(f"[{col}]" for col in column_map)
+        source_columns = ", ".join(
+            f"src.[{alias}]" for alias in column_map.values()
+        )
+
+        # The extract re-reads the watermark day, its earliest; rows of that
+        # day already in the target are skipped
+        sql = (
+            "SET NOCOUNT ON;\n"
+            f"SELECT src.* INTO #Extract\nFROM (\n{extract.sql}\n) AS src;\n"
+            f"DECLARE @OverlapDay BIGINT = (SELECT MIN([{WATERMARK_ALIAS}]) FROM #Extract);\n"
+            f"INSERT INTO {target_table} ({o3_columns})\n"
+            f"SELECT {source_columns}\n"
+            "FROM #Extract AS src\n"
+            f"WHERE src.[{WATERMARK_ALIAS}] > @OverlapDay\n"
+            f"   OR {_not_loaded(target_table, column_map)};\n"
+            "DECLARE @RowsLoaded BIGINT = ROWCOUNT_BIG();\n"
+            f"DECLARE @HighWatermark BIGINT = (SELECT MAX([{WATERMARK_ALIAS}]) FROM #Extract);\n"
+            "DROP TABLE #Extract;\n"
+            "SET NOCOUNT OFF;\n"
+            "SELECT @RowsLoaded AS RowsLoaded, @HighWatermark AS HighWatermark;"
+        )
+
+        return LoadCommand(target_table=target_table, sql=sql, column_map=column_map)
+
     def generate_merge(
         self, extract: ExtractQuery, merge_key: list[str]
     ) -> LoadCommand:
         """Generate a MERGE (upsert) statement."""
+        return self.__cached(
+            "merge",
+            extract,
+            (tuple(merge_key),),
+            lambda: self.__merge(extract, merge_key),
+        )
+
+    def __merge(
+        self, extract: ExtractQuery, merge_key: list[str]
+    ) -> LoadCommand:
+        column_map, target_table = self.__build_column_map(extract)
+
+        if not column_map:
+            raise ValueError(
+                f"No mapped columns for target table '{target_table}'. "
+                f"Check the crosswalk entries in the extract query."
+            )
+
+        sql = self.__merge_sql(
+            target_table, f"(\n{extract.sql}\n)", column_map, merge_key
+        )
+        return LoadCommand(target_table=target_table, sql=sql, column_map=column_map)
+
+    def generate_batched_merge(
+        self, extract: ExtractQuery, merge_key: list[str], batch_size: int = 4000
+    ) -> LoadCommand:
+        """Generate an upsert that stages the extract in an indexed temp table
+        and applies it in ``TOP (batch_size)`` loops.
+
+        The extract is materialised once into ``#MergeSource`` with a unique
+        clustered index on the merge keys (so duplicate source keys fail, as
+        they would in a MERGE). Rows whose values differ are then updated,
+        and missing rows inserted, ``batch_size`` at a time with a COMMIT
+        after each batch, which bounds log growth and lock escalation.
+
+        Staged rows with a NULL merge key can never match a target row, so
+        they are removed before the loops and counted as skipped.
+
+        The batch returns one row of ``(RowsStaged, RowsUpdated,
+        RowsInserted, HighWatermark, RowsSkipped)``; ``HighWatermark`` is the
+        highest date key staged for an incremental extract and NULL otherwise.
+        """
+        return self.__cached(
+            "batched_merge",
+            extract,
+            (tuple(merge_key), batch_size),
+            lambda: self.__batched_merge(extract, merge_key, batch_size),
+        )
+
+    def __batched_merge(
+        self, extract: ExtractQuery, merge_key: list[str], batch_size: int = 4000
+    ) -> LoadCommand:
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be >= 1, got {batch_size}")
+        if not merge_key:
+            raise ValueError("merge_key must name at least one column")
+
         column_map, target_table = self.__build_column_map(extract)
 
         if not column_map:
@@ -69,6 +261,182 @@ class Loader:
                 f"{target_table}. Available: {list(column_map.keys())}"
             )
 
+        staged_columns = [
+            f"src.[{alias}] AS [{col}]" for col, alias in column_map.items()
+        ]
+        if extract.incremental:
+            staged_columns.append(f"src.[{WATERMARK_ALIAS}]")
+        key_columns = ", ".join(f"[{k}]" for k in merge_key)
+        null_key = " OR ".join(f"[{k}] IS NULL" for k in merge_key)
+        key_match = " AND ".join(
+            f"target.[{k}] = source.[{k}]" for k in merge_key
+        )
+        value_columns = [c for c in column_map if c not in merge_key]
+        insert_cols = ", ".join(f"[{c}]" for c in column_map)
+        insert_vals = ", ".join(f"source.[{c}]" for c in column_map)
+
+        sql_parts = [
+            "SET NOCOUNT ON;",
+            f"DECLARE @BatchSize INT = {int(batch_size)};",
+            "DECLARE @Rows INT;",
+            "DECLARE @RowsStaged BIGINT;",
+            "DECLARE @RowsUpdated BIGINT = 0;",
+            "DECLARE @RowsInserted BIGINT = 0;",
+            "DECLARE @RowsSkipped BIGINT;",
+            "DECLARE @HighWatermark BIGINT;",
+            "DROP TABLE IF EXISTS #MergeSource;",
+            "SELECT " + ", ".join(staged_columns),
+            "INTO #MergeSource",
+            f"FROM (\n{extract.sql}\n) AS src;",
+            "SET @RowsStaged = @@ROWCOUNT;",
+            f"DELETE FROM #MergeSource WHERE {null_key};",
+            "SET @RowsSkipped = @@ROWCOUNT;",
+            f"CREATE UNIQUE CLUSTERED INDEX IX_MergeSource ON #MergeSource ({key_columns});",
+            "IF @@TRANCOUNT > 0 COMMIT;",
+        ]
+
+        if value_columns:
+            set_clause = ",\n    ".join(
+                f"target.[{c}] = source.[{c}]" for c in value_columns
+            )
+            # EXCEPT compares NULLs as equal, so unchanged rows are skipped
+            # and every pass makes progress.
+            source_values = ", ".join(f"source.[{c}]" for c in value_columns)
+            target_values = ", ".join(f"target.[{c}]" for c in value_columns)
+            sql_parts += [
+                "WHILE 1 = 1",
+                "BEGIN",
+                "  UPDATE TOP (@BatchSize) target",
+                f"  SET {set_clause}",
+                f"  FROM {target_table} AS target",
+                "  INNER JOIN #MergeSource AS source",
+                f"    ON {key_match}",
+                f"  WHERE EXISTS (SELECT {source_values} EXCEPT SELECT {target_values});",
+                "  SET @Rows = @@ROWCOUNT;",
+                "  SET @RowsUpdated += @Rows;",
+                "  IF @@TRANCOUNT > 0 COMMIT;",
+                "  IF @Rows < @BatchSize BREAK;",
+                "END;",
+            ]
+
+        sql_parts += [
+            "WHILE 1 = 1",
+            "BEGIN",
+            f"  INSERT TOP (@BatchSize) INTO {target_table} ({insert_cols})",
+            f"  SELECT {insert_vals}",
+            "  FROM #MergeSource AS source",
+            "  WHERE NOT EXISTS (",
+            f"    SELECT 1 FROM {target_table} AS target WHERE {key_match}",
+            "  );",
+            "  SET @Rows = @@ROWCOUNT;",
+            "  SET @RowsInserted += @Rows;",
+            "  IF @@TRANCOUNT > 0 COMMIT;",
+            "  IF @Rows < @BatchSize BREAK;",
+            "END;",
+        ]
+
+        if extract.incremental:
+            sql_parts.append(
+                f"SELECT @HighWatermark = MAX([{WATERMARK_ALIAS}]) FROM #MergeSource;"
+            )
+        sql_parts += [
+            "DROP TABLE #MergeSource;",
+            # NOCOUNT lasts for the session; later loads read cursor.rowcount
+            "SET NOCOUNT OFF;",
+            "SELECT @RowsStaged AS RowsStaged, @RowsUpdated AS RowsUpdated, "
+            "@RowsInserted AS RowsInserted, @HighWatermark AS HighWatermark, "
+            "@RowsSkipped AS RowsSkipped;",
+        ]
+
+        sql = "\n".join(sql_parts)
+
+        return LoadCommand(target_table=target_table, sql=sql, column_map=column_map)
+
+    def generate_staged_load(
+        self, extract: ExtractQuery, merge_key: list[str] | None = None
+    ) -> StagedLoadCommand:
+        """Generate a staging-table load for extracts read on another server.
+
+        The staging table is a session temp table copied from the target's
+        column definitions. With ``merge_key`` the staged rows are upserted
+        by one MERGE; otherwise they are appended by one INSERT ... SELECT.
+        """
+        return self.__cached(
+            "staged_load",
+            extract,
+            (tuple(merge_key or ()),),
+            lambda: self.__staged_load(extract, merge_key),
+        )
+
+    def __staged_load(
+        self, extract: ExtractQuery, merge_key: list[str] | None = None
+    ) -> StagedLoadCommand:
+        column_map, target_table = self.__build_column_map(extract)
+
+        if not column_map:
+            raise ValueError(
+                f"No mapped columns for target table '{target_table}'. "
+                f"Check the crosswalk entries in the extract query."
+            )
+
+        staging_table = f"#Stage_{target_table}"
+        o3_columns = ", ".join(f"[{col}]" for col in column_map)
+        placeholders = ", ".join("?" for _ in column_map)
+
+        if merge_key:
+            # Staging columns carry the O3 names
+            load_sql = self.__merge_sql(
+                target_table,
+                staging_table,
+                {col: col for col in column_map},
+                merge_key,
+            )
+        elif extract.incremental:
+            # The staged rows include the re-read watermark day; skip rows already loaded
+            staged_columns = ", ".join(f"src.[{col}]" for col in column_map)
+            load_sql = (
+                f"INSERT INTO {target_table} ({o3_columns})\n"
+                f"SELECT {staged_columns}\n"
+                f"FROM {staging_table} AS src\n"
+                f"WHERE {_not_loaded(target_table, {col: col for col in column_map})};"
+            )
+        else:
+            load_sql = (
+                f"INSERT INTO {target_table} ({o3_columns})\n"
+                f"SELECT {o3_columns}\n"
+                f"FROM {staging_table};"
+            )
+
+        return StagedLoadCommand(
+            target_table=target_table,
+            staging_table=staging_table,
+            create_sql=(
+                f"DROP TABLE IF EXISTS {staging_table};\n"
+                f"SELECT TOP 0 {o3_columns} INTO {staging_table} FROM {target_table};"
+            ),
+            insert_sql=(
+                f"INSERT INTO {staging_table} ({o3_columns}) VALUES ({placeholders})"
+            ),
+            load_sql=load_sql,
+            drop_sql=f"DROP TABLE IF EXISTS {staging_table};",
+            column_map=column_map,
+        )
+
+    @staticmethod
+    def __merge_sql(
+        target_table: str,
+        source: str,
+        column_map: dict[str, str],
+        merge_key: list[str],
+    ) -> str:
+        """MERGE ``source`` (a derived table or table name) into the target."""
+        missing_keys = [k for k in merge_key if k not in column_map]
+        if missing_keys:
+            raise ValueError(
+                f"Merge keys {missing_keys} not found in column map for "
+                f"{target_table}. Available: {list(column_map.keys())}"
+            )
+
         on_clause = " AND ".join(
             f"target.[{k}] = source.[{column_map[k]}]"
             for k in merge_key
@@ -85,7 +453,7 @@ class Loader:
 
         sql_parts = [
             f"MERGE {target_table} AS target",
-            f"USING (\n{extract.sql}\n) AS source",
+            f"USING {source} AS source",
             f"ON {on_clause}",
         ]
 
@@ -99,9 +467,35 @@ class Loader:
             f"  VALUES ({insert_vals});"
         )
 
-        sql = "\n".join(sql_parts)
+        return "\n".join(sql_parts)
 
-        return LoadCommand(target_table=target_table, sql=sql, column_map=column_map)
+    def __cached(
+        self,
+        kind: str,
+        extract: ExtractQuery,
+        args: tuple,
+        create: Callable[[], _Plan],
+    ) -> _Plan:
+        """Return a generated command from the plan cache, creating it on a miss."""
+        if self.__plan_cache is None:
+            return create()
+        if self.__fingerprint is None:
+            self.__fingerprint = fingerprint(
+                "load",
+                {
+                    name: ke.string_code
+                    for name, ke in self.__o3_model.key_elements.items()
+                },
+            )
+        key = (
+            kind,
+            extract.entry_point,
+            extract.sql,
+            extract.incremental,
+            tuple(astuple(e) for e in extract.columns_mapped),
+            args,
+        )
+        return self.__plan_cache.get_or_create(self.__fingerprint, key, create)
 
     def __build_column_map(
         self, extract: ExtractQuery
@@ -137,5 +531,15 @@ class Loader:
         return column_map, table_name
 
 
+def _not_loaded(target_table: str, column_map: dict[str, str]) -> str:
+    """Predicate for ``src`` rows with no identical row (NULLs equal) in the target."""
+    target_columns = ", ".join(f"tgt.[{col}]" for col in column_map)
+    source_columns = ", ".join(f"src.[{alias}]" for alias in column_map.values())
+    return (
+        f"NOT EXISTS (SELECT 1 FROM {target_table} AS tgt "
+        f"WHERE EXISTS (SELECT {target_columns} INTERSECT SELECT {source_columns}))"
+    )
+
+
 if __name__ == "__main__":
     pass
@@ -0,0 +1,162 @@
+"""In-memory and on-disk cache of generated extract and load SQL."""
+
+from __future__ import annotations
+
+import copy
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import pickle
+import tempfile
+import threading
+from collections.abc import Callable, Hashable
+from typing import Any, TypeVar
+
+from api.model_cache import library_version
+
+# Bump when the pickled layout of ExtractQuery or LoadCommand, or the SQL they hold, changes
+_PLAN_CACHE_FORMAT_VERSION = 5
+_CACHE_FILE_PREFIX = "query_plans_"
+_CACHE_FILE_SUFFIX = ".pickle"
+
+T = TypeVar("T")
+
+
+def fingerprint(*sources: Any) -> str:
+    """SHA-256 over the contents of the given sources.
+
+    Dataclasses (crosswalk entries, the model registry, the semantic
+    manifest) are hashed field by field, so two separately loaded copies of
+    the same files share a fingerprint. The cache format and library
+    versions are included so upgrades never reuse stale plans.
+    """
+    digest = hashlib.sha256()
+    for source in sources:
+        digest.update(
+            json.dumps(_canonical(source), sort_keys=True, default=str).encode()
+        )
+        digest.update(b"\0")
+    digest.update(
+        f"format={_PLAN_CACHE_FORMAT_VERSION}|version={library_version()}".encode()
+    )
+    return digest.hexdigest()
+
+
+class QueryPlanCache:
+    """Generated ``ExtractQuery`` and ``LoadCommand`` objects keyed by source fingerprint.
+
+    Extractor and Loader each store plans under a namespace, the
+    fingerprint of the inputs they generate SQL from, so a plan is only
+    reused while the crosswalk, registry, manifest and O3 model are
+    unchanged. With ``cache_dir`` every namespace is also pickled to
+    ``query_plans_<fingerprint>.pickle`` there and reloaded by later runs;
+    the directory must only be writable by trusted users. Callers receive
+    deep copies, so changing a returned plan, including its column and join
+    lists, does not change the cache.
+    """
+
+    def __init__(self, cache_dir: str | None = None):
+        self.__cache_dir = cache_dir
+        self.__plans: dict[str, dict[Hashable, Any]] = {}
+        self.__lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache_dir(self) -> str | None:
+        return self.__cache_dir
+
+    def get_or_create(
+        self, namespace: str, key: Hashable, create: Callable[[], T]
+    ) -> T:
+        """Return the plan stored under ``key``, creating and storing it on a miss."""
+        with self.__lock:
+            plans = self.__namespace(namespace)
+            if key in plans:
+                self.hits += 1
+                return copy.deepcopy(plans[key])
+
+        plan = create()
+
+        with self.__lock:
+            self.misses += 1
+            plans[key] = plan
+            if self.__cache_dir is not None:
+                try:
+                    self.__write(namespace, plans)
+                except OSError as e:
+                    logging.warning(f"Could not write query plan cache: {e}")
+        return copy.deepcopy(plan)
+
+    def clear(self) -> int:
+        """Forget every plan, removing cache files; returns the files removed."""
+        with self.__lock:
+            self.__plans.clear()
+            if self.__cache_dir is None:
+                return 0
+            directory = pathlib.Path(self.__cache_dir)
+            if not directory.is_dir():
+                return 0
+            removed = 0
+            for path in directory.glob(f"{_CACHE_FILE_PREFIX}*{_CACHE_FILE_SUFFIX}"):
+                path.unlink()
+                removed += 1
+            return removed
+
+    def __namespace(self, namespace: str) -> dict[Hashable, Any]:
+        """Plans for a namespace, loaded from disk on first use."""
+        plans = self.__plans.get(namespace)
+        if plans is None:
+            plans = self.__read(namespace) if self.__cache_dir is not None else {}
+            self.__plans[namespace] = plans
+        return plans
+
+    def __path(self, namespace: str) -> pathlib.Path:
+        return pathlib.Path(self.__cache_dir) / (
+            f"{_CACHE_FILE_PREFIX}{namespace}{_CACHE_FILE_SUFFIX}"
+        )
+
+    def __read(self, namespace: str) -> dict[Hashable, Any]:
+        path = self.__path(namespace)
+        if not path.is_file():
+            return {}
+        try:
+            with open(path, "rb") as f:
+                plans = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+            logging.warning(f"Ignoring unreadable query plan cache {path}: {e}")
+            return {}
+        if not isinstance(plans, dict):
+            logging.warning(f"Ignoring query plan cache {path}: unexpected type {type(plans).__name__}")
+            return {}
+        return plans
+
+    def __write(self, namespace: str, plans: dict[Hashable, Any]) -> None:
+        path = self.__path(namespace)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(plans, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+def _canonical(source: Any) -> Any:
+    """JSON-friendly form of a source: dataclasses as dicts, lists element-wise."""
+    if dataclasses.is_dataclass(source) and not isinstance(source, type):
+        return dataclasses.asdict(source)
+    if isinstance(source, (list, tuple)):
+        return [_canonical(item) for item in source]
+    if isinstance(source, dict):
+        return {str(k): _canonical(v) for k, v in source.items()}
+    return source
+
+
+if __name__ == "__main__":
+    pass
@@ -3,11 +3,24 @@
 from __future__ import annotations
 
 import os
+import threading
 import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, suppress
 from dataclasses import dataclass, field
 
-from etl.pipeline.extractor import Extractor, ExtractQuery
-from etl.pipeline.loader import Loader, LoadCommand
+from etl.pipeline.bulk import BulkLoadOptions, copy_rows
+
+from etl.pipeline.extractor import (
+    Extractor,
+    ExtractQuery,
+    WATERMARK_ALIAS,
+    inline_params,
+)
+from etl.pipeline.loader import BatchedMergeOptions, Loader, LoadCommand
+from etl.pipeline.watermark import WatermarkStore
+from sql.connection.pool import ConnectionPool
 
 
 @dataclass
@@ -17,10 +30,20 @@ class EntryPointResult:
     entry_point: str
     rows_extracted: int = 0
     rows_loaded: int = 0
+    rows_skipped: int = 0
     duration_seconds: float = 0.0
     errors: list[str] = field(default_factory=list)
 
 
+@dataclass(frozen=True)
+class _LoadMode:
+    """How entry points of one run are loaded."""
+
+    streaming: bool = False
+    bulk: BulkLoadOptions | None = None
+    batched_merge: BatchedMergeOptions | None = None
+
+
 @dataclass
 class ETLResult:
     """Result of a complete ETL run."""
@@ -34,17 +57,40 @@ class ETLResult:
 
 
 class ETLRunner:
-    """Orchestrates extract-transform-load: live execution or offline SQL export."""
+    """Orchestrates extract-transform-load: live execution or offline SQL export.
+
+    ``connection`` is used for sequential runs. With ``connection_pool``
+    every entry point borrows a connection from the pool for its
+    transaction. Otherwise concurrent runs need ``connection_factory``, a
+    callable returning a new DB-API connection (for example
+    ``MSSQLConnection.create_connection(ServerToConnect.O3).connection``);
+    each worker thread opens its own connection from it.
+
+    ``watermark_store`` enables incremental runs, which extract only rows
+    newer than the last date key loaded for each entry point.
+
+    ``source_connection`` (a connection or ``ConnectionPool`` on the DWH
+    server) enables bulk runs, which read extracts there and push the rows
+    to the O3 connection instead of running a cross-database INSERT.
+    """
 
     def __init__(
         self,
         extractor: Extractor,
         loader: Loader,
         connection=None,
+        connection_factory: Callable[[], object] | None = None,
+        connection_pool: ConnectionPool | None = None,
+        watermark_store: WatermarkStore | None = None,
+        source_connection=None,
     ):
         self.__extractor = extractor
         self.__loader = loader
         self.__connection = connection
+        self.__connection_factory = connection_factory
+        self.__connection_pool = connection_pool
+        self.__watermark_store = watermark_store
+        self.__source_connection = source_connection
 
     def export_sql(
         self,
@@ -79,9 +125,9 @@ class ETLRunner:
                     f.write(f"-- Base Table: {query.base_table}\n")
                     f.write(f"-- Date Key: {query.date_key}\n\n")
                     f.write("-- ===== EXTRACT =====\n\n")
-                    f.write(query.sql)
+                    f.write(inline_params(query.sql, query.params))
                     f.write("\n\n-- ===== LOAD =====\n\n")
-                    f.write(load_cmd.sql)
+                    f.write(inline_params(load_cmd.sql, query.params))
                     f.write("\n")
             except Exception as e:
                 errors.append(
@@ -101,30 +147,116 @@ class ETLRunner:
         date_basis: str | None = None,
         lookback_days: int | None = None,
         dry_run: bool = False,
+        streaming: bool = False,
+        max_workers: int = 1,
+        max_concurrent_per_table: int = 1,
+        incremental: bool = False,
+        bulk: BulkLoadOptions | None = None,
+        batched_merge: BatchedMergeOptions | None = None,
     ) -> ETLResult:
-        """Execute ETL pipeline. Requires connection unless dry_run=True."""
-        if not dry_run and self.__connection is None:
+        """Execute ETL pipeline. Requires connection unless dry_run=True.
+
+        With ``streaming=True`` each entry point is loaded by a single
+        server-side INSERT ... SELECT whose row count is read from
+        ``ROWCOUNT_BIG()``. The extract runs once and no rows are fetched into
+        Python, so ``rows_extracted`` equals ``rows_loaded``.
+
+        With ``max_workers > 1`` entry points run concurrently on a thread
+        pool, each entry point borrowing from ``connection_pool`` (or each
+        worker on its own connection from ``connection_factory``) and each
+        entry point in its own transaction. At most
+        ``max_concurrent_per_table`` entry points load the same O3 table at
+        once. Results are returned in entry point order.
+
+        With ``incremental=True`` each extract selects only rows whose date
+        key is on or after the entry point's watermark and is loaded in one
+        server-side batch, like ``streaming``. Rows of the re-read watermark
+        day that are already in the target are skipped (or merged by key).
+        The watermark advances to the highest date key loaded only after the
+        load commits.
+
+        With ``bulk`` each extract runs on ``source_connection`` and its rows
+        are streamed in chunks into a staging table on the O3 connection with
+        ``fast_executemany``, then moved into the target by one MERGE (for
+        tables in ``bulk.merge_keys``) or INSERT. This works when the DWH and
+        O3 databases are on different servers. Bulk takes precedence over
+        ``streaming``; incremental watermarks advance from the rows copied.
+
+        With ``batched_merge`` entry points whose O3 table has merge keys
+        are upserted through an indexed ``#MergeSource`` table in batches of
+        ``batched_merge.batch_size`` rows, each committed on its own, instead
+        of one MERGE over the inline extract. A failed load can leave earlier
+        batches committed; rerunning it converges because every batch is an
+        upsert.
+        """
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be >= 1, got {max_workers}")
+        if max_concurrent_per_table < 1:
+            raise ValueError(
+                f"max_concurrent_per_table must be >= 1, got {max_concurrent_per_table}"
+            )
+
+        if incremental and self.__watermark_store is None:
+            raise ValueError(
+                "Incremental execution requires a watermark_store. "
+                "Pass watermark_store to ETLRunner."
+            )
+        watermarks = self.__watermark_store if incremental else None
+
+        concurrent = max_workers > 1 and not dry_run
+        if bulk is not None and not dry_run:
+            if self.__source_connection is None:
+                raise ValueError(
+                    "Bulk execution requires a source_connection to read "
+                    "extracts from. Pass source_connection to ETLRunner."
+                )
+            if concurrent and not isinstance(self.__source_connection, ConnectionPool):
+                raise ValueError(
+                    "Concurrent bulk execution requires source_connection to "
+                    "be a ConnectionPool so each entry point reads on its own "
+                    "connection."
+                )
+        if (
+            concurrent
+            and self.__connection_factory is None
+            and self.__connection_pool is None
+        ):
+            raise ValueError(
+                "Concurrent execution requires a connection_pool or "
+                "connection_factory so each worker has its own connection."
+            )
+        if (
+            not dry_run
+            and self.__connection is None
+            and self.__connection_factory is None
+            and self.__connection_pool is None
+        ):
             raise ValueError(
                 "Live execution requires a database connection. "
                 "Pass connection to ETLRunner or use dry_run=True."
             )
 
         start = time.time()
-        results: list[EntryPointResult] = []
 
         if entry_points:
             queries = [
-                self.__extractor.generate_query(ep, date_basis, lookback_days)
+                self.__extractor.generate_query(
+                    ep, date_basis, lookback_days, watermarks
+                )
                 for ep in entry_points
             ]
         else:
             queries = self.__extractor.generate_all_queries(
-                date_basis, lookback_days
+                date_basis, lookback_days, watermarks
             )
 
-        for query in queries:
-            ep_result = self.__run_entry_point(query, dry_run)
-            results.append(ep_result)
+        mode = _LoadMode(streaming, bulk, batched_merge)
+        if concurrent:
+            results = self.__run_concurrently(
+                queries, mode, max_workers, max_concurrent_per_table
+            )
+        else:
+            results = self.__run_sequentially(queries, dry_run, mode)
 
         total_duration = time.time() - start
 
@@ -133,8 +265,146 @@ class ETLRunner:
             total_duration=total_duration,
         )
 
+    def __run_sequentially(
+        self,
+        queries: list[ExtractQuery],
+        dry_run: bool,
+        mode: _LoadMode,
+    ) -> list[EntryPointResult]:
+        """Run entry points one after another on a single connection."""
+        if dry_run:
+            return [self.__run_entry_point(query, None, dry_run=True) for query in queries]
+
+        if self.__connection is not None:
+            return [
+                self.__run_one(query, self.__connection, mode)
+                for query in queries
+            ]
+
+        if self.__connection_pool is not None:
+            return [
+                self.__run_pooled(query, mode) for query in queries
+            ]
+
+        connection = self.__connection_factory()
+        try:
+            return [
+                self.__run_one(query, connection, mode)
+                for query in queries
+            ]
+        finally:
+            _close_quietly(connection)
+
+    def __run_concurrently(
+        self,
+        queries: list[ExtractQuery],
+        mode: _LoadMode,
+        max_workers: int,
+        max_concurrent_per_table: int,
+    ) -> list[EntryPointResult]:
+        """Run entry points on a thread pool, borrowing from the connection
+        pool or using one connection per worker."""
+        local = threading.local()
+        opened: list = []
+        opened_lock = threading.Lock()
+        table_limits: dict[str, threading.Semaphore] = {}
+        table_limits_lock = threading.Lock()
+
+        def worker_connection():
+            connection = getattr(local, "connection", None)
+            if connection is None:
+                connection = self.__connection_factory()
+                local.connection = connection
+                with opened_lock:
+                    opened.append(connection)
+            return connection
+
+        def table_limit(table: str | None) -> threading.Semaphore | None:
+            if table is None:
+                return None
+            with table_limits_lock:
+                if table not in table_limits:
+                    table_limits[table] = threading.Semaphore(max_concurrent_per_table)
+                return table_limits[table]
+
+        def run_unlimited(query: ExtractQuery) -> EntryPointResult:
+            if self.__connection_pool is not None:
+                return self.__run_pooled(query, mode)
+            return self.__run_entry_point_with_connection(
+                query, worker_connection, mode
+            )
+
+        def run_query(query: ExtractQuery) -> EntryPointResult:
+            limit = table_limit(self.__target_table(query))
+            if limit is None:
+                return run_unlimited(query)
+            with limit:
+                return run_unlimited(query)
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                return list(pool.map(run_query, queries))
+        finally:
+            for connection in opened:
+                _close_quietly(connection)
+
+    def __run_entry_point_with_connection(
+        self,
+        query: ExtractQuery,
+        get_connection: Callable[[], object],
+        mode: _LoadMode,
+    ) -> EntryPointResult:
+        """Open (or reuse) the worker's connection and run one entry point."""
+        try:
+            connection = get_connection()
+        except Exception as e:
+            return _connection_failed(query, e)
+        return self.__run_one(query, connection, mode)
+
+    def __run_pooled(
+        self, query: ExtractQuery, mode: _LoadMode
+    ) -> EntryPointResult:
+        """Borrow a connection from the pool for one entry point."""
+        try:
+            connection = self.__connection_pool.acquire()
+        except Exception as e:
+            return _connection_failed(query, e)
+        try:
+            return self.__run_one(query, connection, mode)
+        finally:
+            self.__connection_pool.release(connection)
+
+    def __run_one(
+        self,
+        query: ExtractQuery,
+        connection,
+        mode: _LoadMode,
+    ) -> EntryPointResult:
+        """Run one entry point in the selected mode."""
+        if mode.bulk is not None:
+            return self.__bulk_load_entry_point(query, connection, mode.bulk)
+        if mode.batched_merge is not None:
+            merge_key = mode.batched_merge.merge_keys.get(self.__target_table(query))
+            if merge_key:
+                return self.__run_batched_merge(
+                    query, connection, merge_key, mode.batched_merge.batch_size
+                )
+        if query.incremental:
+            return self.__run_incremental(query, connection)
+        if mode.streaming:
+            return self.__stream_entry_point(query, connection)
+        return self.__run_entry_point(query, connection)
+
+    def __target_table(self, query: ExtractQuery) -> str | None:
+        """O3 table an entry point loads into, or None when it cannot be determined."""
+        try:
+            return self.__loader.generate_insert(query).target_table
+        except Exception:
+            # The entry point run reports the same error
+            return None
+
     def __run_entry_point(
-        self, query: ExtractQuery, dry_run: bool
+        self, query: ExtractQuery, connection, dry_run: bool = False
     ) -> EntryPointResult:
         """Run ETL for a single entry point."""
         ep_start = time.time()
@@ -145,8 +415,8 @@ class ETLRunner:
             return result
 
         try:
-            cursor = self.__connection.cursor()
-            cursor.execute(query.sql)
+            cursor = connection.cursor()
+            _execute(cursor, query.sql, query.params)
             rows = cursor.fetchall()
             result.rows_extracted = len(rows)
         except Exception as e:
@@ -160,25 +430,283 @@ class ETLRunner:
         load_cmd = self.__loader.generate_insert(query)
 
         try:
-            cursor.execute(load_cmd.sql)
+            _execute(cursor, load_cmd.sql, query.params)
             result.rows_loaded = cursor.rowcount
-            self.__connection.commit()
+            connection.commit()
+        except Exception as e:
+            result.errors.append(
+                f"Load failed for '{query.entry_point}': "
+                f"{type(e).__name__}: {e}"
+            )
+            try:
+                connection.rollback()
+            except Exception as rollback_err:
+                result.errors.append(
+                    f"Rollback failed: {type(rollback_err).__name__}: "
+                    f"{rollback_err}"
+                )
+
+        result.duration_seconds = time.time() - ep_start
+        return result
+
+    def __stream_entry_point(
+        self, query: ExtractQuery, connection
+    ) -> EntryPointResult:
+        """Run ETL for a single entry point as one server-side statement."""
+        ep_start = time.time()
+        result = EntryPointResult(entry_point=query.entry_point)
+
+        try:
+            load_cmd = self.__loader.generate_counted_insert(query)
+        except Exception as e:
+            result.errors.append(
+                f"Load generation failed for '{query.entry_point}': "
+                f"{type(e).__name__}: {e}"
+            )
+            result.duration_seconds = time.time() - ep_start
+            return result
+
+        try:
+            cursor = connection.cursor()
+            _execute(cursor, load_cmd.sql, query.params)
+            row = cursor.fetchone()
+            rows = int(row[0]) if row is not None else 0
+            connection.commit()
+        except Exception as e:
+            result.errors.append(
+                f"Load failed for '{query.entry_point}': "
+                f"{type(e).__name__}: {e}"
+            )
+            try:
+                connection.rollback()
+            except Exception as rollback_err:
+                result.errors.append(
+                    f"Rollback failed: {type(rollback_err).__name__}: "
+                    f"{rollback_err}"
+                )
+        else:
+            result.rows_extracted = rows
+            result.rows_loaded = rows
+
+        result.duration_seconds = time.time() - ep_start
+        return result
+
+    def __run_incremental(
+        self, query: ExtractQuery, connection
+    ) -> EntryPointResult:
+        """Load an incremental extract, then advance its watermark."""
+        ep_start = time.time()
+        result = EntryPointResult(entry_point=query.entry_point)
+
+        try:
+            load_cmd = self.__loader.generate_incremental_insert(query)
+        except Exception as e:
+            result.errors.append(
+                f"Load generation failed for '{query.entry_point}': "
+                f"{type(e).__name__}: {e}"
+            )
+            result.duration_seconds = time.time() - ep_start
+            return result
+
+        try:
+            cursor = connection.cursor()
+            _execute(cursor, load_cmd.sql, query.params)
+            row = cursor.fetchone()
+            rows = int(row[0]) if row is not None else 0
+            high_watermark = row[1] if row is not None else None
+            connection.commit()
+        except Exception as e:
+            result.errors.append(
+                f"Load failed for '{query.entry_point}': "
+                f"{type(e).__name__}: {e}"
+            )
+            try:
+                connection.rollback()
+            except Exception as rollback_err:
+                result.errors.append(
+                    f"Rollback failed: {type(rollback_err).__name__}: "
+                    f"{rollback_err}"
+                )
+            result.duration_seconds = time.time() - ep_start
+            return result
+
+        result.rows_extracted = rows
+        result.rows_loaded = rows
+        if high_watermark is not None:
+            try:
+                self.__watermark_store.advance(
+                    query.entry_point, query.date_key, high_watermark
+                )
+            except Exception as e:
+                # The rows are committed; the next run will extract them again
+                result.errors.append(
+                    f"Watermark update failed for '{query.entry_point}': "
+                    f"{type(e).__name__}: {e}"
+                )
+
+        result.duration_seconds = time.time() - ep_start
+        return result
+
+    @contextmanager
+    def __source(self) -> Iterator[object]:
+        """Yield a DWH connection, borrowing from the pool when one was given."""
+        if isinstance(self.__source_connection, ConnectionPool):
+            with self.__source_connection.connection() as connection:
+                yield connection
+        else:
+            yield self.__source_connection
+
+    def __bulk_load_entry_point(
+        self, query: ExtractQuery, connection, bulk: BulkLoadOptions
+    ) -> EntryPointResult:
+        """Copy an extract from the source server through a staging table."""
+        ep_start = time.time()
+        result = EntryPointResult(entry_point=query.entry_point)
+
+        try:
+            merge_key = bulk.merge_keys.get(self.__target_table(query))
+            staged = self.__loader.generate_staged_load(query, merge_key)
+        except Exception as e:
+            result.errors.append(
+                f"Load generation failed for '{query.entry_point}': "
+                f"{type(e).__name__}: {e}"
+            )
+            result.duration_seconds = time.time() - ep_start
+            return result
+
+        try:
+            cursor = connection.cursor()
+            cursor.execute(staged.create_sql)
+            with self.__source() as source:
+                source_cursor = source.cursor()
+                _execute(source_cursor, query.sql, query.params)
+                copied = copy_rows(
+                    source_cursor,
+                    cursor,
+                    staged.insert_sql,
+                    list(staged.column_map.values()),
+                    bulk,
+                    track_column=WATERMARK_ALIAS if query.incremental else None,
+                )
+            result.rows_extracted = copied.rows
+            cursor.execute(staged.load_sql)
+            rows_loaded = cursor.rowcount
+            cursor.execute(staged.drop_sql)
+            connection.commit()
+        except Exception as e:
+            result.errors.append(
+                f"Bulk load failed for '{query.entry_point}': "
+                f"{type(e).__name__}: {e}"
+            )
+            try:
+                connection.rollback()
+            except Exception as rollback_err:
+                result.errors.append(
+                    f"Rollback failed: {type(rollback_err).__name__}: "
+                    f"{rollback_err}"
+                )
+            result.duration_seconds = time.time() - ep_start
+            return result
+
+        result.rows_loaded = rows_loaded
+        if query.incremental and copied.high_value is not None:
+            try:
+                self.__watermark_store.advance(
+                    query.entry_point, query.date_key, copied.high_value
+                )
+            except Exception as e:
+                # The rows are committed; the next run will extract them again
+                result.errors.append(
+                    f"Watermark update failed for '{query.entry_point}': "
+                    f"{type(e).__name__}: {e}"
+                )
+
+        result.duration_seconds = time.time() - ep_start
+        return result
+
+    def __run_batched_merge(
+        self, query: ExtractQuery, connection, merge_key: list[str], batch_size: int
+    ) -> EntryPointResult:
+        """Upsert an entry point through #MergeSource in committed batches."""
+        ep_start = time.time()
+        result = EntryPointResult(entry_point=query.entry_point)
+
+        try:
+            load_cmd = self.__loader.generate_batched_merge(
+                query, merge_key, batch_size
+            )
+        except Exception as e:
+            result.errors.append(
+                f"Load generation failed for '{query.entry_point}': "
+                f"{type(e).__name__}: {e}"
+            )
+            result.duration_seconds = time.time() - ep_start
+            return result
+
+        try:
+            cursor = connection.cursor()
+            _execute(cursor, load_cmd.sql, query.params)
+            row = cursor.fetchone()
+            connection.commit()
         except Exception as e:
             result.errors.append(
                 f"Load failed for '{query.entry_point}': "
                 f"{type(e).__name__}: {e}"
             )
             try:
-                self.__connection.rollback()
+                connection.rollback()
             except Exception as rollback_err:
                 result.errors.append(
                     f"Rollback failed: {type(rollback_err).__name__}: "
                     f"{rollback_err}"
                 )
+            result.duration_seconds = time.time() - ep_start
+            return result
+
+        if row is not None:
+            result.rows_extracted = int(row[0])
+            result.rows_loaded = int(row[1]) + int(row[2])
+            result.rows_skipped = int(row[4] or 0)
+            if query.incremental and row[3] is not None:
+                try:
+                    self.__watermark_store.advance(
+                        query.entry_point, query.date_key, row[3]
+                    )
+                except Exception as e:
+                    # The rows are committed; the next run will extract them again
+                    result.errors.append(
+                        f"Watermark update failed for '{query.entry_point}': "
+                        f"{type(e).__name__}: {e}"
+                    )
 
         result.duration_seconds = time.time() - ep_start
         return result
 
 
+def _execute(cursor, sql: str, params: tuple) -> None:
+    """Execute SQL containing the extract, binding its parameters if it has any."""
+    if params:
+        cursor.execute(sql, params)
+    else:
+        cursor.execute(sql)
+
+
+def _connection_failed(query: ExtractQuery, error: Exception) -> EntryPointResult:
+    """Result for an entry point that could not get a connection."""
+    return EntryPointResult(
+        entry_point=query.entry_point,
+        errors=[
+            f"Connection failed for '{query.entry_point}': "
+            f"{type(error).__name__}: {error}"
+        ],
+    )
+
+
+def _close_quietly(connection) -> None:
+    """Close a connection the runner opened, ignoring errors."""
+    with suppress(Exception):
+        connection.close()
+
+
 if __name__ == "__main__":
     pass
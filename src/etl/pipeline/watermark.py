@@ -0,0 +1,107 @@
+"""Persistence for per-entry-point extraction watermarks."""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+from dataclasses import asdict, dataclass
+
+
+@dataclass(frozen=True)
+class Watermark:
+    """The highest date key loaded for one entry point."""
+
+    date_key: str
+    value: int
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Watermark:
+        return cls(date_key=data["date_key"], value=int(data["value"]))
+
+
+class WatermarkStore:
+    """JSON file recording the highest date key loaded per entry point.
+
+    A watermark belongs to the date key it was read from; asking for an
+    entry point under a different date key (another ``date_basis``)
+    returns None so the extract falls back to its lookback window.
+    Updates are written immediately, replacing the file atomically, and
+    are safe to make from several runner threads.
+    """
+
+    def __init__(self, path: str):
+        self.__path = path
+        self.__lock = threading.Lock()
+        self.__watermarks: dict[str, Watermark] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.__watermarks = {
+                ep: Watermark.from_dict(d) for ep, d in data.items()
+            }
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    def get(self, entry_point: str, date_key: str) -> int | None:
+        """Highest date key value loaded for the entry point, or None."""
+        with self.__lock:
+            watermark = self.__watermarks.get(entry_point)
+        if watermark is None or watermark.date_key != date_key:
+            return None
+        return watermark.value
+
+    def advance(self, entry_point: str, date_key: str, value: int) -> bool:
+        """Record a newly loaded high value; returns False if it is not newer."""
+        value = int(value)
+        with self.__lock:
+            current = self.__watermarks.get(entry_point)
+            if (
+                current is not None
+                and current.date_key == date_key
+                and current.value >= value
+            ):
+                return False
+            self.__watermarks[entry_point] = Watermark(date_key, value)
+            self.__save()
+        return True
+
+    def reset(self, entry_point: str | None = None) -> None:
+        """Forget one entry point's watermark, or all of them."""
+        with self.__lock:
+            if entry_point is None:
+                self.__watermarks.clear()
+            else:
+                self.__watermarks.pop(entry_point, None)
+            self.__save()
+
+    def to_dict(self) -> dict[str, Watermark]:
+        with self.__lock:
+            return dict(self.__watermarks)
+
+    def __save(self) -> None:
+        """Write all watermarks to a temporary file, then replace the store."""
+        directory = os.path.dirname(os.path.abspath(self.__path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(
+                    {ep: w.to_dict() for ep, w in self.__watermarks.items()},
+                    f,
+                    indent=2,
+                )
+            os.replace(tmp_path, self.__path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+if __name__ == "__main__":
+    pass
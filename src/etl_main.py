@@ -2,7 +2,7 @@
 """ETL entry point — demonstrates the full crosswalk → lineage → pipeline workflow."""
 
 import os
-from api.data_model import O3DataModel
+from api.workflow import create_model
 from etl.registry import load_model_registry
 from etl.manifest import load_semantic_manifest
 from etl.mapping.crosswalk import Crosswalk
@@ -10,18 +10,21 @@ from etl.lineage.lineage_builder import LineageBuilder
 from etl.lineage.lineage_report import LineageReport
 from etl.pipeline.extractor import Extractor
 from etl.pipeline.loader import Loader
+from etl.pipeline.plan_cache import QueryPlanCache
 from etl.pipeline.runner import ETLRunner
 
 
 RESOURCES = os.path.join(os.path.dirname(__file__), "Resources")
 OUTPUT = os.path.join(os.path.dirname(__file__), "..", "Sql_Commands", "etl")
 CROSSWALK_PATH = os.path.join(RESOURCES, "crosswalk.json")
+MODEL_CACHE = os.path.join(os.path.dirname(__file__), "..", ".cache", "o3_model")
+PLAN_CACHE = os.path.join(os.path.dirname(__file__), "..", ".cache", "etl_plans")
 
 
 def main() -> None:
     # 1. Load data sources
     print("Loading O3 data model...")
-    o3 = O3DataModel(os.path.join(RESOURCES, "O3_20250128_Fixed.json"), clean=True)
+    o3 = create_model(os.path.join(RESOURCES, "O3_20250128_Fixed.json"), clean=True, cache_dir=MODEL_CACHE)
 
     print("Loading model registry...")
     registry = load_model_registry(os.path.join(RESOURCES, "model_registry.json"))
@@ -41,7 +44,7 @@ def main() -> None:
         print(f"  {len(entries)} curated entries loaded.")
     else:
         print("Generating crosswalk suggestions...")
-        entries = cw.generate_suggestions()
+        entries = cw.generate_suggestions(workers=os.cpu_count() or 1)
         cw.save_curated(entries, CROSSWALK_PATH)
         print(f"  {len(entries)} suggestions saved to {CROSSWALK_PATH}")
         print("  Review and edit crosswalk.json, then re-run.")
@@ -65,8 +68,9 @@ def main() -> None:
     # 4. Export ETL SQL (offline mode)
     print("Generating ETL SQL...")
     active_entries = [e for e in entries if e.is_active]
-    extractor = Extractor(active_entries, manifest, registry)
-    loader = Loader(o3)
+    plan_cache = QueryPlanCache(PLAN_CACHE)
+    extractor = Extractor(active_entries, manifest, registry, plan_cache=plan_cache)
+    loader = Loader(o3, plan_cache=plan_cache)
     runner = ETLRunner(extractor, loader)
     runner.export_sql(OUTPUT)
     print(f"  ETL SQL files written to {OUTPUT}")
@@ -1,6 +1,8 @@
-"""Helper utilities: enums, string sanitization, and validation."""
+"""Helper utilities: enums, string sanitization, validation, and row memory accounting."""
 from helpers.enums import ServerToConnect, SQLAuthentication, SupportedSQLServers
+from helpers.memory import row_bytes
 from helpers.string_helpers import (
+    intern_string,
     leave_letters_numbers_spaces_underscores_dashes,
     leave_only_letters_numbers_or_underscore,
 )
@@ -12,5 +14,7 @@ __all__ = [
     "SQLAuthentication",
     "leave_only_letters_numbers_or_underscore",
     "leave_letters_numbers_spaces_underscores_dashes",
+    "intern_string",
     "check_sql_server_type",
+    "row_bytes",
 ]
@@ -0,0 +1,23 @@
+"""Approximate memory accounting for fetched result rows."""
+import sys
+from typing import Any
+
+
+def row_bytes(row: Any) -> int:
+    """Approximates the memory held by one fetched row and its values.
+
+    Parameters
+    ----------
+    row : Sequence
+        a fetched row, e.g. a ``pyodbc.Row`` or a tuple
+
+    Returns
+    -------
+    int
+        ``sys.getsizeof`` of the row plus that of each value
+    """
+    return sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+
+
+if __name__ == "__main__":
+    pass
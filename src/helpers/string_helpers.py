@@ -1,5 +1,6 @@
 """Regex-based sanitization functions for SQL identifier strings."""
 import re
+import sys
 
 _RE_ALNUM_UNDERSCORE = re.compile(r'[^a-zA-Z0-9_]')
 _RE_ALNUM_SPACE_UNDERSCORE_DASH = re.compile(r'[^a-zA-Z0-9_\s-]')
@@ -37,6 +38,23 @@ def leave_letters_numbers_spaces_underscores_dashes(text):
     return _RE_ALNUM_SPACE_UNDERSCORE_DASH.sub('', text)
 
 
+def intern_string(value):
+    """Interns a string so repeated values share one object; non-strings (e.g. None) are returned unchanged.
+
+    Parameters
+    ----------
+    value : str | None
+        the value to intern
+
+    Returns
+    -------
+    str | None
+        the interned string, or the original value if it is not a string
+    """
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
 
 if __name__ == "__main__":
     pass
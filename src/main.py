@@ -7,8 +7,7 @@ from api.workflow import (
     create_tables,
     foreign_key_constraints,
 )
-from helpers.enums import ServerToConnect, SupportedSQLServers
-from sql.connection.mssql import MSSQLConnection
+from helpers.enums import SupportedSQLServers
 from sql.data_model_to_sql.table_generator import LookupTableCreator, PatientIdentifierHash
 
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
@@ -38,11 +37,11 @@ if __name__ == "__main__":
 
     location: str = '../Sql_Commands/test.txt'
 
-    o3_db = MSSQLConnection.create_connection(ServerToConnect.O3)
-    aura_db = MSSQLConnection.create_connection(ServerToConnect.Aura)
-
-    # Aria integration is available via sql.aria_integration.patient.Patient
-    # but PHI must not be logged — use secure data handling practices instead
+    # Aria integration is available via sql.aria_integration.patient.Patient. PHI must not be
+    # logged — use secure data handling practices instead. Borrow connections from a pool that
+    # the with block closes:
+    # with ConnectionPool.for_server(ServerToConnect.Aura) as aura_pool:
+    #     rows = Patient(aura_pool).get_data(num_results=10)
 
     # write_sql_to_text(location, [v for _, v in tables.items()], write_mode='w')
     # write_sql_to_text(location, insert_commands, write_mode='a')
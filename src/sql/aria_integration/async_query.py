@@ -0,0 +1,269 @@
+"""Asyncio interface running Datatable queries on a bounded thread pool."""
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import logging
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+from pyodbc import Row
+
+from sql.aria_integration.columnar import ColumnarTable
+from sql.aria_integration.queried_datatable import Datatable, QueryHandle
+from sql.connection.pool import ConnectionPool
+
+_DONE = object()
+
+
+class AsyncQueryExecutor:
+    """
+    A bounded thread pool that runs blocking pyodbc calls for asyncio callers.
+
+    At most ``max_workers`` queries run at once; further calls wait for a
+    free worker without blocking the event loop. A call that exceeds its
+    timeout, or whose task is cancelled, has its statements cancelled on
+    the server through ``cursor.cancel()`` so the worker and its pooled
+    connection are freed promptly. A call still waiting for a pooled
+    connection gives up after the same timeout.
+
+    Parameters
+    ----------
+    max_workers : int, optional
+        Maximum number of queries running at once. Defaults to 4.
+    default_timeout : float, optional
+        Seconds a call may take when no ``timeout`` is given. None waits
+        indefinitely.
+
+    Raises
+    ------
+    ValueError
+        If ``max_workers`` is less than 1.
+    """
+
+    def __init__(self, max_workers: int = 4, default_timeout: float | None = None):
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be >= 1, got {max_workers}")
+        self.max_workers = max_workers
+        self.default_timeout = default_timeout
+        self.__executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="o3-query"
+        )
+        self.__iterator_slots: dict[int, asyncio.Semaphore] = {}
+
+    def iterator_slots(self, pool: ConnectionPool) -> asyncio.Semaphore:
+        """
+        Limits the open ``AsyncDatatable.batches`` iterators on ``pool``.
+
+        An open iterator holds its connection between batches. At most
+        ``min(pool.max_size, max_workers) - 1`` (and at least one) are open at
+        once, so other calls always have a connection to finish on and
+        workers never all wait on connections held by suspended iterators.
+        """
+        slots = self.__iterator_slots.get(id(pool))
+        if slots is None:
+            slots = asyncio.Semaphore(max(1, min(pool.max_size, self.max_workers) - 1))
+            self.__iterator_slots[id(pool)] = slots
+        return slots
+
+    @classmethod
+    def for_pool(cls, pool: ConnectionPool, **kwargs) -> AsyncQueryExecutor:
+        """An executor with one worker per connection the pool may open."""
+        return cls(max_workers=pool.max_size, **kwargs)
+
+    async def __aenter__(self) -> AsyncQueryExecutor:
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Wait for running queries to finish, then stop the worker threads."""
+        await asyncio.get_running_loop().run_in_executor(None, self.__executor.shutdown)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.__executor.shutdown(wait=wait)
+
+    async def run(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        timeout: float | None = None,
+        handle: QueryHandle | None = None,
+    ) -> Any:
+        """
+        Run ``func(*args)`` on a worker thread and await its result.
+
+        Parameters
+        ----------
+        func : Callable
+            the blocking call, typically a Datatable method
+        timeout : float, optional
+            Seconds to wait before cancelling the call. Defaults to
+            ``default_timeout``.
+        handle : QueryHandle, optional
+            Handle the call's cursors are registered with; a new one is used
+            when omitted.
+
+        Raises
+        ------
+        TimeoutError
+            If the call did not finish within the timeout.
+        """
+        handle = QueryHandle() if handle is None else handle
+        future = self.submit(handle, func, *args, timeout=timeout)
+        return await self.wait(future, handle, timeout)
+
+    def submit(
+        self, handle: QueryHandle, func: Callable[..., Any], *args: Any, timeout: float | None = None
+    ) -> concurrent.futures.Future:
+        """Start ``func(*args)`` on a worker with ``handle`` active.
+
+        ``timeout`` (default ``default_timeout``) also bounds the wait for a
+        pooled connection.
+        """
+        handle.acquire_timeout = self.default_timeout if timeout is None else timeout
+        return self.__executor.submit(_run_with_handle, handle, func, args)
+
+    async def wait(
+        self,
+        future: concurrent.futures.Future,
+        handle: QueryHandle,
+        timeout: float | None = None,
+    ) -> Any:
+        """Await a submitted call, cancelling its statements on timeout or cancellation."""
+        timeout = self.default_timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            handle.cancel()
+            raise TimeoutError(f"Query did not finish within {timeout} seconds") from None
+        except asyncio.CancelledError:
+            handle.cancel()
+            raise
+
+
+class AsyncDatatable:
+    """
+    Awaitable access to a ``Datatable`` subclass such as ``Patient``.
+
+    Each method forwards its arguments to the wrapped table's method of the
+    same role (``get_data``, ``get_batches``, ``get_columnar``) and runs it
+    on ``executor``. The table must query through a ``ConnectionPool``,
+    because pyodbc connections cannot be shared between worker threads.
+
+    Parameters
+    ----------
+    datatable : Datatable
+        the query to run, constructed with a ConnectionPool
+    executor : AsyncQueryExecutor
+        the thread pool to run it on
+
+    Raises
+    ------
+    TypeError
+        If the table does not use a ConnectionPool.
+    """
+
+    def __init__(self, datatable: Datatable, executor: AsyncQueryExecutor):
+        if not isinstance(datatable.connection, ConnectionPool):
+            raise TypeError(
+                "AsyncDatatable requires a Datatable constructed with a ConnectionPool, "
+                f"got {type(datatable.connection).__name__}"
+            )
+        self.datatable = datatable
+        self.executor = executor
+
+    async def fetch(self, *args: Any, timeout: float | None = None, **kwargs: Any) -> list[Row]:
+        """
+        Run ``get_data`` and return all of its rows.
+
+        Raises
+        ------
+        TimeoutError
+            If the query did not finish within ``timeout`` seconds.
+        """
+        return await self.executor.run(
+            _fetch_all, self.datatable.get_data, args, kwargs, timeout=timeout
+        )
+
+    async def columnar(self, *args: Any, timeout: float | None = None, **kwargs: Any) -> ColumnarTable:
+        """
+        Run ``get_columnar`` and return its table.
+
+        Raises
+        ------
+        TimeoutError
+            If the query did not finish within ``timeout`` seconds.
+        """
+        return await self.executor.run(
+            _call, self.datatable.get_columnar, args, kwargs, timeout=timeout
+        )
+
+    async def batches(
+        self, *args: Any, timeout: float | None = None, **kwargs: Any
+    ) -> AsyncIterator[list[Row]]:
+        """
+        Run ``get_batches``, yielding each batch as it is fetched.
+
+        ``timeout`` applies to each round trip (executing the query and every
+        ``fetchmany``), not to the time the caller spends between batches.
+        Leaving the loop early closes the query and returns its connection.
+        The iterator holds a pooled connection while open, so it first waits
+        for one of the executor's ``iterator_slots`` for the pool.
+
+        Raises
+        ------
+        TimeoutError
+            If a round trip did not finish within ``timeout`` seconds.
+        """
+        handle = QueryHandle()
+        executor = self.executor
+        slots = executor.iterator_slots(self.datatable.connection)
+        async with slots:
+            batches = await executor.run(
+                _call, self.datatable.get_batches, args, kwargs, timeout=timeout, handle=handle
+            )
+            pending = None
+            finished = False
+            try:
+                while True:
+                    pending = executor.submit(handle, next, batches, _DONE, timeout=timeout)
+                    batch = await executor.wait(pending, handle, timeout)
+                    pending = None
+                    if batch is _DONE:
+                        finished = True
+                        return
+                    yield batch
+            finally:
+                if not finished:
+                    # Release the connection held by an abandoned, timed-out or cancelled fetch
+                    closing = executor.submit(QueryHandle(), _close_after, batches, pending)
+                    try:
+                        await asyncio.wrap_future(closing)
+                    except Exception as e:
+                        logging.debug(f"Ignoring error while closing query: {e}")
+
+
+def _run_with_handle(handle: QueryHandle, func: Callable[..., Any], args: tuple) -> Any:
+    with handle.activate():
+        return func(*args)
+
+
+def _call(func: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+    return func(*args, **kwargs)
+
+
+def _fetch_all(func: Callable[..., Any], args: tuple, kwargs: dict) -> list:
+    return list(func(*args, **kwargs))
+
+
+def _close_after(generator, pending: concurrent.futures.Future | None) -> None:
+    """Close a batch generator once any fetch still running on it has stopped."""
+    if pending is not None:
+        concurrent.futures.wait([pending])
+    generator.close()
+
+
+if __name__ == "__main__":
+    pass
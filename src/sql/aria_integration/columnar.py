@@ -0,0 +1,296 @@
+"""Columnar materialization of query results into typed NumPy buffers."""
+from __future__ import annotations
+
+import datetime
+from collections.abc import Sequence
+from typing import Any
+
+_NULLS_PREFIX = "__nulls__"
+
+
+class ColumnarTable:
+    """
+    Query results held as one NumPy array per column.
+
+    Numeric columns are ``int64`` or ``float64``, dates and datetimes are
+    ``datetime64``, and strings use NumPy's variable-width ``StringDType``
+    (object arrays on NumPy < 2). ``DECIMAL`` columns stay ``object`` arrays
+    of ``decimal.Decimal`` so no precision is lost; use ``astype(float)``
+    where float64 is good enough. Columns containing NULLs carry a boolean
+    null mask; the masked slots hold 0, NaN, NaT or None. Slicing and
+    filtering return new tables over the same or selected arrays without
+    creating per-row objects. Requires NumPy (``pip install py-o3[numpy]``).
+
+    Parameters
+    ----------
+    columns : dict[str, numpy.ndarray]
+        column name to values, all of the same length
+    nulls : dict[str, numpy.ndarray], optional
+        column name to a boolean mask of NULL rows, for columns that have any
+
+    Raises
+    ------
+    ValueError
+        If the columns or masks differ in length.
+    """
+
+    def __init__(self, columns: dict[str, Any], nulls: dict[str, Any] | None = None):
+        lengths = {len(values) for values in columns.values()}
+        lengths.update(len(mask) for mask in (nulls or {}).values())
+        if len(lengths) > 1:
+            raise ValueError(f"Columns must all have the same length, got {sorted(lengths)}")
+        self.__columns = dict(columns)
+        self.__nulls = dict(nulls or {})
+        self.__num_rows = lengths.pop() if lengths else 0
+
+    @property
+    def names(self) -> list[str]:
+        return list(self.__columns)
+
+    @property
+    def num_rows(self) -> int:
+        return self.__num_rows
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the column buffers and null masks."""
+        return sum(values.nbytes for values in self.__columns.values()) + sum(
+            mask.nbytes for mask in self.__nulls.values()
+        )
+
+    def __len__(self) -> int:
+        return self.__num_rows
+
+    def __getitem__(self, key):
+        """A column by name, or a sliced or filtered table for any other key."""
+        if isinstance(key, str):
+            return self.column(key)
+        if isinstance(key, slice):
+            return self.slice(key.start, key.stop, key.step)
+        return self.filter(key)
+
+    def __repr__(self) -> str:
+        return f"ColumnarTable(rows={self.__num_rows}, columns={self.names})"
+
+    def column(self, name: str):
+        """The values of a column; NULL slots are only meaningful through ``null_mask``."""
+        try:
+            return self.__columns[name]
+        except KeyError:
+            raise KeyError(f"No column '{name}'. Available: {self.names}") from None
+
+    def null_mask(self, name: str):
+        """Boolean mask of the column's NULL rows."""
+        np = _import_numpy()
+        values = self.column(name)
+        mask = self.__nulls.get(name)
+        return mask if mask is not None else np.zeros(len(values), dtype=bool)
+
+    def slice(self, start: int | None = None, stop: int | None = None, step: int | None = None) -> ColumnarTable:
+        """Rows ``start:stop:step`` as views of this table's buffers."""
+        selection = slice(start, stop, step)
+        return ColumnarTable(
+            {name: values[selection] for name, values in self.__columns.items()},
+            {name: mask[selection] for name, mask in self.__nulls.items()},
+        )
+
+    def filter(self, selection) -> ColumnarTable:
+        """Rows selected by a boolean mask or an array of row indexes."""
+        return ColumnarTable(
+            {name: values[selection] for name, values in self.__columns.items()},
+            {name: mask[selection] for name, mask in self.__nulls.items()},
+        )
+
+    def save(self, path: str) -> None:
+        """
+        Write the table to a NumPy ``.npz`` archive.
+
+        String and object columns, including decimals, are stored as
+        fixed-width unicode so the archive can be loaded without pickle;
+        they load back as strings.
+        """
+        np = _import_numpy()
+        arrays = {}
+        for name, values in self.__columns.items():
+            if values.dtype.kind in ("O", "T"):
+                mask = self.null_mask(name)
+                filled = values.copy()
+                filled[mask] = ""
+                values = _fixed_width(np, filled)
+            arrays[name] = values
+        for name, mask in self.__nulls.items():
+            arrays[f"{_NULLS_PREFIX}{name}"] = mask
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> ColumnarTable:
+        """Read a table written by ``save``."""
+        np = _import_numpy()
+        columns: dict[str, Any] = {}
+        nulls: dict[str, Any] = {}
+        with np.load(path, allow_pickle=False) as archive:
+            for name in archive.files:
+                if name.startswith(_NULLS_PREFIX):
+                    nulls[name[len(_NULLS_PREFIX):]] = archive[name]
+                else:
+                    columns[name] = archive[name]
+        string_dtype = _string_dtype(np)
+        for name, values in columns.items():
+            if values.dtype.kind == "U":
+                values = values.astype(string_dtype)
+                if name in nulls:
+                    values[nulls[name]] = None
+                columns[name] = values
+        return cls(columns, nulls)
+
+
+class ColumnarBuilder:
+    """
+    Fills typed column buffers from batches of fetched rows.
+
+    Buffers are allocated for ``capacity`` rows from the cursor description
+    and doubled whenever a batch does not fit, so rows are copied into
+    contiguous arrays one batch at a time.
+
+    Parameters
+    ----------
+    description : Sequence
+        a DB-API ``cursor.description``; the second item of each column is
+        the Python type pyodbc reports for it
+    capacity : int
+        rows to allocate up front
+    """
+
+    def __init__(self, description: Sequence, capacity: int):
+        np = _import_numpy()
+        capacity = max(capacity, 1)
+        self.__names = [column[0] for column in description]
+        self.__kinds = [_column_kind(column[1]) for column in description]
+        self.__buffers = [np.empty(capacity, dtype=_dtype(np, kind)) for kind in self.__kinds]
+        self.__nulls: list[Any] = [None] * len(self.__names)
+        self.__rows = 0
+
+    @property
+    def rows(self) -> int:
+        return self.__rows
+
+    def append(self, rows: Sequence[Sequence]) -> None:
+        """Copy one batch of rows into the column buffers."""
+        if not rows:
+            return
+        np = _import_numpy()
+        start, stop = self.__rows, self.__rows + len(rows)
+        self.__reserve(np, stop)
+        for index, kind in enumerate(self.__kinds):
+            values = [row[index] for row in rows]
+            missing = [i for i, value in enumerate(values) if value is None]
+            if missing:
+                fill = _NULL_FILL[kind]
+                for i in missing:
+                    values[i] = fill
+                if self.__nulls[index] is None:
+                    self.__nulls[index] = np.zeros(len(self.__buffers[index]), dtype=bool)
+                self.__nulls[index][np.asarray(missing) + start] = True
+            self.__buffers[index][start:stop] = values
+        self.__rows = stop
+
+    def build(self) -> ColumnarTable:
+        """A table over the filled rows; buffers are trimmed to the row count."""
+        size = self.__rows
+        columns = {
+            name: buffer[:size].copy() if len(buffer) > size else buffer
+            for name, buffer in zip(self.__names, self.__buffers, strict=True)
+        }
+        nulls = {
+            name: mask[:size].copy()
+            for name, mask in zip(self.__names, self.__nulls, strict=True)
+            if mask is not None
+        }
+        return ColumnarTable(columns, nulls)
+
+    def __reserve(self, np, rows: int) -> None:
+        capacity = len(self.__buffers[0]) if self.__buffers else rows
+        if rows <= capacity:
+            return
+        while capacity < rows:
+            capacity *= 2
+        for index, buffer in enumerate(self.__buffers):
+            grown = np.empty(capacity, dtype=buffer.dtype)
+            grown[:self.__rows] = buffer[:self.__rows]
+            self.__buffers[index] = grown
+            mask = self.__nulls[index]
+            if mask is not None:
+                grown_mask = np.zeros(capacity, dtype=bool)
+                grown_mask[:self.__rows] = mask[:self.__rows]
+                self.__nulls[index] = grown_mask
+
+
+def _column_kind(type_code) -> str:
+    """Buffer kind for a column's reported Python type."""
+    if type_code is bool:
+        return "bool"
+    if type_code is int:
+        return "int"
+    if type_code is float:
+        return "float"
+    if type_code is datetime.datetime:
+        return "datetime"
+    if type_code is datetime.date:
+        return "date"
+    if type_code is str:
+        return "string"
+    return "object"
+
+
+_NULL_FILL = {
+    "bool": False,
+    "int": 0,
+    "float": float("nan"),
+    "datetime": None,
+    "date": None,
+    "string": None,
+    "object": None,
+}
+
+
+def _dtype(np, kind: str):
+    return {
+        "bool": np.bool_,
+        "int": np.int64,
+        "float": np.float64,
+        "datetime": "datetime64[us]",
+        "date": "datetime64[D]",
+        "string": _string_dtype(np),
+        "object": object,
+    }[kind]
+
+
+def _string_dtype(np):
+    """Variable-width strings with None as the missing value, or object on NumPy < 2."""
+    dtypes = getattr(np, "dtypes", None)
+    if dtypes is not None and hasattr(dtypes, "StringDType"):
+        return dtypes.StringDType(na_object=None)
+    return object
+
+
+def _fixed_width(np, values):
+    """Strings as a fixed-width unicode array wide enough for the longest value."""
+    if values.dtype.kind == "O":
+        return values.astype(np.str_)
+    width = int(np.strings.str_len(values).max()) if len(values) else 0
+    return values.astype(f"U{max(width, 1)}")
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError(
+            "Columnar results require NumPy; "
+            "install it with `pip install py-o3[numpy]`."
+        ) from e
+    return numpy
+
+
+if __name__ == "__main__":
+    pass
@@ -1,9 +1,14 @@
 """Patient data query executor for the Aria data warehouse."""
+from __future__ import annotations
+
 from collections.abc import Generator, Iterable
 
 from pyodbc import Connection, Row
 
+from sql.aria_integration.columnar import ColumnarTable
 from sql.aria_integration.queried_datatable import Datatable
+from sql.aria_integration.result_cache import ResultCache
+from sql.connection.pool import ConnectionPool
 
 
 class Patient(Datatable):
@@ -15,8 +20,13 @@ class Patient(Datatable):
 
     _QUERY_FILE: str = 'Aura/patient.sql'
 
-    def __init__(self, connection: Connection):
-        super().__init__(connection, self._QUERY_FILE)
+    def __init__(
+        self,
+        connection: Connection | ConnectionPool,
+        arraysize: int = Datatable._DEFAULT_ARRAYSIZE,
+        result_cache: ResultCache | None = None,
+    ):
+        super().__init__(connection, self._QUERY_FILE, arraysize=arraysize, result_cache=result_cache)
 
     def get_data(self, num_results: int | None = None) -> Iterable[Row] | Generator[Row, None, None]:
         """
@@ -34,6 +44,45 @@ class Patient(Datatable):
         """
         return self._get_data(num_results=num_results)
 
+    def get_batches(self, chunk_size: int | None = None) -> Generator[list[Row], None, None]:
+        """
+        Execute the patient demographics query, yielding rows in batches.
+
+        Parameters
+        ----------
+        chunk_size : int, optional
+            Rows per batch. Defaults to ``arraysize``.
+
+        Returns
+        -------
+        Generator[list[pyodbc.Row], None, None]
+            Lists of up to ``chunk_size`` rows; throughput is recorded in
+            ``last_fetch_stats``.
+        """
+        return self._get_batches(chunk_size=chunk_size)
+
+    def get_columnar(
+        self, num_results: int | None = None, chunk_size: int | None = None
+    ) -> ColumnarTable:
+        """
+        Execute the patient demographics query into typed column arrays.
+
+        Requires NumPy (``pip install py-o3[numpy]``).
+
+        Parameters
+        ----------
+        num_results : int, optional
+            Maximum number of rows to read. If None, reads every row.
+        chunk_size : int, optional
+            Rows fetched per batch. Defaults to ``arraysize``.
+
+        Returns
+        -------
+        ColumnarTable
+            One NumPy array per result column.
+        """
+        return self._get_columnar(num_results=num_results, chunk_size=chunk_size)
+
 
 if __name__ == "__main__":
     pass
@@ -1,9 +1,17 @@
 """Patient information query executor for the Aria data warehouse."""
+from __future__ import annotations
+
+import logging
 from collections.abc import Generator, Iterable
+from itertools import groupby, islice
 
+import pyodbc
 from pyodbc import Connection, Row
 
+from sql.aria_integration.columnar import ColumnarTable
 from sql.aria_integration.queried_datatable import Datatable
+from sql.aria_integration.result_cache import ResultCache
+from sql.connection.pool import ConnectionPool
 
 
 class PatientInformation(Datatable):
@@ -15,14 +23,36 @@ class PatientInformation(Datatable):
 
     Parameters
     ----------
-    connection : pyodbc.Connection
-        An active pyodbc connection to the Aura data warehouse.
+    connection : pyodbc.Connection | ConnectionPool
+        An active pyodbc connection to the Aura data warehouse, or a pool
+        to borrow connections from.
+    arraysize : int, optional
+        Rows requested per ``fetchmany`` call. Defaults to 1000.
+    result_cache : ResultCache, optional
+        Cache for ``get_data`` results. Results hold PHI, so they are only
+        written to an encrypted disk tier.
     """
 
     _QUERY_FILE: str = 'Aura/patient_information.sql'
+    _BATCH_QUERY_FILE: str = 'Aura/patient_information_batch.sql'
+    _DEFAULT_BATCH_SIZE: int = 1000
+
+    _CREATE_MRN_TABLE: str = (
+        "DROP TABLE IF EXISTS #PatientMrn; "
+        "CREATE TABLE #PatientMrn (Seq INT IDENTITY(1, 1) NOT NULL PRIMARY KEY, "
+        "Mrn NVARCHAR(64) COLLATE DATABASE_DEFAULT NOT NULL);"
+    )
+    _CLEAR_MRN_TABLE: str = "TRUNCATE TABLE #PatientMrn;"
+    _INSERT_MRN: str = "INSERT INTO #PatientMrn (Mrn) VALUES (?);"
+    _DROP_MRN_TABLE: str = "DROP TABLE IF EXISTS #PatientMrn;"
 
-    def __init__(self, connection: Connection):
-        super().__init__(connection, self._QUERY_FILE)
+    def __init__(
+        self,
+        connection: Connection | ConnectionPool,
+        arraysize: int = Datatable._DEFAULT_ARRAYSIZE,
+        result_cache: ResultCache | None = None,
+    ):
+        super().__init__(connection, self._QUERY_FILE, arraysize=arraysize, result_cache=result_cache)
 
     def get_data(
         self, mrn: str, num_results: int | None = None
@@ -46,6 +76,139 @@ class PatientInformation(Datatable):
             raise ValueError("mrn must be a non-empty string")
         return self._get_data(num_results=num_results, params=(mrn,))
 
+    def get_batches(
+        self, mrn: str, chunk_size: int | None = None
+    ) -> Generator[list[Row], None, None]:
+        """
+        Execute the patient information query for an MRN, yielding rows in batches.
+
+        Parameters
+        ----------
+        mrn : str
+            The medical record number to query.
+        chunk_size : int, optional
+            Rows per batch. Defaults to ``arraysize``.
+
+        Returns
+        -------
+        Generator[list[pyodbc.Row], None, None]
+            Lists of up to ``chunk_size`` rows; throughput is recorded in
+            ``last_fetch_stats``.
+        """
+        if not mrn:
+            raise ValueError("mrn must be a non-empty string")
+        return self._get_batches(chunk_size=chunk_size, params=(mrn,))
+
+    def get_columnar(
+        self, mrn: str, num_results: int | None = None, chunk_size: int | None = None
+    ) -> ColumnarTable:
+        """
+        Execute the patient information query for an MRN into typed column arrays.
+
+        Requires NumPy (``pip install py-o3[numpy]``).
+
+        Parameters
+        ----------
+        mrn : str
+            The medical record number to query.
+        num_results : int, optional
+            Maximum number of rows to read. If None, reads every row.
+        chunk_size : int, optional
+            Rows fetched per batch. Defaults to ``arraysize``.
+
+        Returns
+        -------
+        ColumnarTable
+            One NumPy array per result column.
+        """
+        if not mrn:
+            raise ValueError("mrn must be a non-empty string")
+        return self._get_columnar(num_results=num_results, chunk_size=chunk_size, params=(mrn,))
+
+    def get_data_for_mrns(
+        self, mrns: Iterable[str], batch_size: int = _DEFAULT_BATCH_SIZE
+    ) -> Generator[tuple[str, list[Row]], None, None]:
+        """
+        Execute the patient information query for many MRNs at once.
+
+        MRNs are sent ``batch_size`` at a time into a ``#PatientMrn``
+        temporary table with ``fast_executemany`` and joined in a single
+        query per batch, replacing one round trip per patient with a few
+        per batch. All batches run on one connection, borrowed from the
+        pool for the lifetime of the generator when a pool was given.
+
+        Parameters
+        ----------
+        mrns : Iterable[str]
+            Medical record numbers to query. Exact duplicates are queried
+            once. Spellings the database collation treats as equal, such
+            as ``"ab12"`` and ``"AB12 "``, are each yielded with the rows
+            they match.
+        batch_size : int, optional
+            Number of MRNs sent per batch. Defaults to 1000.
+
+        Yields
+        ------
+        tuple[str, list[pyodbc.Row]]
+            Each requested MRN with its rows, in the order of
+            ``get_data``. Rows carry the MRN as an extra first column.
+            MRNs without rows are yielded with an empty list at the end
+            of their batch.
+
+        Raises
+        ------
+        ValueError
+            If ``batch_size`` is less than 1 or an MRN is empty.
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be >= 1, got {batch_size}")
+        return self.__batched_data(iter(mrns), batch_size)
+
+    def __batched_data(
+        self, mrns: Iterable[str], batch_size: int
+    ) -> Generator[tuple[str, list[Row]], None, None]:
+        query = self._read_query(self._BATCH_QUERY_FILE)
+        logging.info(f"Executing batched query from {self._BATCH_QUERY_FILE}")
+        seen: set[str] = set()
+        try:
+            with self._borrow_connection() as connection:
+                cursor = self._open_cursor(connection)
+                cursor.fast_executemany = True
+                cursor.execute(self._CREATE_MRN_TABLE)
+                try:
+                    while batch := self.__next_batch(mrns, batch_size, seen):
+                        cursor.execute(self._CLEAR_MRN_TABLE)
+                        cursor.executemany(self._INSERT_MRN, [(mrn,) for mrn in batch])
+                        found = set()
+                        for mrn, rows in groupby(cursor.execute(query), key=lambda row: row[0]):
+                            found.add(mrn)
+                            yield mrn, list(rows)
+                        for mrn in batch:
+                            if mrn not in found:
+                                yield mrn, []
+                finally:
+                    cursor.execute(self._DROP_MRN_TABLE)
+        except pyodbc.Error as e:
+            raise RuntimeError(
+                f"Error executing query from '{self._BATCH_QUERY_FILE}': {e}"
+            ) from e
+
+    @staticmethod
+    def __next_batch(mrns: Iterable[str], batch_size: int, seen: set[str]) -> list[str]:
+        """Take up to ``batch_size`` MRNs not already queried."""
+        batch = []
+        while len(batch) < batch_size:
+            chunk = list(islice(mrns, batch_size - len(batch)))
+            if not chunk:
+                break
+            for mrn in chunk:
+                if not mrn:
+                    raise ValueError("mrn must be a non-empty string")
+                if mrn not in seen:
+                    seen.add(mrn)
+                    batch.append(mrn)
+        return batch
+
 
 if __name__ == "__main__":
     pass
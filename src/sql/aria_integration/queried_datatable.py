@@ -2,13 +2,108 @@
 from __future__ import annotations
 
 import logging
-from collections.abc import Generator, Iterable
+import threading
+import time
+from collections.abc import Callable, Generator, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
 
 import pyodbc
 from pyodbc import Connection
 
+from helpers.memory import row_bytes
+from sql.aria_integration.columnar import ColumnarBuilder, ColumnarTable
+from sql.aria_integration.result_cache import CacheKey, ResultCache, hash_params, hash_query
+from sql.connection.pool import ConnectionPool
+
 _QUERIES_DIR = Path(__file__).resolve().parent.parent / "queries"
+_active = threading.local()
+
+
+@dataclass
+class FetchStats:
+    """
+    Throughput of one chunked fetch, updated as each batch is read.
+
+    Attributes
+    ----------
+    rows: int
+        rows fetched so far
+    batches: int
+        ``fetchmany`` calls that returned rows
+    bytes: int
+        approximate Python memory held by the fetched rows
+    seconds: float
+        time from executing the query to the latest batch
+    arraysize: int
+        ``cursor.arraysize`` used for the fetch
+    """
+
+    rows: int = 0
+    batches: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    arraysize: int = 0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+
+class QueryHandle:
+    """
+    The cursors opened by one query, so that another thread can cancel it.
+
+    While a thread runs inside ``activate()``, every cursor a ``Datatable``
+    opens on that thread is registered with the handle. ``cancel()`` calls
+    ``cursor.cancel()`` on each of them, stopping the statement on the
+    server, and makes later cursor opens for the handle fail.
+    ``acquire_timeout`` bounds how long the handle's work waits for a
+    pooled connection, since there is no cursor to cancel until one is
+    borrowed.
+    """
+
+    def __init__(self, acquire_timeout: float | None = None):
+        self.acquire_timeout = acquire_timeout
+        self.__lock = threading.Lock()
+        self.__cursors: list = []
+        self.__cancelled = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self.__cancelled
+
+    @contextmanager
+    def activate(self) -> Iterator[QueryHandle]:
+        """Register cursors opened on the current thread with this handle."""
+        previous = getattr(_active, "handle", None)
+        _active.handle = self
+        try:
+            yield self
+        finally:
+            _active.handle = previous
+
+    def register(self, cursor) -> None:
+        with self.__lock:
+            if self.__cancelled:
+                raise RuntimeError("Query was cancelled")
+            self.__cursors.append(cursor)
+
+    def cancel(self) -> None:
+        """Cancel every statement running on the handle's cursors."""
+        with self.__lock:
+            self.__cancelled = True
+            cursors = list(self.__cursors)
+        for cursor in cursors:
+            try:
+                cursor.cancel()
+            except pyodbc.Error as e:
+                logging.debug(f"Ignoring error while cancelling query: {e}")
 
 
 class Datatable:
@@ -25,26 +120,83 @@ class Datatable:
 
     The caller is responsible for managing the connection lifecycle.
     This class does not close or otherwise manage the provided connection.
+    When a ``ConnectionPool`` is passed instead, each query borrows a
+    connection from the pool and returns it once its results have been
+    read.
+
+    ``arraysize`` sets ``cursor.arraysize`` and the default batch size of
+    the chunked mode (``_get_batches``), which yields lists of rows from
+    ``fetchmany`` and records its throughput in ``last_fetch_stats``. The
+    columnar mode (``_get_columnar``) reads the same batches into typed
+    NumPy column buffers and returns a ``ColumnarTable``.
+
+    With a ``result_cache``, ``_get_data`` results are looked up by query
+    text, parameters and row limit before the query runs, and stored once
+    they have been read in full. ``_CONTAINS_PHI`` tells the cache whether
+    a subclass's results may only be kept in memory or an encrypted tier;
+    it defaults to True.
 
     Parameters
     ----------
-    connection : pyodbc.Connection
-        An active pyodbc connection to the target database.
+    connection : pyodbc.Connection | ConnectionPool
+        An active pyodbc connection to the target database, or a pool
+        to borrow connections from.
     query_location : str
         Path to the SQL query file. Relative paths are resolved against
         the ``sql/queries/`` directory; absolute paths are used as-is.
+    arraysize : int, optional
+        Rows requested per ``fetchmany`` call. Defaults to 1000.
+    result_cache : ResultCache, optional
+        Cache consulted by ``_get_data``. None disables caching.
 
     Raises
     ------
     FileNotFoundError
         If the resolved query file does not exist.
+    ValueError
+        If ``arraysize`` is less than 1.
     """
 
-    def __init__(self, connection: Connection, query_location: str):
+    _DEFAULT_ARRAYSIZE: int = 1000
+    _CONTAINS_PHI: bool = True
+
+    def __init__(
+        self,
+        connection: Connection | ConnectionPool,
+        query_location: str,
+        arraysize: int = _DEFAULT_ARRAYSIZE,
+        result_cache: ResultCache | None = None,
+    ):
+        if arraysize < 1:
+            raise ValueError(f"arraysize must be >= 1, got {arraysize}")
         self.connection = connection
+        self.arraysize = arraysize
+        self.result_cache = result_cache
+        self.last_fetch_stats: FetchStats | None = None
         self.query_location = self.__resolve_path(query_location)
-        with open(self.query_location) as query:
-            self.query = query.read()
+        self.query = self._read_query(self.query_location)
+
+    def invalidate_cache(self, params: tuple[str, ...] | None = None) -> int:
+        """
+        Forget this query's cached results, or only those for ``params``.
+
+        Returns
+        -------
+        int
+            the number of in-memory results removed
+        """
+        if self.result_cache is None:
+            return 0
+        query_hash = hash_query(self.query)
+        if params is None:
+            return self.result_cache.invalidate(query_hash)
+        return self.result_cache.invalidate(query_hash, hash_params(params))
+
+    @classmethod
+    def _read_query(cls, query_location: str) -> str:
+        """Read a SQL file, resolving relative paths against ``sql/queries/``."""
+        with open(cls.__resolve_path(query_location)) as query:
+            return query.read()
 
     @staticmethod
     def __resolve_path(query_location: str) -> str:
@@ -57,24 +209,153 @@ class Datatable:
             raise FileNotFoundError(f"Query file not found: {resolved}")
         return str(resolved)
 
+    @contextmanager
+    def _borrow_connection(self) -> Iterator[Connection]:
+        """Yield the connection to query with, borrowing from the pool when one was given.
+
+        Under an active QueryHandle the borrow waits at most its ``acquire_timeout``.
+        """
+        if isinstance(self.connection, ConnectionPool):
+            handle = getattr(_active, "handle", None)
+            timeout = handle.acquire_timeout if handle is not None else None
+            with self.connection.connection(timeout) as conn:
+                yield conn
+        else:
+            yield self.connection
+
+    def _open_cursor(self, connection: Connection, arraysize: int | None = None) -> pyodbc.Cursor:
+        """A cursor on ``connection``, registered with the thread's active QueryHandle."""
+        cursor = connection.cursor()
+        cursor.arraysize = self.arraysize if arraysize is None else arraysize
+        handle = getattr(_active, "handle", None)
+        if handle is not None:
+            handle.register(cursor)
+        return cursor
+
     def _get_data(
         self,
         num_results: int | None = None,
         params: tuple[str, ...] | None = None,
     ) -> Iterable[pyodbc.Row] | Generator[pyodbc.Row, None, None]:
+        if self.result_cache is not None:
+            key = CacheKey.for_query(self.query, params, num_results)
+            rows = self.result_cache.get(key)
+            if rows is not None:
+                logging.info(f"Serving cached results for {self.query_location}")
+                return list(rows) if num_results is not None else (row for row in rows)
+            logging.info(f"Executing query from {self.query_location}")
+            if num_results is None:
+                return self.__caching_generator(key, params)
+            start = time.perf_counter()
+            rows = self.__data_rows(num_results, params)
+            self.result_cache.put(key, list(rows), time.perf_counter() - start, self._CONTAINS_PHI)
+            return rows
+
         logging.info(f"Executing query from {self.query_location}")
         if num_results is None:
             return self.__data_generator(params)
         else:
             return self.__data_rows(num_results, params)
 
+    def __caching_generator(
+        self, key: CacheKey, params: tuple[str, ...] | None = None
+    ) -> Generator[pyodbc.Row, None, None]:
+        """Stream the query's rows, caching them once every row has been read."""
+        start = time.perf_counter()
+        rows: list[pyodbc.Row] | None = []
+        size = 0
+        for row in self.__data_generator(params):
+            if rows is not None:
+                rows.append(row)
+                size += row_bytes(row)
+                if size > self.result_cache.max_bytes:
+                    # Too large to cache; stop holding on to the rows
+                    rows = None
+            yield row
+        if rows is not None:
+            self.result_cache.put(key, rows, time.perf_counter() - start, self._CONTAINS_PHI)
+
+    def _get_batches(
+        self,
+        chunk_size: int | None = None,
+        params: tuple[str, ...] | None = None,
+    ) -> Generator[list[pyodbc.Row], None, None]:
+        """Yield the query's rows in lists of up to ``chunk_size`` (default ``arraysize``)."""
+        chunk_size = self.arraysize if chunk_size is None else chunk_size
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be >= 1, got {chunk_size}")
+        logging.info(f"Executing query from {self.query_location}")
+        return self.__data_batches(chunk_size, params)
+
+    def _get_columnar(
+        self,
+        num_results: int | None = None,
+        chunk_size: int | None = None,
+        params: tuple[str, ...] | None = None,
+    ) -> ColumnarTable:
+        """Read the query's rows batch by batch into typed column buffers."""
+        chunk_size = self.arraysize if chunk_size is None else chunk_size
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be >= 1, got {chunk_size}")
+        if num_results is not None and num_results < 1:
+            raise ValueError(f"num_results must be >= 1, got {num_results}")
+        logging.info(f"Executing query from {self.query_location}")
+
+        builders: list[ColumnarBuilder] = []
+
+        def start_columns(cursor) -> None:
+            builders.append(ColumnarBuilder(cursor.description, num_results or chunk_size))
+
+        for rows in self.__data_batches(chunk_size, params, num_results, start_columns):
+            builders[0].append(rows)
+        return builders[0].build()
+
+    def __data_batches(
+        self,
+        chunk_size: int,
+        params: tuple[str, ...] | None = None,
+        limit: int | None = None,
+        on_execute: Callable[[pyodbc.Cursor], None] | None = None,
+    ) -> Generator[list[pyodbc.Row], None, None]:
+        stats = FetchStats(arraysize=chunk_size)
+        self.last_fetch_stats = stats
+        try:
+            with self._borrow_connection() as connection:
+                cursor = self._open_cursor(connection, chunk_size)
+                start = time.perf_counter()
+                execute_args = (self.query, params) if params is not None else (self.query,)
+                cursor.execute(*execute_args)
+                if on_execute is not None:
+                    on_execute(cursor)
+                while limit is None or stats.rows < limit:
+                    size = chunk_size if limit is None else min(chunk_size, limit - stats.rows)
+                    rows = cursor.fetchmany(size)
+                    if not rows:
+                        break
+                    stats.rows += len(rows)
+                    stats.batches += 1
+                    stats.bytes += sum(row_bytes(row) for row in rows)
+                    stats.seconds = time.perf_counter() - start
+                    yield rows
+                stats.seconds = time.perf_counter() - start
+        except pyodbc.Error as e:
+            raise RuntimeError(
+                f"Error executing query from '{self.query_location}': {e}"
+            ) from e
+        logging.info(
+            f"Fetched {stats.rows} rows ({stats.bytes} bytes) in {stats.batches} batches "
+            f"from {self.query_location} in {stats.seconds:.2f}s "
+            f"({stats.rows_per_second:.0f} rows/s)"
+        )
+
     def __data_generator(
         self, params: tuple[str, ...] | None = None
     ) -> Generator[pyodbc.Row, None, None]:
         try:
-            cursor = self.connection.cursor()
-            execute_args = (self.query, params) if params is not None else (self.query,)
-            yield from cursor.execute(*execute_args)
+            with self._borrow_connection() as connection:
+                cursor = self._open_cursor(connection)
+                execute_args = (self.query, params) if params is not None else (self.query,)
+                yield from cursor.execute(*execute_args)
         except pyodbc.Error as e:
             raise RuntimeError(
                 f"Error executing query from '{self.query_location}': {e}"
@@ -84,9 +365,10 @@ class Datatable:
         self, num_results: int, params: tuple[str, ...] | None = None
     ) -> list[pyodbc.Row]:
         try:
-            cursor = self.connection.cursor()
-            execute_args = (self.query, params) if params is not None else (self.query,)
-            rows = cursor.execute(*execute_args).fetchmany(num_results)
+            with self._borrow_connection() as connection:
+                cursor = self._open_cursor(connection)
+                execute_args = (self.query, params) if params is not None else (self.query,)
+                rows = cursor.execute(*execute_args).fetchmany(num_results)
         except pyodbc.Error as e:
             raise RuntimeError(
                 f"Error executing query from '{self.query_location}': {e}"
@@ -0,0 +1,392 @@
+"""Time-limited, size-bounded cache of Datatable query results."""
+from __future__ import annotations
+
+import hashlib
+import logging
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Protocol
+
+from helpers.memory import row_bytes
+
+
+class Cipher(Protocol):
+    """Symmetric encryption for the on-disk tier, e.g. ``cryptography.fernet.Fernet``."""
+
+    def encrypt(self, data: bytes) -> bytes: ...
+
+    def decrypt(self, token: bytes) -> bytes: ...
+
+
+@dataclass(frozen=True)
+class CacheKey:
+    """
+    Identifies one cached result.
+
+    Attributes
+    ----------
+    query_hash: str
+        SHA-256 of the query text, so editing a query file never serves old results
+    params_hash: str
+        SHA-256 of the bound parameters
+    num_results: int | None
+        the row limit the result was read with
+    """
+
+    query_hash: str
+    params_hash: str
+    num_results: int | None = None
+
+    @classmethod
+    def for_query(
+        cls, query: str, params: Sequence | None = None, num_results: int | None = None
+    ) -> CacheKey:
+        return cls(hash_query(query), hash_params(params), num_results)
+
+    def __str__(self) -> str:
+        return f"{self.query_hash}:{self.params_hash}:{self.num_results}"
+
+
+@dataclass
+class ResultCacheStats:
+    """
+    Counters describing how a ResultCache has been used.
+
+    Attributes
+    ----------
+    hits: int
+        lookups served from memory or disk
+    disk_hits: int
+        the subset of hits served from the on-disk tier
+    misses: int
+        lookups that had to run the query
+    evictions: int
+        memory entries removed to stay within ``max_bytes``
+    expired: int
+        entries dropped because they outlived the TTL
+    saved_seconds: float
+        query time avoided, the sum of the original run time of every hit
+    entries: int
+        results currently held in memory
+    bytes: int
+        approximate memory held by those results
+    """
+
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expired: int = 0
+    saved_seconds: float = 0.0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class _Entry:
+    """Rows cached in memory together with their size, expiry and original run time."""
+
+    __slots__ = ('rows', 'size', 'expires_at', 'elapsed')
+
+    def __init__(self, rows: list, size: int, expires_at: float, elapsed: float):
+        self.rows = rows
+        self.size = size
+        self.expires_at = expires_at
+        self.elapsed = elapsed
+
+
+class SQLiteResultStore:
+    """
+    On-disk result tier kept in a SQLite database.
+
+    Rows are stored as pickled tuples together with their column names,
+    encrypted with ``cipher`` when one is given. They come back as named
+    tuples, so ``row[0]`` and ``row.ColumnName`` both work as they do on a
+    ``pyodbc.Row``. The
+    least recently used results are deleted once the stored payloads exceed
+    ``max_bytes``. Without a cipher, the database must only be readable and
+    writable by trusted users.
+
+    Parameters
+    ----------
+    path : str
+        the SQLite database file
+    cipher : Cipher, optional
+        encrypts payloads at rest; required for PHI-bearing results
+    max_bytes : int, optional
+        total payload size kept on disk. Defaults to 1 GiB.
+    """
+
+    def __init__(self, path: str, cipher: Cipher | None = None, max_bytes: int = 1024 ** 3):
+        if max_bytes < 1:
+            raise ValueError(f"max_bytes must be >= 1, got {max_bytes}")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.__cipher = cipher
+        self.__lock = threading.Lock()
+        self.__db = sqlite3.connect(path, check_same_thread=False)
+        self.__db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, query_hash TEXT NOT NULL, params_hash TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, last_used REAL NOT NULL, elapsed REAL NOT NULL, "
+            "size INTEGER NOT NULL, payload BLOB NOT NULL)"
+        )
+        self.__db.execute("CREATE INDEX IF NOT EXISTS ix_results_query ON results (query_hash, params_hash)")
+        self.__db.commit()
+
+    @property
+    def encrypted(self) -> bool:
+        return self.__cipher is not None
+
+    def get(self, key: CacheKey, now: float) -> tuple[list, float] | None:
+        """The cached rows and original run time, or None when missing or expired."""
+        with self.__lock:
+            found = self.__db.execute(
+                "SELECT expires_at, elapsed, payload FROM results WHERE key = ?", (str(key),)
+            ).fetchone()
+            if found is None:
+                return None
+            expires_at, elapsed, payload = found
+            if expires_at <= now:
+                self.__db.execute("DELETE FROM results WHERE key = ?", (str(key),))
+                self.__db.commit()
+                return None
+            self.__db.execute("UPDATE results SET last_used = ? WHERE key = ?", (now, str(key)))
+            self.__db.commit()
+        try:
+            if self.__cipher is not None:
+                payload = self.__cipher.decrypt(payload)
+            names, rows = pickle.loads(payload)
+            if names is not None:
+                row_type = _row_type(tuple(names))
+                rows = [row_type._make(row) for row in rows]
+            return rows, elapsed
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable cached result in {self.path}: {e}")
+            self.invalidate(key.query_hash, key.params_hash)
+            return None
+
+    def put(self, key: CacheKey, rows: list, expires_at: float, elapsed: float, now: float) -> None:
+        payload = pickle.dumps(
+            (_column_names(rows), [tuple(row) for row in rows]), protocol=pickle.HIGHEST_PROTOCOL
+        )
+        if self.__cipher is not None:
+            payload = self.__cipher.encrypt(payload)
+        if len(payload) > self.max_bytes:
+            return
+        with self.__lock:
+            self.__db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (str(key), key.query_hash, key.params_hash, expires_at, now, elapsed, len(payload), payload),
+            )
+            self.__evict(now)
+            self.__db.commit()
+
+    def invalidate(self, query_hash: str, params_hash: str | None = None) -> int:
+        """Delete a query's results, or only those for one parameter set."""
+        with self.__lock:
+            if params_hash is None:
+                cursor = self.__db.execute("DELETE FROM results WHERE query_hash = ?", (query_hash,))
+            else:
+                cursor = self.__db.execute(
+                    "DELETE FROM results WHERE query_hash = ? AND params_hash = ?", (query_hash, params_hash)
+                )
+            self.__db.commit()
+            return cursor.rowcount
+
+    def clear(self) -> int:
+        with self.__lock:
+            cursor = self.__db.execute("DELETE FROM results")
+            self.__db.commit()
+            return cursor.rowcount
+
+    def close(self) -> None:
+        with self.__lock:
+            self.__db.close()
+
+    def __evict(self, now: float) -> None:
+        """Drop expired results, then the least recently used until within max_bytes."""
+        self.__db.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+        total = self.__db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.__db.execute(
+            "SELECT key, size FROM results ORDER BY last_used"
+        ).fetchall():
+            self.__db.execute("DELETE FROM results WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+class ResultCache:
+    """
+    Query results kept for ``ttl`` seconds in a byte-bounded LRU, with an optional disk tier.
+
+    A ``Datatable`` given a cache looks up ``_get_data`` calls by query text,
+    parameters and row limit before running them. Results larger than
+    ``max_bytes`` are not cached. PHI-bearing results are only written to
+    ``disk`` when it encrypts payloads; otherwise they stay in memory.
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        approximate memory the cached rows may hold. Defaults to 64 MiB.
+    ttl : float, optional
+        seconds a result stays valid. Defaults to 300.
+    disk : SQLiteResultStore, optional
+        second tier consulted on memory misses and filled on every store
+    clock : Callable[[], float], optional
+        wall-clock source, replaceable in tests
+
+    Raises
+    ------
+    ValueError
+        If ``max_bytes`` or ``ttl`` is not positive.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: float = 300.0,
+        disk: SQLiteResultStore | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        if max_bytes < 1:
+            raise ValueError(f"max_bytes must be >= 1, got {max_bytes}")
+        if ttl <= 0:
+            raise ValueError(f"ttl must be > 0, got {ttl}")
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk = disk
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        self.__entries: OrderedDict[CacheKey, _Entry] = OrderedDict()
+        self.__bytes = 0
+        self.__stats = ResultCacheStats()
+
+    def get(self, key: CacheKey) -> list | None:
+        """The cached rows for ``key``, or None on a miss."""
+        now = self.__clock()
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and entry.expires_at <= now:
+                self.__remove(key)
+                self.__stats.expired += 1
+                entry = None
+            if entry is not None:
+                self.__entries.move_to_end(key)
+                self.__stats.hits += 1
+                self.__stats.saved_seconds += entry.elapsed
+                return entry.rows
+
+        found = self.disk.get(key, now) if self.disk is not None else None
+        with self.__lock:
+            if found is None:
+                self.__stats.misses += 1
+                return None
+            rows, elapsed = found
+            self.__stats.hits += 1
+            self.__stats.disk_hits += 1
+            self.__stats.saved_seconds += elapsed
+            self.__store(key, rows, now + self.ttl, elapsed)
+            return rows
+
+    def put(self, key: CacheKey, rows: list, elapsed: float, contains_phi: bool = True) -> None:
+        """Cache ``rows``, which took ``elapsed`` seconds to query."""
+        now = self.__clock()
+        expires_at = now + self.ttl
+        with self.__lock:
+            self.__store(key, rows, expires_at, elapsed)
+        if self.disk is None:
+            return
+        if contains_phi and not self.disk.encrypted:
+            logging.debug("Keeping PHI result in memory only; the disk tier is not encrypted")
+            return
+        self.disk.put(key, rows, expires_at, elapsed, now)
+
+    def invalidate(self, query_hash: str, params_hash: str | None = None) -> int:
+        """Forget a query's results, or only those for one parameter set; returns memory entries removed."""
+        with self.__lock:
+            keys = [
+                key for key in self.__entries
+                if key.query_hash == query_hash and (params_hash is None or key.params_hash == params_hash)
+            ]
+            for key in keys:
+                self.__remove(key)
+        if self.disk is not None:
+            self.disk.invalidate(query_hash, params_hash)
+        return len(keys)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+            self.__bytes = 0
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> ResultCacheStats:
+        with self.__lock:
+            stats = ResultCacheStats(**vars(self.__stats))
+            stats.entries = len(self.__entries)
+            stats.bytes = self.__bytes
+            return stats
+
+    def __store(self, key: CacheKey, rows: list, expires_at: float, elapsed: float) -> None:
+        size = sum(row_bytes(row) for row in rows) + sys.getsizeof(rows)
+        if key in self.__entries:
+            self.__remove(key)
+        if size > self.max_bytes:
+            return
+        self.__entries[key] = _Entry(rows, size, expires_at, elapsed)
+        self.__bytes += size
+        while self.__bytes > self.max_bytes:
+            oldest = next(iter(self.__entries))
+            self.__remove(oldest)
+            self.__stats.evictions += 1
+
+    def __remove(self, key: CacheKey) -> None:
+        self.__bytes -= self.__entries.pop(key).size
+
+
+def hash_query(query: str) -> str:
+    """SHA-256 of a query's text."""
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+def hash_params(params: Sequence | None) -> str:
+    """SHA-256 of a parameter tuple."""
+    return hashlib.sha256(repr(None if params is None else tuple(params)).encode()).hexdigest()
+
+
+def _column_names(rows: list) -> list[str] | None:
+    """Column names of fetched rows, from ``pyodbc.Row.cursor_description`` or named tuple fields."""
+    if not rows:
+        return None
+    description = getattr(rows[0], "cursor_description", None)
+    if description is not None:
+        return [column[0] for column in description]
+    fields = getattr(rows[0], "_fields", None)
+    return list(fields) if fields is not None else None
+
+
+@lru_cache(maxsize=256)
+def _row_type(names: tuple[str, ...]) -> type:
+    """Named tuple type for rows read back from disk; invalid column names become ``_<index>``."""
+    return namedtuple("Row", names, rename=True)
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,7 @@
+"""Database connection management and pooling."""
+from sql.connection.pool import ConnectionPool, PoolStats
+
+__all__ = [
+    "ConnectionPool",
+    "PoolStats",
+]
@@ -0,0 +1,411 @@
+"""Thread-safe pool of database connections with health checks, idle timeout and lifetime limits."""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from helpers.enums import ServerToConnect
+    from sql.connection.mssql import MSSQLConnection
+
+
+@dataclass
+class PoolStats:
+    """
+    Counters describing how a ConnectionPool has been used.
+
+    Attributes
+    ----------
+    hits: int
+        borrows served by an idle pooled connection
+    misses: int
+        borrows that opened a new connection
+    waits: int
+        borrows that had to wait for a connection to be returned
+    wait_seconds: float
+        total time spent waiting for a connection
+    timeouts: int
+        borrows that gave up waiting
+    health_check_failures: int
+        idle connections discarded because ``SELECT 1`` failed
+    expired: int
+        connections closed for exceeding the idle timeout or the maximum lifetime
+    size: int
+        connections currently open, idle or in use
+    idle: int
+        connections currently waiting in the pool
+    """
+
+    hits: int = 0
+    misses: int = 0
+    waits: int = 0
+    wait_seconds: float = 0.0
+    timeouts: int = 0
+    health_check_failures: int = 0
+    expired: int = 0
+    size: int = 0
+    idle: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of borrows served from the pool."""
+        borrows = self.hits + self.misses
+        return self.hits / borrows if borrows else 0.0
+
+
+class _PooledConnection:
+    """A connection together with the times it was opened and last returned."""
+
+    __slots__ = ('connection', 'created_at', 'returned_at')
+
+    def __init__(self, connection: Any, now: float):
+        self.connection = connection
+        self.created_at = now
+        self.returned_at = now
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of DB-API connections.
+
+    Connections are opened on demand up to ``max_size`` and returned to the pool when the
+    borrowing block exits. Idle connections older than ``idle_timeout`` and connections older
+    than ``max_lifetime`` are closed instead of being reused, and an idle connection is checked
+    with ``SELECT 1`` before it is handed out. ``min_size`` connections are opened up front and
+    kept through idle expiry.
+
+    Borrow connections with the ``connection()`` context manager:
+
+    >>> with pool.connection() as conn:  # doctest: +SKIP
+    ...     conn.cursor().execute("SELECT 1")
+
+    The pool rolls back any uncommitted work when a connection is returned, so callers commit
+    what they want to keep before leaving the block.
+
+    Parameters
+    ----------
+    connect: Callable[[], Any] | MSSQLConnection
+        opens a new connection; an MSSQLConnection is used through its ``connection()`` method
+    min_size: int
+        connections opened when the pool is created and kept open while idle (default 0)
+    max_size: int
+        the most connections open at once (default 5)
+    idle_timeout: float | None
+        seconds an idle connection above ``min_size`` is kept; None keeps it indefinitely (default 300)
+    max_lifetime: float | None
+        seconds after which a connection is closed when returned or borrowed; None disables (default 1800)
+    health_check: bool
+        run ``SELECT 1`` on an idle connection before handing it out (default True)
+    acquire_timeout: float | None
+        default seconds to wait for a connection when the pool is exhausted; None waits indefinitely
+        (default 30)
+    """
+
+    def __init__(self,
+                 connect: Callable[[], Any] | MSSQLConnection,
+                 min_size: int = 0,
+                 max_size: int = 5,
+                 idle_timeout: float | None = 300.0,
+                 max_lifetime: float | None = 1800.0,
+                 health_check: bool = True,
+                 acquire_timeout: float | None = 30.0):
+        if max_size < 1:
+            raise ValueError(f"max_size must be >= 1, got {max_size}")
+        if not 0 <= min_size <= max_size:
+            raise ValueError(f"min_size must be between 0 and max_size ({max_size}), got {min_size}")
+
+        self.__connect: Callable[[], Any] = connect if callable(connect) else connect.connection
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.health_check = health_check
+        self.acquire_timeout = acquire_timeout
+
+        self.__idle: deque[_PooledConnection] = deque()
+        self.__in_use: dict[int, _PooledConnection] = {}
+        self.__size = 0
+        self.__closed = False
+        self.__stats = PoolStats()
+        self.__condition = threading.Condition()
+
+        for _ in range(min_size):
+            self.__idle.append(_PooledConnection(self.__connect(), time.monotonic()))
+            self.__size += 1
+
+    @classmethod
+    def for_server(cls, sql_server: ServerToConnect, **kwargs) -> ConnectionPool:
+        """
+        Creates a pool for the O3 or Aura server configured in the .env file.
+
+        Parameters
+        ----------
+        sql_server: ServerToConnect
+            The type of server to connect.
+        kwargs
+            passed to the ConnectionPool constructor
+
+        Returns
+        -------
+            ConnectionPool
+                the pool opening connections through MSSQLConnection
+        """
+        from sql.connection.mssql import MSSQLConnection
+
+        return cls(MSSQLConnection.create_connection(sql_server), **kwargs)
+
+    def __enter__(self) -> ConnectionPool:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @contextmanager
+    def connection(self, timeout: float | None = None) -> Iterator[Any]:
+        """
+        Borrows a connection for the duration of the block.
+
+        Parameters
+        ----------
+        timeout: float | None
+            seconds to wait when the pool is exhausted; defaults to the pool's acquire_timeout
+
+        Yields
+        -------
+            Any
+                the borrowed connection
+
+        Raises
+        ------
+        TimeoutError
+            If no connection becomes available in time
+        """
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def acquire(self, timeout: float | None = None) -> Any:
+        """
+        Borrows a connection; it must be handed back with release().
+
+        Parameters
+        ----------
+        timeout: float | None
+            seconds to wait when the pool is exhausted; defaults to the pool's acquire_timeout
+
+        Returns
+        -------
+            Any
+                the borrowed connection
+
+        Raises
+        ------
+        TimeoutError
+            If no connection becomes available in time
+        RuntimeError
+            If the pool has been closed
+        """
+        if timeout is None:
+            timeout = self.acquire_timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            pooled = self.__checkout(deadline, timeout)
+            if pooled is None:
+                return self.__open()
+
+            # Checked outside the lock so a slow server does not block other borrowers
+            if not self.health_check or _is_healthy(pooled.connection):
+                with self.__condition:
+                    self.__stats.hits += 1
+                    self.__in_use[id(pooled.connection)] = pooled
+                return pooled.connection
+
+            with self.__condition:
+                self.__stats.health_check_failures += 1
+                self.__size -= 1
+                self.__condition.notify()
+            _close_quietly(pooled.connection)
+
+    def release(self, conn: Any, discard: bool = False) -> None:
+        """
+        Returns a borrowed connection to the pool, rolling back uncommitted work.
+
+        Parameters
+        ----------
+        conn: Any
+            a connection obtained from acquire() or connection()
+        discard: bool
+            close the connection instead of returning it to the pool
+
+        Returns
+        -------
+            None
+        """
+        with self.__condition:
+            pooled = self.__in_use.pop(id(conn), None)
+        if pooled is None:
+            raise ValueError("Connection was not borrowed from this pool")
+
+        if not discard:
+            try:
+                conn.rollback()
+            except Exception as e:
+                logging.warning(f"Discarding pooled connection after failed rollback: {e}")
+                discard = True
+
+        now = time.monotonic()
+        with self.__condition:
+            if not discard and self.__expired(pooled, now, idle=False):
+                self.__stats.expired += 1
+                discard = True
+
+            if discard or self.__closed:
+                self.__size -= 1
+            else:
+                pooled.returned_at = now
+                self.__idle.append(pooled)
+            self.__condition.notify()
+
+        if discard or self.__closed:
+            _close_quietly(conn)
+
+    def close(self) -> None:
+        """
+        Closes every idle connection and stops lending. Borrowed connections are closed when returned.
+
+        Returns
+        -------
+            None
+        """
+        with self.__condition:
+            self.__closed = True
+            idle = list(self.__idle)
+            self.__idle.clear()
+            self.__size -= len(idle)
+            self.__condition.notify_all()
+
+        for pooled in idle:
+            _close_quietly(pooled.connection)
+
+    def stats(self) -> PoolStats:
+        """
+        Returns a snapshot of the pool counters.
+
+        Returns
+        -------
+            PoolStats
+                hit, miss and wait metrics plus the current size
+        """
+        with self.__condition:
+            return PoolStats(
+                hits=self.__stats.hits,
+                misses=self.__stats.misses,
+                waits=self.__stats.waits,
+                wait_seconds=self.__stats.wait_seconds,
+                timeouts=self.__stats.timeouts,
+                health_check_failures=self.__stats.health_check_failures,
+                expired=self.__stats.expired,
+                size=self.__size,
+                idle=len(self.__idle),
+            )
+
+    def __checkout(self, deadline: float | None, timeout: float | None) -> _PooledConnection | None:
+        """
+        Takes the most recently returned idle connection, or reserves a slot for a new one and
+        returns None, waiting while the pool is at max_size. Expired idle connections are closed.
+        """
+        expired: list[Any] = []
+        waited_since = None
+        try:
+            with self.__condition:
+                while True:
+                    if self.__closed:
+                        raise RuntimeError("Connection pool is closed")
+
+                    now = time.monotonic()
+                    while self.__idle:
+                        pooled = self.__idle.pop()
+                        if not self.__expired(pooled, now, idle=True):
+                            return pooled
+                        self.__stats.expired += 1
+                        self.__size -= 1
+                        expired.append(pooled.connection)
+
+                    if self.__size < self.max_size:
+                        self.__size += 1
+                        self.__stats.misses += 1
+                        return None
+
+                    if waited_since is None:
+                        waited_since = now
+                        self.__stats.waits += 1
+                    remaining = None if deadline is None else deadline - now
+                    if remaining is not None and remaining <= 0:
+                        self.__stats.timeouts += 1
+                        raise TimeoutError(
+                            f"No connection available within {timeout} seconds (max_size={self.max_size})"
+                        )
+                    self.__condition.wait(remaining)
+        finally:
+            if waited_since is not None:
+                with self.__condition:
+                    self.__stats.wait_seconds += time.monotonic() - waited_since
+            for conn in expired:
+                _close_quietly(conn)
+
+    def __open(self) -> Any:
+        """Opens a connection for a slot reserved by __checkout."""
+        try:
+            conn = self.__connect()
+        except BaseException:
+            with self.__condition:
+                self.__size -= 1
+                self.__condition.notify()
+            raise
+
+        with self.__condition:
+            self.__in_use[id(conn)] = _PooledConnection(conn, time.monotonic())
+        return conn
+
+    def __expired(self, pooled: _PooledConnection, now: float, idle: bool) -> bool:
+        """Whether a connection has outlived max_lifetime, or idle_timeout while above min_size."""
+        if self.max_lifetime is not None and now - pooled.created_at > self.max_lifetime:
+            return True
+        return (idle
+                and self.idle_timeout is not None
+                and self.__size > self.min_size
+                and now - pooled.returned_at > self.idle_timeout)
+
+
+def _is_healthy(conn: Any) -> bool:
+    """Runs SELECT 1 on the connection."""
+    try:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+        finally:
+            cursor.close()
+    except Exception as e:
+        logging.info(f"Pooled connection failed health check: {e}")
+        return False
+    return True
+
+
+def _close_quietly(conn: Any) -> None:
+    """Closes a connection, ignoring errors from connections that are already broken."""
+    with suppress(Exception):
+        conn.close()
+
+
+if __name__ == "__main__":
+    pass
@@ -2,7 +2,9 @@
 from __future__ import annotations
 
 import warnings
+from collections.abc import Callable
 from typing import TYPE_CHECKING
+from weakref import WeakKeyDictionary
 
 from helpers.enums import SupportedSQLServers
 from helpers.string_helpers import leave_only_letters_numbers_or_underscore
@@ -24,9 +26,160 @@ _PHI_DEPENDENT = {
 }
 
 
+def _date_for_iso8601(attribute: O3Attribute) -> str | None:
+    """
+    Date when the reference system includes ISO 8601
+    """
+    if attribute.reference_system_for_values is not None and 'ISO 8601' in attribute.reference_system_for_values:
+        return 'Date'
+    return None
+
+
+def _standard_values_data_type(attribute: O3Attribute) -> str | None:
+    """
+    String if the standard value list has values
+    """
+    return "String" if len(attribute.standard_values_list) > 0 else None
+
+
+def _empty_value_type(attribute: O3Attribute) -> str | None:
+    """
+    String if value data type is blank
+    """
+    return "String" if attribute.value_data_type == "" else None
+
+
+def _string_data_type(attribute: O3Attribute) -> str | None:
+    """
+    String if the value data type of the attribute is "String"
+    """
+    return "String" if attribute.value_data_type.lower() == "string" else None
+
+
+def _int_data_type(attribute: O3Attribute) -> str | None:
+    """
+    Integer if the attribute value data type is Int or Integer
+    """
+    return "Integer" if "Integer" in attribute.value_data_type or "Int" in attribute.value_data_type else None
+
+
+def _decimal_data_type(attribute: O3Attribute) -> str | None:
+    """
+    Decimal if the attribute value data type is Decimal or Numeric
+    """
+    value_data_type = attribute.value_data_type.lower()
+    return "Decimal" if "decimal" in value_data_type or "numeric" in value_data_type else None
+
+
+def _bool_data_type(attribute: O3Attribute) -> str | None:
+    """
+    Boolean if the attribute value data type is Boolean
+    """
+    return "Boolean" if attribute.value_data_type.lower() == "boolean" else None
+
+
+def _binary_data_type(attribute: O3Attribute) -> str | None:
+    """
+    Binary if the attribute value data type is DICOM or Binary
+    """
+    if "dicom" in attribute.value_data_type.lower() or attribute.value_data_type == "Binary":
+        return "Binary"
+    return None
+
+
+def _date_data_type(attribute: O3Attribute) -> str | None:
+    """
+    Date if the attribute value name includes the word date or the value data type is Date
+    """
+    if "date" in attribute.value_name.lower() or attribute.value_data_type == "Date":
+        return "Date"
+    return None
+
+
+# Priority-ordered data type resolution rules. Each rule checks a specific condition and
+# returns the column data type if matched; the first rule to return a value wins.
+_DATA_TYPE_RULES: tuple[Callable[[O3Attribute], str | None], ...] = (
+    _date_for_iso8601,
+    _standard_values_data_type,
+    _empty_value_type,
+    _string_data_type,
+    _int_data_type,
+    _decimal_data_type,
+    _bool_data_type,
+    _binary_data_type,
+    _date_data_type,
+)
+
+
+class _ColumnResolution:
+    """
+    The resolved column for one attribute. The name and data type do not depend on the dialect or
+    PHI flag; the nullable flag is stored per PHI flag and the column text per dialect and PHI flag.
+    """
+
+    __slots__ = ('column_name', 'column_data_type', 'nullable', 'defaulted_nullable', 'creation_text')
+
+    def __init__(self, column_name: str, column_data_type: str):
+        self.column_name = column_name
+        self.column_data_type = column_data_type
+        self.nullable: dict[bool, str] = {}
+        self.defaulted_nullable: set[bool] = set()
+        self.creation_text: dict[tuple[SupportedSQLServers, bool], str] = {}
+
+
+# Resolutions are computed on first use and live as long as the attribute does
+_RESOLUTION_CACHE: WeakKeyDictionary[O3Attribute, _ColumnResolution] = WeakKeyDictionary()
+
+
+def clear_column_resolution_cache() -> None:
+    """
+    Discards every cached column resolution. Only needed when attributes are modified after
+    their SQL columns have been generated.
+
+    Returns
+    -------
+        None
+    """
+    _RESOLUTION_CACHE.clear()
+
+
+def _resolve_column(attribute: O3Attribute) -> _ColumnResolution:
+    """
+    Returns the cached resolution for an attribute, resolving its column name and data type on first use.
+    """
+    resolution = _RESOLUTION_CACHE.get(attribute)
+    if resolution is not None:
+        return resolution
+
+    column_data_type = None
+    for _rule in _DATA_TYPE_RULES:
+        column_data_type = _rule(attribute)
+        if column_data_type is not None:
+            break
+
+    if column_data_type is None:
+        raise ValueError(
+            f"Could not determine SQL data type for attribute "
+            f"'{attribute.value_name}' with O3 data type "
+            f"'{attribute.value_data_type}'"
+        )
+
+    column_name = ''.join(attribute.string_code.split('_')[1:])
+    if len(attribute.standard_values_list) > 0:
+        column_name += 'Id'
+
+    resolution = _ColumnResolution(leave_only_letters_numbers_or_underscore(column_name), column_data_type)
+    _RESOLUTION_CACHE[attribute] = resolution
+    return resolution
+
+
 class AttributeToSQLColumn:
     """
     The class that handles conversion of O3 attributes to SQL columns.
+
+    The column name, data type, nullable flag and column text of an attribute are resolved once and
+    cached for the lifetime of the attribute, so repeated table generation and multi-dialect builds
+    reuse them.
     """
 
     def __init__(self, attribute: O3Attribute, phi_allowed: bool, sql_server_type: SupportedSQLServers):
@@ -50,38 +203,62 @@ class AttributeToSQLColumn:
         self.allow_phi = phi_allowed
         self.sql_server = sql_server_type
         self.dialect = get_dialect(sql_server_type)
-        self.column_data_type = None
+        self.__resolution = _resolve_column(attribute)
+        self.column_data_type = self.__resolution.column_data_type
         self.column_nullable = None
-        # Priority-ordered list of data type resolution methods. Each method checks
-        # a specific condition and sets self.column_data_type if matched. The first
-        # method to set a non-None value wins (see __set_data_types).
-        self.__set_data_type_methods = [self.__set_date_for_iso8601,
-                                        self.__set_standard_values_data_type,
-                                        self.__set_empty_value_types,
-                                        self.__set_string_data_type,
-                                        self.__set_int_data_type,
-                                        self.__set_decimal_data_type,
-                                        self.__set_bool_data_type,
-                                        self.__set_binary_data_type,
-                                        self.__set_date_data_type]
-        self.__set_data_types()
         self.__set_nullable()
 
+    def for_variant(self, phi_allowed: bool, sql_server_type: SupportedSQLServers) -> AttributeToSQLColumn:
+        """
+        Creates the column for the same attribute with another PHI flag or SQL server type, reusing
+        the resolved data type. The data type does not depend on either setting, so only the nullable
+        flag is recomputed.
+
+        Parameters
+        ----------
+        phi_allowed: bool
+            the flag for allowing PHI in the database
+        sql_server_type: SupportedSQLServers
+            the SQL server type
+
+        Returns
+        -------
+            AttributeToSQLColumn
+                the column for the requested variant
+        """
+        if not isinstance(sql_server_type, SupportedSQLServers):
+            raise ValueError(f"Provided SQL server {sql_server_type} is not supported. "
+                           f"Only MSSQL and PSQL are supported.")
+
+        column = object.__new__(AttributeToSQLColumn)
+        column.attribute = self.attribute
+        column.allow_phi = phi_allowed
+        column.sql_server = sql_server_type
+        column.dialect = get_dialect(sql_server_type)
+        column.__resolution = self.__resolution
+        column.column_data_type = self.column_data_type
+        column.column_nullable = None
+        column.__set_nullable()
+        return column
+
     @property
     def column_name(self) -> str:
         """
         The column name of this attribute
         """
-        if len(self.attribute.standard_values_list) > 0:
-            return leave_only_letters_numbers_or_underscore(''.join(self.attribute.string_code.split('_')[1:]) + 'Id')
-        return leave_only_letters_numbers_or_underscore(''.join(self.attribute.string_code.split('_')[1:]))
+        return self.__resolution.column_name
 
     @property
     def column_creation_text(self) -> str:
         """
         The SQL command to create the column.
         """
-        return f'{self.column_name} {self.__sql_field_type} {self.column_nullable}'
+        _key = (self.sql_server, self.allow_phi)
+        _text = self.__resolution.creation_text.get(_key)
+        if _text is None:
+            _text = f'{self.column_name} {self.__sql_field_type} {self.column_nullable}'
+            self.__resolution.creation_text[_key] = _text
+        return _text
 
     @property
     def __sql_field_type(self) -> str:
@@ -97,8 +274,16 @@ class AttributeToSQLColumn:
 
         Uses module-level mappings ``_ALWAYS_NULLABLE``, ``_ALWAYS_NOT_NULL``,
         and ``_PHI_DEPENDENT`` for the main lookup, with explicit post-map
-        overrides for Patient_MRN and Patient_AnonPatID.
+        overrides for Patient_MRN and Patient_AnonPatID. The result is cached per PHI flag; the
+        warning for a defaulted flag is repeated for every column created from the cache.
         """
+        cached = self.__resolution.nullable.get(self.allow_phi)
+        if cached is not None:
+            self.column_nullable = cached
+            if self.allow_phi in self.__resolution.defaulted_nullable:
+                self.__warn_default_nullable()
+            return
+
         allow_val = self.attribute.allow_null_values
 
         if allow_val in _ALWAYS_NULLABLE:
@@ -116,93 +301,14 @@ class AttributeToSQLColumn:
             self.column_nullable = 'NULL' if self.allow_phi else 'NOT NULL'
 
         if self.column_nullable is None:
-            warnings.warn(f"No SQL nullable field set using logic. Defaulting to NULL for {self}", stacklevel=2)
+            self.__resolution.defaulted_nullable.add(self.allow_phi)
+            self.__warn_default_nullable()
             self.column_nullable = 'NULL'
 
-    def __set_date_for_iso8601(self) -> None:
-        """
-        Sets the column data type to Date when the reference system includes ISO 8601
-        """
-        if self.attribute.reference_system_for_values is None:
-            return
-        if 'ISO 8601' in self.attribute.reference_system_for_values:
-            self.column_data_type = 'Date'
+        self.__resolution.nullable[self.allow_phi] = self.column_nullable
 
-    def __set_standard_values_data_type(self) -> None:
-        """
-        Sets the column data type to String if the standard value list has values
-        """
-        if len(self.attribute.standard_values_list) > 0:
-            self.column_data_type = "String"
-
-    def __set_empty_value_types(self) -> None:
-        """
-        Sets the column data type to String if value data type is blank
-        """
-        if self.attribute.value_data_type == "":
-            self.column_data_type = "String"
-
-    def __set_date_data_type(self) -> None:
-        """
-        If the attribute value name includes the word date, change the column_data_type to Date. If the
-        attribute value data type is Date, set the column_data_type to Date.
-        """
-        if "date" in self.attribute.value_name.lower():
-            self.column_data_type = "Date"
-        if self.attribute.value_data_type == "Date":
-            self.column_data_type = "Date"
-
-    def __set_string_data_type(self) -> None:
-        """
-        If the value data type of the attribute is of type "String" set the column_data_type to String
-        """
-        if self.attribute.value_data_type.lower() == "string":
-            self.column_data_type = "String"
-
-    def __set_binary_data_type(self) -> None:
-        """
-        If the value data type of the attribute is set to DICOM or Binary, set the column_data_type to Binary
-        """
-        if "dicom" in self.attribute.value_data_type.lower() or self.attribute.value_data_type == "Binary":
-            self.column_data_type = "Binary"
-
-    def __set_int_data_type(self) -> None:
-        """
-        If the attribute value data type is Int or Integer, set the column_data_type to Integer
-        """
-        if "Integer" in self.attribute.value_data_type or "Int" in self.attribute.value_data_type:
-            self.column_data_type = "Integer"
-
-    def __set_bool_data_type(self) -> None:
-        """
-        If the attribute value data type is set to Boolean, set the column_data_type to Boolean
-        """
-        if self.attribute.value_data_type.lower() == "boolean":
-            self.column_data_type = "Boolean"
-
-    def __set_decimal_data_type(self) -> None:
-        """
-        If the attribute value data type is set to Decimal or Numeric, set the column_data_type to Decimal
-        """
-        if "decimal" in self.attribute.value_data_type.lower() or "numeric" in self.attribute.value_data_type.lower():
-            self.column_data_type = "Decimal"
-
-    def __set_data_types(self) -> None:
-        """
-        Using the list of methods to set the column data type, loop through them all to set the appropriate column
-        data type.
-        """
-        for _method in self.__set_data_type_methods:
-            _method()
-            if self.column_data_type is not None:
-                break
-
-        if self.column_data_type is None:
-            raise ValueError(
-                f"Could not determine SQL data type for attribute "
-                f"'{self.attribute.value_name}' with O3 data type "
-                f"'{self.attribute.value_data_type}'"
-            )
+    def __warn_default_nullable(self) -> None:
+        warnings.warn(f"No SQL nullable field set using logic. Defaulting to NULL for {self}", stacklevel=4)
 
 
 if __name__ == "__main__":
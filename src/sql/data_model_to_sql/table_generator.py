@@ -1,6 +1,7 @@
 """SQL table generators for O3 key elements, standard value lists, and custom tables."""
 from __future__ import annotations
 
+from collections.abc import Iterator
 from typing import TYPE_CHECKING
 
 from helpers.enums import SupportedSQLServers
@@ -197,6 +198,35 @@ class KeyElementTableCreator(SQLTable):
         # Instance Of columns could have an intermediary table ActInstToProcCode style
         # self._create_instance_based_columns()
 
+    def variant(self, sql_server_type: SupportedSQLServers, phi_allowed: bool) -> KeyElementTableCreator:
+        """
+        Creates the table creator for the same key element with another SQL server type or PHI flag.
+        The attribute data types resolved by this creator are reused, so only the nullable flags and
+        the dialect specific column text are recomputed.
+
+        Parameters
+        ----------
+        sql_server_type: SupportedSQLServers
+            the SQL server type to use
+        phi_allowed: bool
+            the flag to identify if the system is allowed to store PHI or not
+
+        Returns
+        -------
+            KeyElementTableCreator
+                the table creator for the requested variant
+        """
+        if len(self.columns) == 0:
+            self._create_columns()
+
+        _variant = KeyElementTableCreator(sql_server_type, self.key_element, phi_allowed=phi_allowed)
+        _variant._create_foreign_key_columns()
+        _variant.columns.extend(
+            x.for_variant(phi_allowed, sql_server_type)
+            for x in self.columns if isinstance(x, AttributeToSQLColumn)
+        )
+        return _variant
+
     def sql_table(self) -> str:
         """
         Using the data provided by the Key Element, Attributes, and Relationships,
@@ -313,7 +343,30 @@ class StandardListTableCreator(CustomTable):
             list[str]
                 the commands used to insert values into the table
         """
-        _commands = [self.static_columns["index"]]
+        return list(self.iter_insert_commands(batch_size))
+
+    def iter_insert_commands(self, batch_size: int = 100) -> Iterator[str]:
+        """
+        Yields the same commands as insert_commands one at a time, so only a single batch of
+        rows is held in memory.
+
+        Parameters
+        ----------
+        batch_size: int
+            the number of rows per INSERT statement (default 100)
+
+        Yields
+        -------
+            str
+                the index command, each batched INSERT command, and a trailing newline
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+
+        yield self.static_columns["index"]
+
+        _insert_prefix = (f"INSERT INTO {self.table_name} (KeyElement, Attribute, "
+                          f"StandardValueItemName, NumericCode, HistoryUser) VALUES\n")
 
         _rows = []
         for x in self.items:
@@ -323,16 +376,14 @@ class StandardListTableCreator(CustomTable):
             _numeric_code = leave_only_letters_numbers_or_underscore(str(x.numeric_code))
             _rows.append(f"('{_ke_code}', '{_attr_code}', '{_value_name}', "
                          f"'{_numeric_code}', 'db_creation')")
+            if len(_rows) == batch_size:
+                yield _insert_prefix + ",\n".join(_rows) + ";\n"
+                _rows = []
 
-        _insert_prefix = (f"INSERT INTO {self.table_name} (KeyElement, Attribute, "
-                          f"StandardValueItemName, NumericCode, HistoryUser) VALUES\n")
-
-        for i in range(0, len(_rows), batch_size):
-            _batch = _rows[i:i + batch_size]
-            _commands.append(_insert_prefix + ",\n".join(_batch) + ";\n")
+        if _rows:
+            yield _insert_prefix + ",\n".join(_rows) + ";\n"
 
-        _commands.append("\n")
-        return _commands
+        yield "\n"
 
 
 class LookupTableCreator(StandardListTableCreator):
@@ -0,0 +1,19 @@
+-- Batched query: joins #PatientMrn, filled by PatientInformation.get_data_for_mrns.
+-- Returns the requested MRN first, then the columns of patient_information.sql.
+-- Ordered by Seq so spellings equal under the collation are not interleaved.
+SELECT
+
+mrn.Mrn,
+dp.PatientFullAddress,
+pat.ClinicalTrialFlag,
+dp.PatientLanguage,
+pat.SpecialNeeds,
+pat_add.PostalCode
+
+FROM #PatientMrn mrn
+INNER JOIN DWH.DimPatient dp ON dp.PatientId = mrn.Mrn
+INNER JOIN DWH.FactPatient fp ON fp.DimPatientID = dp.DimPatientID
+INNER JOIN AuraStaging.dbo.Patient pat ON pat.PatientSer = dp.ctrPatientSer
+INNER JOIN AuraStaging.dbo.PatientAddress pa ON pa.PatientSer = pat.PatientSer and pa.PrimaryFlag = 1
+INNER JOIN AuraStaging.dbo.Address pat_add ON pat_add.AddressSer = pa.AddressSer
+ORDER BY mrn.Seq, dp.DimPatientID DESC;
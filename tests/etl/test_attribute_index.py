@@ -0,0 +1,107 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from etl.mapping.attribute_index import AttributeIndex, IndexedAttribute
+from etl.mapping.match_engine import MatchEngine
+
+
+def _mock_attr(name: str, data_type: str = "String") -> MagicMock:
+    attr = MagicMock()
+    attr.value_name = name
+    attr.value_data_type = data_type
+    return attr
+
+
+def _mock_o3_model():
+    model = MagicMock()
+
+    patient_ke = MagicMock()
+    patient_ke.list_attributes = [
+        _mock_attr("PatientIdentifier"),
+        _mock_attr("DateOfBirth", "Date"),
+        _mock_attr("Gender"),
+    ]
+
+    course_ke = MagicMock()
+    course_ke.list_attributes = [
+        _mock_attr("CourseIdentifier"),
+        _mock_attr("CourseStartDate", "Date"),
+    ]
+
+    model.key_elements = {"Patient": patient_ke, "Course": course_ke}
+    return model
+
+
+def _names(attributes):
+    return [attr.value_name for attr in attributes]
+
+
+class TestCandidates:
+    def setup_method(self):
+        self.index = AttributeIndex.from_model(_mock_o3_model())
+
+    def test_len_counts_all_attributes(self):
+        assert len(self.index) == 5
+
+    def test_shared_token(self):
+        assert _names(self.index.candidates("PatientSex")) == ["PatientIdentifier"]
+
+    def test_dwh_token_is_prefix_of_o3_token(self):
+        # "ident" is a prefix of "identifier"
+        assert "CourseIdentifier" in _names(self.index.candidates("CourseIdent"))
+
+    def test_o3_token_is_prefix_of_dwh_token(self):
+        # "date" is a prefix of "dates"
+        names = _names(self.index.candidates("StartDates"))
+        assert names == ["DateOfBirth", "CourseStartDate"]
+
+    def test_no_shared_tokens(self):
+        assert self.index.candidates("GantryRotation") == []
+
+    def test_candidates_in_model_order(self):
+        names = _names(self.index.candidates("CourseDate"))
+        assert names == ["DateOfBirth", "CourseIdentifier", "CourseStartDate"]
+
+    def test_key_element_name_returned(self):
+        ke_names = [attr.key_element for attr in self.index.candidates("Gender")]
+        assert ke_names == ["Patient"]
+
+
+class TestFromAttributes:
+    def test_builds_from_plain_records(self):
+        index = AttributeIndex([
+            IndexedAttribute("Patient", "PatientIdentifier", "String"),
+            IndexedAttribute("Course", "CourseIdentifier", "String"),
+        ])
+        assert _names(index.candidates("CourseId")) == ["PatientIdentifier", "CourseIdentifier"]
+
+
+class TestForModel:
+    def test_index_reused_for_same_model(self):
+        model = _mock_o3_model()
+        assert AttributeIndex.for_model(model) is AttributeIndex.for_model(model)
+
+    def test_index_built_per_model(self):
+        assert AttributeIndex.for_model(_mock_o3_model()) is not AttributeIndex.for_model(_mock_o3_model())
+
+
+class TestBlockingIsLossless:
+    @pytest.mark.parametrize("dwh_name", [
+        "PatientId", "DimPatientID", "StartDates", "Gender", "GantryRotation", "DOB", "ID",
+    ])
+    def test_pruned_attributes_cannot_reach_threshold(self, dwh_name):
+        engine = MatchEngine()
+        index = AttributeIndex.from_model(_mock_o3_model())
+        assert engine.requires_name_overlap(0.5)
+
+        kept = set(index.candidates(dwh_name))
+        for attr in index.attributes:
+            if attr in kept:
+                continue
+            candidate = engine.score(
+                dwh_name, "varchar", attr.value_name, attr.value_data_type,
+                dwh_context="Patient", o3_context=attr.key_element,
+            )
+            assert candidate.signals["name"] == 0.0
+            assert candidate.score < 0.5
@@ -0,0 +1,68 @@
+# tests/etl/test_bulk.py
+from unittest.mock import MagicMock
+
+import pytest
+
+from etl.pipeline.bulk import BulkLoadOptions, _iter_chunks, copy_rows
+
+
+def _source_cursor(rows, columns=("PatientId", "Name", "_WatermarkDateKey")):
+    cursor = MagicMock()
+    cursor.description = [(c, None, None, None, None, None, None) for c in columns]
+    remaining = list(rows)
+
+    def fetchmany(n):
+        batch = remaining[:n]
+        del remaining[:n]
+        return batch
+
+    cursor.fetchmany.side_effect = fetchmany
+    return cursor
+
+
+class TestBulkLoadOptions:
+    def test_rejects_invalid_sizes(self):
+        with pytest.raises(ValueError, match="chunk_size"):
+            BulkLoadOptions(chunk_size=0)
+        with pytest.raises(ValueError, match="max_chunk_bytes"):
+            BulkLoadOptions(max_chunk_bytes=0)
+
+
+class TestIterChunks:
+    def test_chunks_by_row_count(self):
+        cursor = _source_cursor([(i, "x", 1) for i in range(25)])
+        chunks = list(_iter_chunks(cursor, BulkLoadOptions(chunk_size=10)))
+        assert [len(c) for c in chunks] == [10, 10, 5]
+        assert cursor.arraysize == 10
+
+    def test_byte_ceiling_splits_chunks(self):
+        cursor = _source_cursor([(i, "x" * 1000, 1) for i in range(10)])
+        chunks = list(_iter_chunks(cursor, BulkLoadOptions(chunk_size=100, max_chunk_bytes=3000)))
+        assert len(chunks) > 1
+        assert sum(len(c) for c in chunks) == 10
+        assert all(len(c) <= 3 for c in chunks)
+
+    def test_empty_source(self):
+        assert list(_iter_chunks(_source_cursor([]), BulkLoadOptions())) == []
+
+
+class TestCopyRows:
+    def test_binds_columns_in_insert_order(self):
+        source = _source_cursor([(1, "a", 20250101), (2, "b", 20250103), (3, "c", 20250102)])
+        target = MagicMock()
+        result = copy_rows(source, target, "INSERT ...", ["Name", "PatientId"],
+                           BulkLoadOptions(chunk_size=2), track_column="_WatermarkDateKey")
+        assert target.fast_executemany is True
+        assert [c.args[1] for c in target.executemany.call_args_list] == [
+            [("a", 1), ("b", 2)], [("c", 3)],
+        ]
+        assert (result.rows, result.chunks, result.high_value) == (3, 2, 20250103)
+
+    def test_missing_column_raises(self):
+        with pytest.raises(ValueError, match="no column"):
+            copy_rows(_source_cursor([]), MagicMock(), "INSERT ...", ["Missing"], BulkLoadOptions())
+
+    def test_untracked_high_value_is_none(self):
+        result = copy_rows(_source_cursor([(1, "a", 5)]), MagicMock(), "INSERT ...", ["PatientId"],
+                           BulkLoadOptions())
+        assert result.high_value is None
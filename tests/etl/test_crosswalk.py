@@ -2,6 +2,7 @@
 from unittest.mock import MagicMock, PropertyMock
 import pytest
 from etl.mapping.crosswalk import Crosswalk
+from etl.mapping.match_engine import MatchEngine
 from etl.mapping.mapping_store import CrosswalkEntry
 
 
@@ -111,6 +112,72 @@ class TestGenerateSuggestions:
         assert scores == sorted(scores, reverse=True)
 
 
+    def test_low_threshold_scores_every_attribute(self):
+        # Type + context alone reach 0.4, so blocking must not drop name-less pairs
+        manifest = _mock_manifest()
+        gantry_col = MagicMock()
+        gantry_col.name = "GantryRotation"
+        gantry_col.data_type = "varchar"
+        manifest.tables["DWH.DimPatient"].columns.append(gantry_col)
+
+        cw = Crosswalk(manifest, _mock_registry(), _mock_o3_model(), min_confidence=0.3)
+        suggestions = cw.generate_suggestions()
+        assert any(
+            s.dwh_column == "GantryRotation" and s.o3_attribute == "PatientIdentifier"
+            for s in suggestions
+        )
+
+    def test_matches_exhaustive_scoring(self):
+        engine = MatchEngine()
+        cw = Crosswalk(_mock_manifest(), _mock_registry(), _mock_o3_model(), match_engine=engine)
+        suggestions = cw.generate_suggestions()
+
+        expected = set()
+        for table in _mock_manifest().tables.values():
+            for col in table.columns:
+                for ke_name, ke in _mock_o3_model().key_elements.items():
+                    for attr in ke.list_attributes:
+                        c = engine.score(col.name, col.data_type, attr.value_name,
+                                         attr.value_data_type, table.name, ke_name)
+                        if c.score >= 0.5:
+                            expected.add((table.full_name, col.name, ke_name, attr.value_name))
+        for model in _mock_manifest().models:
+            for select in model.selects:
+                for ke_name, ke in _mock_o3_model().key_elements.items():
+                    for attr in ke.list_attributes:
+                        c = engine.score(select.alias, select.data_type, attr.value_name,
+                                         attr.value_data_type, model.name, ke_name)
+                        if c.score >= 0.5:
+                            expected.add((model.base_table, select.alias, ke_name, attr.value_name))
+
+        assert {s.key for s in suggestions} == expected
+
+
+class TestParallelSuggestions:
+    def _manifest_with_two_tables(self):
+        manifest = _mock_manifest()
+        col = MagicMock()
+        col.name = "CourseId"
+        col.data_type = "varchar"
+        table = MagicMock()
+        table.full_name = "DWH.DimCourse"
+        table.name = "DimCourse"
+        table.columns = [col]
+        manifest.tables["DWH.DimCourse"] = table
+        return manifest
+
+    def test_workers_match_serial_output(self):
+        manifest = self._manifest_with_two_tables()
+        serial = Crosswalk(manifest, _mock_registry(), _mock_o3_model()).generate_suggestions()
+        parallel = Crosswalk(manifest, _mock_registry(), _mock_o3_model()).generate_suggestions(workers=2)
+        assert parallel == serial
+
+    def test_invalid_workers_raises(self):
+        cw = Crosswalk(_mock_manifest(), _mock_registry(), _mock_o3_model())
+        with pytest.raises(ValueError, match="workers"):
+            cw.generate_suggestions(workers=0)
+
+
 class TestMerge:
     def test_curated_overrides_suggestions(self):
         cw = Crosswalk(_mock_manifest(), _mock_registry(), _mock_o3_model())
@@ -1,7 +1,11 @@
 # tests/etl/test_extractor.py
+import sqlite3
 from unittest.mock import MagicMock
+
 import pytest
-from etl.pipeline.extractor import ExtractQuery, Extractor
+from etl.pipeline.extractor import ExtractQuery, Extractor, WATERMARK_ALIAS, inline_params
+from etl.pipeline.plan_cache import QueryPlanCache
+from etl.pipeline.watermark import WatermarkStore
 from etl.mapping.mapping_store import CrosswalkEntry
 from etl.registry import (
     DateBasis, EntryPoint, FieldPolicy, GlobalPolicy, DateRangePolicy,
@@ -118,12 +122,14 @@ class TestGenerateQuery:
     def test_custom_lookback_days(self):
         extractor = Extractor([_make_entry()], _make_manifest(), _make_registry())
         query = extractor.generate_query("billing", lookback_days=30)
-        assert "30" in query.sql
+        assert query.params == (1000, 30)
+        assert query.param_names == ("row_limit", "lookback_days")
+        assert "30" not in query.sql
 
     def test_lookback_days_zero_is_respected(self):
         extractor = Extractor([_make_entry()], _make_manifest(), _make_registry())
         query = extractor.generate_query("billing", lookback_days=0)
-        assert "-0" in query.sql
+        assert query.params == (1000, 0)
 
     def test_denied_columns_excluded(self):
         entries = [
@@ -151,6 +157,179 @@ class TestGenerateQuery:
         assert "JOIN" in query.sql or "DimPatient" in query.sql
 
 
+class TestCrosswalkIndexes:
+    def test_matches_by_model_or_table_in_crosswalk_order(self):
+        entries = [
+            _make_entry(dwh_column="ByTable", model_alias="ByTable", model_name="otherModel"),
+            _make_entry(dwh_column="Neither", model_alias="Neither", model_name="otherModel",
+                        dwh_table="DWH.Other"),
+            _make_entry(dwh_column="ByModel", model_alias="ByModel", dwh_table="DWH.Other"),
+            _make_entry(dwh_column="Both", model_alias="Both"),
+            _make_entry(dwh_column="Rejected", model_alias="Rejected", status="rejected"),
+        ]
+        extractor = Extractor(entries, _make_manifest(), _make_registry())
+        query = extractor.generate_query("billing")
+        assert [e.dwh_column for e in query.columns_mapped] == ["ByTable", "ByModel", "Both"]
+
+    def test_model_deny_list_applies(self):
+        registry = _make_registry()
+        registry.models["dwActivityBillingModel"].field_policy.deny_list.append("Secret")
+        entries = [_make_entry(dwh_column="Secret", model_alias="Secret"), _make_entry()]
+        query = Extractor(entries, _make_manifest(), registry).generate_query("billing")
+        assert [e.dwh_column for e in query.columns_mapped] == ["DimPatientID"]
+
+    def test_each_dimension_joined_once(self):
+        entries = [_make_entry(), _make_entry(model_alias="PatientId2", o3_attribute="Other")]
+        query = Extractor(entries, _make_manifest(), _make_registry()).generate_query("billing")
+        assert query.joins == [JoinSpec("DWH.DimPatient", "DimPatientID", "DimPatientID")]
+        assert query.sql.count("LEFT JOIN") == 1
+
+
+class TestPlanCache:
+    def test_one_plan_serves_every_lookback(self):
+        cache = QueryPlanCache()
+        extractor = Extractor([_make_entry()], _make_manifest(), _make_registry(), plan_cache=cache)
+        q30 = extractor.generate_query("billing", lookback_days=30)
+        q7 = extractor.generate_query("billing", lookback_days=7)
+        assert q30.sql == q7.sql
+        assert (q30.params, q7.params) == ((1000, 30), (1000, 7))
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_matches_uncached_query(self):
+        cached = Extractor([_make_entry()], _make_manifest(), _make_registry(),
+                           plan_cache=QueryPlanCache())
+        uncached = Extractor([_make_entry()], _make_manifest(), _make_registry())
+        cached.generate_query("billing")
+        assert cached.generate_query("billing") == uncached.generate_query("billing")
+
+    def test_changed_crosswalk_misses(self):
+        cache = QueryPlanCache()
+        Extractor([_make_entry()], _make_manifest(), _make_registry(), plan_cache=cache).generate_query("billing")
+        entries = [_make_entry(), _make_entry(dwh_column="Other", model_alias="Other")]
+        query = Extractor(entries, _make_manifest(), _make_registry(), plan_cache=cache).generate_query("billing")
+        assert "Other" in query.sql
+        assert cache.misses == 2
+
+
+class TestBoundParameters:
+    def test_row_limit_not_inlined(self):
+        query = Extractor([_make_entry()], _make_manifest(), _make_registry()).generate_query("billing")
+        assert query.sql.startswith("SELECT TOP (?)\n")
+        assert "1000" not in query.sql
+        assert query.params[0] == 1000
+
+    def test_sql_text_independent_of_values(self, tmp_path):
+        store = WatermarkStore(str(tmp_path / "wm.json"))
+        extractor = Extractor([_make_entry()], _make_manifest(), _make_registry())
+        store.advance("billing", "DimDateID_FromDateOfService", 20250101)
+        first = extractor.generate_query("billing", lookback_days=7, watermarks=store)
+        store.advance("billing", "DimDateID_FromDateOfService", 20250301)
+        second = extractor.generate_query("billing", lookback_days=30, watermarks=store)
+        assert first.sql == second.sql
+        assert (first.params, second.params) == ((1000, 20250101, 20250101), (1000, 20250301, 20250301))
+
+    def test_cached_plan_rebinds_watermark(self, tmp_path):
+        cache = QueryPlanCache()
+        store = WatermarkStore(str(tmp_path / "wm.json"))
+        extractor = Extractor([_make_entry()], _make_manifest(), _make_registry(), plan_cache=cache)
+        store.advance("billing", "DimDateID_FromDateOfService", 20250101)
+        extractor.generate_query("billing", watermarks=store)
+        store.advance("billing", "DimDateID_FromDateOfService", 20250301)
+        query = extractor.generate_query("billing", watermarks=store)
+        assert query.watermark == 20250301
+        assert query.params == (1000, 20250301, 20250301)
+        assert cache.hits == 1
+
+    def test_inlined_sql_matches_literal_form(self):
+        query = Extractor([_make_entry()], _make_manifest(), _make_registry()).generate_query(
+            "billing", lookback_days=30
+        )
+        sql = inline_params(query.sql, query.params)
+        assert sql.startswith("SELECT TOP (1000)\n")
+        assert "DATEADD(DAY, -CAST(30 AS INT), GETDATE())" in sql
+
+
+class TestInlineParams:
+    def test_replaces_placeholders_in_order(self):
+        assert inline_params("SELECT TOP (?) a WHERE b > ?", (10, 20)) == "SELECT TOP (10) a WHERE b > 20"
+
+    def test_ignores_quoted_question_marks(self):
+        assert inline_params("SELECT '?' AS [why?] WHERE x = ?", (1,)) == "SELECT '?' AS [why?] WHERE x = 1"
+
+    def test_count_mismatch_raises(self):
+        with pytest.raises(ValueError, match="more placeholders"):
+            inline_params("? ?", (1,))
+        with pytest.raises(ValueError, match="fewer placeholders"):
+            inline_params("?", (1, 2))
+
+    def test_rejects_non_integers(self):
+        with pytest.raises(ValueError, match="non-integer"):
+            inline_params("?", ("1; DROP TABLE x",))
+
+
+class TestIncrementalQuery:
+    def test_without_watermark_uses_lookback(self, tmp_path):
+        store = WatermarkStore(str(tmp_path / "wm.json"))
+        extractor = Extractor([_make_entry()], _make_manifest(), _make_registry())
+        query = extractor.generate_query("billing", watermarks=store)
+        assert query.incremental is True
+        assert query.watermark is None
+        assert "DATEADD(DAY, -CAST(? AS INT)" in query.sql
+        assert query.params == (1000, 90)
+        assert "WITH TIES" in query.sql
+        assert query.sql.endswith("ORDER BY base.[DimDateID_FromDateOfService]")
+
+    def test_filters_from_watermark_day(self, tmp_path):
+        store = WatermarkStore(str(tmp_path / "wm.json"))
+        store.advance("billing", "DimDateID_FromDateOfService", 20250110)
+        extractor = Extractor([_make_entry()], _make_manifest(), _make_registry())
+        query = extractor.generate_query("billing", watermarks=store)
+        assert query.watermark == 20250110
+        assert "WHERE base.[DimDateID_FromDateOfService] >= ?" in query.sql
+        # The re-read watermark day does not use up the row limit
+        assert query.sql.startswith(
+            "SELECT TOP (? + (SELECT COUNT_BIG(*) FROM DWH.FactActivityBilling "
+            "WHERE [DimDateID_FromDateOfService] = ?)) WITH TIES\n"
+        )
+        assert query.param_names == ("row_limit", "watermark", "watermark")
+        assert query.params == (1000, 20250110, 20250110)
+        assert "DATEADD" not in query.sql
+        assert f"base.[DimDateID_FromDateOfService] AS [{WATERMARK_ALIAS}]" in query.sql
+
+    def test_row_arriving_late_for_watermark_day_still_extracted(self, tmp_path):
+        store = WatermarkStore(str(tmp_path / "wm.json"))
+        db = sqlite3.connect(":memory:")
+        db.execute("ATTACH ':memory:' AS DWH")
+        db.execute("CREATE TABLE DWH.FactActivityBilling (Id INTEGER, DimDateID_FromDateOfService INTEGER)")
+        db.executemany("INSERT INTO DWH.FactActivityBilling VALUES (?, ?)", [(1, 20250109), (2, 20250110)])
+        # A run loaded both rows and advanced the watermark to their last day
+        store.advance("billing", "DimDateID_FromDateOfService", 20250110)
+        db.execute("INSERT INTO DWH.FactActivityBilling VALUES (3, 20250110)")
+
+        query = Extractor([_make_entry()], _make_manifest(), _make_registry()).generate_query(
+            "billing", watermarks=store
+        )
+        where = next(line for line in query.sql.splitlines() if line.startswith("WHERE"))
+        selected = db.execute(
+            f"SELECT Id FROM DWH.FactActivityBilling AS base {where} ORDER BY Id", (query.watermark,)
+        ).fetchall()
+        assert selected == [(2,), (3,)]
+
+    def test_watermark_for_other_date_key_ignored(self, tmp_path):
+        store = WatermarkStore(str(tmp_path / "wm.json"))
+        store.advance("billing", "DimDateID_Other", 20250110)
+        extractor = Extractor([_make_entry()], _make_manifest(), _make_registry())
+        query = extractor.generate_query("billing", watermarks=store)
+        assert query.watermark is None
+
+    def test_full_query_unchanged(self):
+        extractor = Extractor([_make_entry()], _make_manifest(), _make_registry())
+        query = extractor.generate_query("billing")
+        assert query.incremental is False
+        assert WATERMARK_ALIAS not in query.sql
+        assert "ORDER BY" not in query.sql
+
+
 class TestGenerateAllQueries:
     def test_returns_queries_for_all_entry_points(self):
         extractor = Extractor([_make_entry()], _make_manifest(), _make_registry())
@@ -1,7 +1,8 @@
 # tests/etl/test_loader.py
 from unittest.mock import MagicMock
 import pytest
-from etl.pipeline.loader import LoadCommand, Loader
+from etl.pipeline.loader import BatchedMergeOptions, LoadCommand, Loader
+from etl.pipeline.plan_cache import QueryPlanCache
 from etl.pipeline.extractor import ExtractQuery
 from etl.mapping.mapping_store import CrosswalkEntry
 from etl.registry import JoinSpec
@@ -64,6 +65,203 @@ class TestGenerateInsert:
             loader.generate_insert(_make_extract_query(entries=[inactive_entry]))
 
 
+class TestGenerateCountedInsert:
+    def test_wraps_insert_with_row_count(self):
+        loader = Loader(_mock_o3_model())
+        insert = loader.generate_insert(_make_extract_query())
+        cmd = loader.generate_counted_insert(_make_extract_query())
+        assert cmd.sql.startswith("SET NOCOUNT ON;\n")
+        assert insert.sql in cmd.sql
+        assert "DECLARE @RowsLoaded BIGINT = ROWCOUNT_BIG();" in cmd.sql
+        assert cmd.sql.endswith("SELECT @RowsLoaded AS RowsLoaded;")
+
+    def test_restores_nocount_before_result(self):
+        cmd = Loader(_mock_o3_model()).generate_counted_insert(_make_extract_query())
+        assert cmd.sql.index("ROWCOUNT_BIG()") < cmd.sql.index("SET NOCOUNT OFF;")
+        assert cmd.sql.index("SET NOCOUNT OFF;") < cmd.sql.index("SELECT @RowsLoaded")
+
+    def test_extract_appears_once(self):
+        loader = Loader(_mock_o3_model())
+        cmd = loader.generate_counted_insert(_make_extract_query())
+        assert cmd.sql.count("SELECT ...") == 1
+
+    def test_same_target_and_column_map(self):
+        loader = Loader(_mock_o3_model())
+        insert = loader.generate_insert(_make_extract_query())
+        cmd = loader.generate_counted_insert(_make_extract_query())
+        assert cmd.target_table == insert.target_table
+        assert cmd.column_map == insert.column_map
+
+
+class TestGenerateIncrementalInsert:
+    def test_stages_extract_and_reports_watermark(self):
+        query = _make_extract_query()
+        query.incremental = True
+        cmd = Loader(_mock_o3_model()).generate_incremental_insert(query)
+        assert cmd.target_table == "KEL_Patient"
+        assert "SELECT src.* INTO #Extract" in cmd.sql
+        assert "INSERT INTO KEL_Patient ([PatientIdentifier])" in cmd.sql
+        assert "FROM #Extract AS src" in cmd.sql
+        assert "MAX([_WatermarkDateKey])" in cmd.sql
+        assert "DROP TABLE #Extract" in cmd.sql
+        assert cmd.sql.endswith(
+            "SET NOCOUNT OFF;\nSELECT @RowsLoaded AS RowsLoaded, @HighWatermark AS HighWatermark;"
+        )
+
+    def test_skips_watermark_day_rows_already_loaded(self):
+        query = _make_extract_query()
+        query.incremental = True
+        sql = Loader(_mock_o3_model()).generate_incremental_insert(query).sql
+        assert "DECLARE @OverlapDay BIGINT = (SELECT MIN([_WatermarkDateKey]) FROM #Extract);" in sql
+        assert (
+            "WHERE src.[_WatermarkDateKey] > @OverlapDay\n"
+            "   OR NOT EXISTS (SELECT 1 FROM KEL_Patient AS tgt "
+            "WHERE EXISTS (SELECT tgt.[PatientIdentifier] INTERSECT SELECT src.[PatientId]));"
+        ) in sql
+        assert sql.index("DECLARE @OverlapDay") < sql.index("INSERT INTO KEL_Patient")
+
+    def test_rejects_full_extract(self):
+        with pytest.raises(ValueError, match="not incremental"):
+            Loader(_mock_o3_model()).generate_incremental_insert(_make_extract_query())
+
+
+class TestGenerateStagedLoad:
+    def test_staging_copied_from_target(self):
+        cmd = Loader(_mock_o3_model()).generate_staged_load(_make_extract_query())
+        assert cmd.staging_table == "#Stage_KEL_Patient"
+        assert "SELECT TOP 0 [PatientIdentifier] INTO #Stage_KEL_Patient FROM KEL_Patient;" in cmd.create_sql
+        assert cmd.insert_sql == "INSERT INTO #Stage_KEL_Patient ([PatientIdentifier]) VALUES (?)"
+        assert cmd.drop_sql == "DROP TABLE IF EXISTS #Stage_KEL_Patient;"
+
+    def test_appends_without_merge_key(self):
+        cmd = Loader(_mock_o3_model()).generate_staged_load(_make_extract_query())
+        assert cmd.load_sql.startswith("INSERT INTO KEL_Patient ([PatientIdentifier])")
+        assert "FROM #Stage_KEL_Patient;" in cmd.load_sql
+
+    def test_incremental_append_skips_rows_already_loaded(self):
+        query = _make_extract_query()
+        query.incremental = True
+        cmd = Loader(_mock_o3_model()).generate_staged_load(query)
+        assert cmd.load_sql == (
+            "INSERT INTO KEL_Patient ([PatientIdentifier])\n"
+            "SELECT src.[PatientIdentifier]\n"
+            "FROM #Stage_KEL_Patient AS src\n"
+            "WHERE NOT EXISTS (SELECT 1 FROM KEL_Patient AS tgt "
+            "WHERE EXISTS (SELECT tgt.[PatientIdentifier] INTERSECT SELECT src.[PatientIdentifier]));"
+        )
+
+    def test_merges_on_key(self):
+        entries = [
+            _make_entry(),
+            _make_entry(dwh_column="PatientName", model_alias="Name", o3_attribute="PatientName"),
+        ]
+        cmd = Loader(_mock_o3_model()).generate_staged_load(
+            _make_extract_query(entries), merge_key=["PatientIdentifier"]
+        )
+        assert cmd.load_sql.startswith("MERGE KEL_Patient AS target\nUSING #Stage_KEL_Patient AS source")
+        assert "ON target.[PatientIdentifier] = source.[PatientIdentifier]" in cmd.load_sql
+        assert "target.[PatientName] = source.[PatientName]" in cmd.load_sql
+
+    def test_unknown_merge_key_raises(self):
+        with pytest.raises(ValueError, match="Merge keys"):
+            Loader(_mock_o3_model()).generate_staged_load(_make_extract_query(), merge_key=["Nope"])
+
+
+class TestGenerateBatchedMerge:
+    def _entries(self):
+        return [
+            _make_entry(),
+            _make_entry(dwh_column="PatientName", model_alias="Name", o3_attribute="PatientName"),
+        ]
+
+    def test_stages_into_indexed_temp_table(self):
+        cmd = Loader(_mock_o3_model()).generate_batched_merge(
+            _make_extract_query(self._entries()), ["PatientIdentifier"], batch_size=500
+        )
+        assert cmd.target_table == "KEL_Patient"
+        assert "DECLARE @BatchSize INT = 500;" in cmd.sql
+        assert "SELECT src.[PatientId] AS [PatientIdentifier], src.[Name] AS [PatientName]\nINTO #MergeSource" in cmd.sql
+        assert "CREATE UNIQUE CLUSTERED INDEX IX_MergeSource ON #MergeSource ([PatientIdentifier]);" in cmd.sql
+        assert "MERGE" not in cmd.sql
+
+    def test_update_and_insert_loops_commit_per_batch(self):
+        cmd = Loader(_mock_o3_model()).generate_batched_merge(
+            _make_extract_query(self._entries()), ["PatientIdentifier"]
+        )
+        assert "UPDATE TOP (@BatchSize) target" in cmd.sql
+        assert "WHERE EXISTS (SELECT source.[PatientName] EXCEPT SELECT target.[PatientName]);" in cmd.sql
+        assert "INSERT TOP (@BatchSize) INTO KEL_Patient ([PatientIdentifier], [PatientName])" in cmd.sql
+        assert "WHERE target.[PatientIdentifier] = source.[PatientIdentifier]" in cmd.sql
+        assert cmd.sql.count("IF @@TRANCOUNT > 0 COMMIT;") == 3
+        assert cmd.sql.count("IF @Rows < @BatchSize BREAK;") == 2
+        assert cmd.sql.endswith(
+            "@RowsInserted AS RowsInserted, @HighWatermark AS HighWatermark, @RowsSkipped AS RowsSkipped;"
+        )
+
+    def test_null_keys_removed_before_index_and_loops(self):
+        cmd = Loader(_mock_o3_model()).generate_batched_merge(
+            _make_extract_query(self._entries()), ["PatientIdentifier", "PatientName"]
+        )
+        delete = "DELETE FROM #MergeSource WHERE [PatientIdentifier] IS NULL OR [PatientName] IS NULL;"
+        assert delete in cmd.sql
+        assert "SET @RowsSkipped = @@ROWCOUNT;" in cmd.sql
+        assert cmd.sql.index(delete) < cmd.sql.index("CREATE UNIQUE CLUSTERED INDEX")
+
+    def test_restores_nocount_before_result(self):
+        cmd = Loader(_mock_o3_model()).generate_batched_merge(
+            _make_extract_query(self._entries()), ["PatientIdentifier"]
+        )
+        assert cmd.sql.index("SET NOCOUNT OFF;") > cmd.sql.index("DROP TABLE #MergeSource;")
+        assert cmd.sql.index("SET NOCOUNT OFF;") < cmd.sql.index("SELECT @RowsStaged")
+
+    def test_key_only_columns_skip_update_loop(self):
+        cmd = Loader(_mock_o3_model()).generate_batched_merge(
+            _make_extract_query(), ["PatientIdentifier"]
+        )
+        assert "UPDATE" not in cmd.sql
+        assert "INSERT TOP (@BatchSize)" in cmd.sql
+
+    def test_incremental_reports_watermark(self):
+        query = _make_extract_query()
+        query.incremental = True
+        cmd = Loader(_mock_o3_model()).generate_batched_merge(query, ["PatientIdentifier"])
+        assert "src.[_WatermarkDateKey]" in cmd.sql
+        assert "SELECT @HighWatermark = MAX([_WatermarkDateKey]) FROM #MergeSource;" in cmd.sql
+
+    def test_validation(self):
+        loader = Loader(_mock_o3_model())
+        with pytest.raises(ValueError, match="batch_size"):
+            loader.generate_batched_merge(_make_extract_query(), ["PatientIdentifier"], batch_size=0)
+        with pytest.raises(ValueError, match="merge_key"):
+            loader.generate_batched_merge(_make_extract_query(), [])
+        with pytest.raises(ValueError, match="Merge keys"):
+            loader.generate_batched_merge(_make_extract_query(), ["Nope"])
+        with pytest.raises(ValueError, match="batch_size"):
+            BatchedMergeOptions(batch_size=0)
+
+
+class TestLoaderPlanCache:
+    def test_reuses_generated_commands(self):
+        cache = QueryPlanCache()
+        loader = Loader(_mock_o3_model(), plan_cache=cache)
+        first = loader.generate_insert(_make_extract_query())
+        second = loader.generate_insert(_make_extract_query())
+        assert first == second == Loader(_mock_o3_model()).generate_insert(_make_extract_query())
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_keyed_on_extract_and_arguments(self):
+        cache = QueryPlanCache()
+        loader = Loader(_mock_o3_model(), plan_cache=cache)
+        entries = [_make_entry(), _make_entry(dwh_column="PatientName", model_alias="Name", o3_attribute="PatientName")]
+        loader.generate_merge(_make_extract_query(entries), ["PatientIdentifier"])
+        merged = loader.generate_merge(_make_extract_query(entries), ["PatientName"])
+        assert "ON target.[PatientName] = source.[Name]" in merged.sql
+        other = _make_extract_query(entries)
+        other.sql = "SELECT 2"
+        assert "SELECT 2" in loader.generate_merge(other, ["PatientIdentifier"]).sql
+        assert cache.misses == 3
+
+
 class TestGenerateMerge:
     def test_returns_merge_command(self):
         loader = Loader(_mock_o3_model())
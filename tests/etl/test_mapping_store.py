@@ -2,6 +2,7 @@
 import json
 import os
 import tempfile
+from pathlib import Path
 import pytest
 from etl.mapping.mapping_store import CrosswalkEntry, MappingStore
 
@@ -75,3 +76,67 @@ class TestMappingStore:
         assert len(diff.added) == 1
         assert len(diff.changed) == 1
         assert len(diff.removed) == 0
+
+
+class TestJsonLines:
+    def test_save_writes_one_entry_per_line(self, tmp_path):
+        path = str(tmp_path / "crosswalk.jsonl")
+        entries = [_make_entry(), _make_entry(dwh_column="DateOfBirth", o3_attribute="PatientDateOfBirth")]
+        MappingStore().save(entries, path)
+
+        lines = Path(path).read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 2
+        assert json.loads(lines[1])["dwh_column"] == "DateOfBirth"
+        assert MappingStore().load(path) == entries
+
+    def test_iter_load_is_lazy(self, tmp_path):
+        path = tmp_path / "crosswalk.jsonl"
+        MappingStore().save([_make_entry()], str(path))
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("not json\n")
+
+        entries = MappingStore().iter_load(str(path))
+        assert next(entries) == _make_entry()
+        with pytest.raises(ValueError, match="crosswalk.jsonl:2"):
+            next(entries)
+
+    def test_iter_load_reports_line_of_non_object_entry(self, tmp_path):
+        path = tmp_path / "crosswalk.jsonl"
+        path.write_text("[1, 2]\n", encoding="utf-8")
+        with pytest.raises(ValueError, match="crosswalk.jsonl:1"):
+            list(MappingStore().iter_load(str(path)))
+
+    def test_iter_load_reports_line_of_invalid_confidence(self, tmp_path):
+        path = tmp_path / "crosswalk.jsonl"
+        bad = {**_make_entry().to_dict(), "confidence": 1.5}
+        path.write_text(f"{json.dumps(_make_entry().to_dict())}\n{json.dumps(bad)}\n", encoding="utf-8")
+        with pytest.raises(ValueError, match=r"crosswalk.jsonl:2: invalid crosswalk entry: confidence"):
+            list(MappingStore().iter_load(str(path)))
+
+    def test_iter_load_skips_blank_lines(self, tmp_path):
+        path = tmp_path / "crosswalk.ndjson"
+        line = json.dumps(_make_entry().to_dict())
+        path.write_text(f"{line}\n\n{line}\n", encoding="utf-8")
+        assert len(list(MappingStore().iter_load(str(path)))) == 2
+
+    def test_iter_load_json_array(self, tmp_path):
+        path = str(tmp_path / "crosswalk.json")
+        MappingStore().save([_make_entry()], path)
+        assert list(MappingStore().iter_load(path)) == [_make_entry()]
+
+    def test_append_extends_file(self, tmp_path):
+        path = tmp_path / "crosswalk.jsonl"
+        store = MappingStore()
+        store.append([_make_entry()], str(path))
+        store.append([_make_entry(dwh_column="DateOfBirth")], str(path))
+        assert [e.dwh_column for e in store.load(str(path))] == ["PatientId", "DateOfBirth"]
+
+    def test_append_after_missing_trailing_newline(self, tmp_path):
+        path = tmp_path / "crosswalk.jsonl"
+        path.write_text(json.dumps(_make_entry().to_dict()), encoding="utf-8")
+        MappingStore().append([_make_entry(dwh_column="DateOfBirth")], str(path))
+        assert len(MappingStore().load(str(path))) == 2
+
+    def test_append_rejects_json_array(self, tmp_path):
+        with pytest.raises(ValueError, match="JSON Lines"):
+            MappingStore().append([_make_entry()], str(tmp_path / "crosswalk.json"))
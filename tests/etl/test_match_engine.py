@@ -1,6 +1,7 @@
 # tests/etl/test_match_engine.py
+from unittest.mock import MagicMock
 import pytest
-from etl.mapping.match_engine import MatchCandidate, MatchEngine
+from etl.mapping.match_engine import MatchCandidate, MatchEngine, ScoreInput, TokenCacheInfo
 
 
 class TestNameSimilarity:
@@ -90,3 +91,147 @@ class TestScore:
             o3_context="Patient",
         )
         assert boosted.score >= base.score
+
+
+def _mock_o3_model():
+    model = MagicMock()
+    ke = MagicMock()
+    attr = MagicMock()
+    attr.value_name = "PatientDateOfBirth"
+    ke.list_attributes = [attr]
+    model.key_elements = {"Patient": ke}
+    return model
+
+
+class TestTokenCache:
+    def test_repeated_names_hit_cache(self):
+        engine = MatchEngine()
+        engine._name_similarity("PatientId", "PatientIdentifier")
+        engine._name_similarity("PatientId", "PatientIdentifier")
+        info = engine.token_cache_info()
+        assert info.misses == 2
+        assert info.hits == 2
+        assert info.size == 2
+
+    def test_cache_is_bounded(self):
+        engine = MatchEngine(token_cache_size=2)
+        for name in ("PatientId", "CourseId", "PlanId"):
+            engine._name_similarity(name, name)
+        info = engine.token_cache_info()
+        assert info.size == 2
+        assert info.max_size == 2
+
+    def test_least_recently_used_evicted(self):
+        engine = MatchEngine(token_cache_size=2)
+        engine._context_similarity("Patient", "Course")
+        engine._context_similarity("Patient", "Plan")  # evicts Course
+        engine._context_similarity("Patient", "Course")
+        assert engine.token_cache_info().misses == 4
+
+    def test_zero_size_disables_cache(self):
+        engine = MatchEngine(token_cache_size=0)
+        engine._name_similarity("PatientId", "PatientId")
+        engine._name_similarity("PatientId", "PatientId")
+        info = engine.token_cache_info()
+        assert info.size == 0
+        assert info.hits == 0
+
+    def test_negative_size_raises(self):
+        with pytest.raises(ValueError, match="token_cache_size"):
+            MatchEngine(token_cache_size=-1)
+
+    def test_engines_do_not_share_cache(self):
+        first = MatchEngine()
+        first._name_similarity("PatientId", "PatientId")
+        assert MatchEngine().token_cache_info().size == 0
+
+    def test_clear_resets_counters(self):
+        engine = MatchEngine()
+        engine.precompute(_mock_o3_model())
+        engine._name_similarity("PatientId", "PatientId")
+        engine.clear_token_cache()
+        assert engine.token_cache_info() == TokenCacheInfo(0, 0, 0, 8192, 0)
+
+
+class TestPrecompute:
+    def test_precompute_counts_attributes_and_contexts(self):
+        engine = MatchEngine()
+        assert engine.precompute(_mock_o3_model()) == 2
+
+    def test_precomputed_names_are_hits(self):
+        engine = MatchEngine()
+        engine.precompute(_mock_o3_model())
+        engine.score("DateOfBirth", "datetime", "PatientDateOfBirth", "Date",
+                     dwh_context="DimPatient", o3_context="Patient")
+        info = engine.token_cache_info()
+        assert info.misses == 2  # only the DWH-side names
+        assert info.size == 2
+
+    def test_precomputed_names_survive_eviction(self):
+        engine = MatchEngine(token_cache_size=1)
+        engine.precompute(_mock_o3_model())
+        for name in ("A1Name", "B2Name", "C3Name"):
+            engine._name_similarity(name, "PatientDateOfBirth")
+        assert engine.token_cache_info().hits == 3
+
+    def test_scores_unchanged_by_precompute(self):
+        plain = MatchEngine(token_cache_size=0)
+        warmed = MatchEngine()
+        warmed.precompute(_mock_o3_model())
+        args = ("PatientBirthDates", "datetime", "PatientDateOfBirth", "Date", "DimPatient", "Patient")
+        assert plain.score(*args) == warmed.score(*args)
+
+
+class TestScoreBatch:
+    def setup_method(self):
+        pytest.importorskip("numpy")
+        self.engine = MatchEngine()
+        self.dwh = [
+            ScoreInput("PatientId", "VDT_PATIENTID", "DimPatient"),
+            ScoreInput("DateOfBirth", "datetime", "DimPatient"),
+            ScoreInput("CollRtnOverrideFlag", "VDT_OVERRIDEFLAG", None),
+            ScoreInput("ID", "int", "FactCourse"),
+        ]
+        self.o3 = [
+            ScoreInput("PatientIdentifier", "String", "Patient"),
+            ScoreInput("PatientDateOfBirth", "Date", "Patient"),
+            ScoreInput("CourseIdentifier", "Integer", "Course"),
+            ScoreInput("Id", "Integer", None),
+        ]
+
+    def _expected(self, min_score):
+        expected = []
+        for i, d in enumerate(self.dwh):
+            for j, o in enumerate(self.o3):
+                candidate = self.engine.score(d.name, d.data_type, o.name, o.data_type, d.context, o.context)
+                if candidate.score >= min_score:
+                    expected.append((i, j, candidate))
+        return expected
+
+    @pytest.mark.parametrize("min_score", [0.0, 0.3, 0.5, 0.8])
+    def test_matches_pairwise_score(self, min_score):
+        assert self.engine.score_batch(self.dwh, self.o3, min_score) == self._expected(min_score)
+
+    def test_only_pairs_above_threshold_returned(self):
+        results = self.engine.score_batch(self.dwh, self.o3, 0.5)
+        assert results
+        assert all(candidate.score >= 0.5 for _, _, candidate in results)
+
+    def test_indices_identify_inputs(self):
+        for i, j, candidate in self.engine.score_batch(self.dwh, self.o3, 0.5):
+            assert candidate.dwh_source == self.dwh[i].name
+            assert candidate.o3_target == self.o3[j].name
+
+    def test_empty_inputs(self):
+        assert self.engine.score_batch([], self.o3, 0.5) == []
+        assert self.engine.score_batch(self.dwh, [], 0.5) == []
+
+    def test_custom_weights_respected(self):
+        engine = MatchEngine(name_weight=0.2, type_weight=0.7, context_weight=0.1)
+        expected = []
+        for i, d in enumerate(self.dwh):
+            for j, o in enumerate(self.o3):
+                candidate = engine.score(d.name, d.data_type, o.name, o.data_type, d.context, o.context)
+                if candidate.score >= 0.4:
+                    expected.append((i, j, candidate))
+        assert engine.score_batch(self.dwh, self.o3, 0.4) == expected
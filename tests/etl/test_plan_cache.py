@@ -0,0 +1,96 @@
+# tests/etl/test_plan_cache.py
+import pickle
+
+import pytest
+
+from etl.mapping.mapping_store import CrosswalkEntry
+from etl.pipeline.extractor import ExtractQuery
+from etl.pipeline.plan_cache import QueryPlanCache, fingerprint
+
+
+def _entry(column: str = "DimPatientID") -> CrosswalkEntry:
+    return CrosswalkEntry("DWH.FactActivityBilling", column, None, None, None,
+                          "Patient", "PatientIdentifier", 0.9, "confirmed")
+
+
+def _query(sql: str = "SELECT 1") -> ExtractQuery:
+    return ExtractQuery("billing", "m", "t", sql, "d", [], [])
+
+
+class TestFingerprint:
+    def test_equal_contents_share_fingerprint(self):
+        assert fingerprint([_entry()], {"a": 1}) == fingerprint([_entry()], {"a": 1})
+
+    def test_changes_with_contents(self):
+        assert fingerprint([_entry()]) != fingerprint([_entry("Other")])
+        assert fingerprint("extract", [_entry()]) != fingerprint("load", [_entry()])
+
+
+class TestQueryPlanCache:
+    def test_creates_once(self):
+        cache = QueryPlanCache()
+        calls = []
+
+        def create():
+            calls.append(1)
+            return _query()
+
+        first = cache.get_or_create("ns", ("k",), create)
+        second = cache.get_or_create("ns", ("k",), create)
+        assert first == second
+        assert len(calls) == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_namespaces_are_separate(self):
+        cache = QueryPlanCache()
+        cache.get_or_create("a", "k", lambda: _query("A"))
+        assert cache.get_or_create("b", "k", lambda: _query("B")).sql == "B"
+
+    def test_returns_copies(self):
+        cache = QueryPlanCache()
+        cache.get_or_create("ns", "k", _query).sql = "changed"
+        assert cache.get_or_create("ns", "k", _query).sql == "SELECT 1"
+
+    def test_returned_plan_lists_are_independent(self):
+        cache = QueryPlanCache()
+        def create():
+            return ExtractQuery("billing", "m", "t", "SELECT 1", "d", [], [_entry()])
+
+        first = cache.get_or_create("ns", "k", create)
+        first.columns_mapped.append(_entry("Other"))
+        first.columns_mapped[0].dwh_column = "changed"
+        first.joins.append("join")
+
+        cached = cache.get_or_create("ns", "k", create)
+        assert cached.columns_mapped == [_entry()]
+        assert cached.joins == []
+
+    def test_failed_create_not_cached(self):
+        cache = QueryPlanCache()
+        with pytest.raises(ValueError):
+            cache.get_or_create("ns", "k", lambda: (_ for _ in ()).throw(ValueError("bad")))
+        assert cache.get_or_create("ns", "k", _query).sql == "SELECT 1"
+
+    def test_persists_to_disk(self, tmp_path):
+        QueryPlanCache(str(tmp_path)).get_or_create("ns", "k", _query)
+        assert [p.name for p in tmp_path.iterdir()] == ["query_plans_ns.pickle"]
+
+        reloaded = QueryPlanCache(str(tmp_path))
+        plan = reloaded.get_or_create("ns", "k", lambda: pytest.fail("should be cached"))
+        assert plan == _query()
+        assert reloaded.hits == 1
+
+    def test_unreadable_file_ignored(self, tmp_path):
+        (tmp_path / "query_plans_ns.pickle").write_bytes(b"not a pickle")
+        cache = QueryPlanCache(str(tmp_path))
+        assert cache.get_or_create("ns", "k", _query) == _query()
+        with open(tmp_path / "query_plans_ns.pickle", "rb") as f:
+            assert list(pickle.load(f)) == ["k"]
+
+    def test_clear(self, tmp_path):
+        cache = QueryPlanCache(str(tmp_path))
+        cache.get_or_create("a", "k", _query)
+        cache.get_or_create("b", "k", _query)
+        assert cache.clear() == 2
+        assert list(tmp_path.iterdir()) == []
+        assert cache.get_or_create("a", "k", lambda: _query("new")).sql == "new"
@@ -1,12 +1,18 @@
 # tests/etl/test_runner.py
 import os
 import tempfile
+import threading
+import time
 from unittest.mock import MagicMock, patch, PropertyMock
 import pytest
 from etl.pipeline.runner import ETLRunner, ETLResult, EntryPointResult
 from etl.pipeline.extractor import ExtractQuery, Extractor
 from etl.pipeline.loader import LoadCommand, Loader
 from etl.mapping.mapping_store import CrosswalkEntry
+from etl.pipeline.bulk import BulkLoadOptions
+from etl.pipeline.loader import BatchedMergeOptions, StagedLoadCommand
+from etl.pipeline.watermark import WatermarkStore
+from sql.connection.pool import ConnectionPool
 
 
 def _make_extract_query() -> ExtractQuery:
@@ -39,6 +45,7 @@ def _mock_extractor() -> MagicMock:
 def _mock_loader() -> MagicMock:
     ldr = MagicMock(spec=Loader)
     ldr.generate_insert.return_value = _make_load_command()
+    ldr.generate_counted_insert.return_value = _make_load_command()
     return ldr
 
 
@@ -135,3 +142,496 @@ class TestRunLive:
         assert result.success is False
         assert "Load failed" in result.results[0].errors[0]
         conn.rollback.assert_called_once()
+
+
+class TestRunStreaming:
+    def _runner(self, cursor):
+        conn = MagicMock()
+        conn.cursor.return_value = cursor
+        return ETLRunner(_mock_extractor(), _mock_loader(), connection=conn), conn
+
+    def test_executes_once_and_never_fetches_rows(self):
+        cursor = MagicMock()
+        cursor.fetchone.return_value = (1250,)
+        runner, conn = self._runner(cursor)
+        result = runner.run(entry_points=["billing"], streaming=True)
+
+        assert result.success is True
+        cursor.execute.assert_called_once_with(_make_load_command().sql)
+        cursor.fetchall.assert_not_called()
+        conn.commit.assert_called_once()
+
+    def test_server_row_count_reported(self):
+        cursor = MagicMock()
+        cursor.fetchone.return_value = (1250,)
+        runner, _ = self._runner(cursor)
+        ep = runner.run(entry_points=["billing"], streaming=True).results[0]
+        assert ep.rows_extracted == 1250
+        assert ep.rows_loaded == 1250
+
+    def test_uses_counted_insert(self):
+        cursor = MagicMock()
+        cursor.fetchone.return_value = (0,)
+        conn = MagicMock()
+        conn.cursor.return_value = cursor
+        ldr = _mock_loader()
+        ETLRunner(_mock_extractor(), ldr, connection=conn).run(entry_points=["billing"], streaming=True)
+        ldr.generate_counted_insert.assert_called_once()
+        ldr.generate_insert.assert_not_called()
+
+    def test_load_error_triggers_rollback(self):
+        cursor = MagicMock()
+        cursor.execute.side_effect = RuntimeError("insert failed")
+        runner, conn = self._runner(cursor)
+        result = runner.run(entry_points=["billing"], streaming=True)
+        assert result.success is False
+        assert "Load failed" in result.results[0].errors[0]
+        assert result.results[0].rows_loaded == 0
+        conn.rollback.assert_called_once()
+
+    def test_generation_error_captured(self):
+        ldr = _mock_loader()
+        ldr.generate_counted_insert.side_effect = ValueError("bad column map")
+        conn = MagicMock()
+        runner = ETLRunner(_mock_extractor(), ldr, connection=conn)
+        result = runner.run(entry_points=["billing"], streaming=True)
+        assert "Load generation failed" in result.results[0].errors[0]
+        conn.cursor.assert_not_called()
+
+    def test_dry_run_takes_precedence(self):
+        runner = ETLRunner(_mock_extractor(), _mock_loader())
+        result = runner.run(entry_points=["billing"], dry_run=True, streaming=True)
+        assert result.success is True
+        assert result.results[0].rows_loaded == 0
+
+
+def _query(entry_point: str) -> ExtractQuery:
+    query = _make_extract_query()
+    query.entry_point = entry_point
+    return query
+
+
+class _TrackingConnections:
+    """Connection factory whose cursors record how many extracts overlap per table."""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.connections: list[MagicMock] = []
+        self.active: dict[str, int] = {}
+        self.peak: dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        conn = MagicMock()
+        conn.cursor.side_effect = lambda: self.__cursor()
+        with self.lock:
+            self.connections.append(conn)
+        return conn
+
+    def __cursor(self):
+        cursor = MagicMock()
+
+        def execute(sql):
+            table = sql.split()[2] if sql.startswith("INSERT") else "extract"
+            with self.lock:
+                self.active[table] = self.active.get(table, 0) + 1
+                self.peak[table] = max(self.peak.get(table, 0), self.active[table])
+            time.sleep(self.delay)
+            with self.lock:
+                self.active[table] -= 1
+
+        cursor.execute.side_effect = execute
+        cursor.fetchall.return_value = [("row",)]
+        cursor.rowcount = 1
+        return cursor
+
+
+def _loader_for_tables(tables: dict[str, str]) -> MagicMock:
+    ldr = MagicMock(spec=Loader)
+
+    def generate_insert(query):
+        table = tables[query.entry_point]
+        return LoadCommand(target_table=table, sql=f"INSERT INTO {table} SELECT 1", column_map={})
+
+    ldr.generate_insert.side_effect = generate_insert
+    return ldr
+
+
+class TestRunConcurrent:
+    def _extractor(self, names):
+        ext = _mock_extractor()
+        ext.generate_all_queries.return_value = [_query(n) for n in names]
+        return ext
+
+    def test_requires_connection_factory(self):
+        runner = ETLRunner(_mock_extractor(), _mock_loader(), connection=MagicMock())
+        with pytest.raises(ValueError, match="connection_pool or connection_factory"):
+            runner.run(max_workers=2)
+
+    def test_rejects_invalid_limits(self):
+        runner = ETLRunner(_mock_extractor(), _mock_loader(), connection_factory=MagicMock)
+        with pytest.raises(ValueError, match="max_workers"):
+            runner.run(max_workers=0)
+        with pytest.raises(ValueError, match="max_concurrent_per_table"):
+            runner.run(max_concurrent_per_table=0)
+
+    def test_results_in_entry_point_order(self):
+        names = ["billing", "scheduling", "activity", "treatment_history"]
+        tables = {n: f"KEL_{n}" for n in names}
+        factory = _TrackingConnections(delay=0.01)
+        runner = ETLRunner(self._extractor(names), _loader_for_tables(tables), connection_factory=factory)
+        result = runner.run(max_workers=4)
+        assert [r.entry_point for r in result.results] == names
+        assert result.success is True
+        assert all(r.rows_loaded == 1 for r in result.results)
+
+    def test_each_worker_uses_own_connection_and_closes_it(self):
+        names = ["a", "b", "c", "d"]
+        factory = _TrackingConnections()
+        runner = ETLRunner(
+            self._extractor(names), _loader_for_tables({n: f"T_{n}" for n in names}),
+            connection_factory=factory,
+        )
+        runner.run(max_workers=2)
+        assert 1 <= len(factory.connections) <= 2
+        for conn in factory.connections:
+            conn.close.assert_called_once()
+        assert sum(c.commit.call_count for c in factory.connections) == 4
+
+    def test_distinct_tables_run_in_parallel(self):
+        names = ["a", "b", "c"]
+        factory = _TrackingConnections()
+        runner = ETLRunner(
+            self._extractor(names), _loader_for_tables({n: f"T_{n}" for n in names}),
+            connection_factory=factory,
+        )
+        runner.run(max_workers=3)
+        assert factory.peak["extract"] > 1
+
+    def test_per_table_cap(self):
+        names = ["a", "b", "c", "d"]
+        factory = _TrackingConnections()
+        runner = ETLRunner(
+            self._extractor(names), _loader_for_tables({n: "KEL_Patient" for n in names}),
+            connection_factory=factory,
+        )
+        runner.run(max_workers=4, max_concurrent_per_table=1)
+        assert factory.peak["KEL_Patient"] == 1
+        assert factory.peak["extract"] == 1
+
+    def test_connection_failure_isolated(self):
+        calls = []
+
+        def factory():
+            calls.append(1)
+            raise RuntimeError("login failed")
+
+        runner = ETLRunner(self._extractor(["a", "b"]), _loader_for_tables({"a": "T", "b": "U"}),
+                           connection_factory=factory)
+        result = runner.run(max_workers=2)
+        assert result.success is False
+        assert all("Connection failed" in r.errors[0] for r in result.results)
+
+    def test_sequential_run_opens_and_closes_factory_connection(self):
+        factory = _TrackingConnections(delay=0)
+        runner = ETLRunner(self._extractor(["a"]), _loader_for_tables({"a": "T"}), connection_factory=factory)
+        result = runner.run()
+        assert result.success is True
+        assert len(factory.connections) == 1
+        factory.connections[0].close.assert_called_once()
+
+
+class TestRunWithConnectionPool:
+    def _extractor(self, names):
+        ext = _mock_extractor()
+        ext.generate_all_queries.return_value = [_query(n) for n in names]
+        return ext
+
+    def test_sequential_run_borrows_per_entry_point(self):
+        factory = _TrackingConnections(delay=0)
+        pool = ConnectionPool(factory, max_size=2, health_check=False)
+        runner = ETLRunner(self._extractor(["a", "b", "c"]),
+                           _loader_for_tables({"a": "T", "b": "U", "c": "V"}), connection_pool=pool)
+        result = runner.run()
+        assert result.success is True
+        assert len(factory.connections) == 1
+        stats = pool.stats()
+        assert (stats.misses, stats.hits, stats.idle) == (1, 2, 1)
+
+    def test_concurrent_run_accepts_pool(self):
+        names = ["a", "b", "c", "d"]
+        factory = _TrackingConnections(delay=0.02)
+        pool = ConnectionPool(factory, max_size=2, health_check=False)
+        runner = ETLRunner(self._extractor(names), _loader_for_tables({n: f"T_{n}" for n in names}),
+                           connection_pool=pool)
+        result = runner.run(max_workers=4)
+        assert [r.entry_point for r in result.results] == names
+        assert result.success is True
+        assert len(factory.connections) <= 2
+        assert factory.peak["extract"] <= 2
+        assert pool.stats().size == len(factory.connections)
+
+    def test_pool_timeout_reported_as_connection_failure(self):
+        pool = ConnectionPool(MagicMock, max_size=1, health_check=False, acquire_timeout=0)
+        held = pool.acquire()
+        runner = ETLRunner(self._extractor(["a"]), _loader_for_tables({"a": "T"}), connection_pool=pool)
+        result = runner.run()
+        assert "Connection failed" in result.results[0].errors[0]
+        pool.release(held)
+
+
+class TestRunIncremental:
+    def _setup(self, tmp_path, fetched=(25, 20250110)):
+        query = _make_extract_query()
+        query.incremental = True
+        ext = _mock_extractor()
+        ext.generate_query.return_value = query
+        ldr = _mock_loader()
+        ldr.generate_incremental_insert.return_value = _make_load_command()
+        cursor = MagicMock()
+        cursor.fetchone.return_value = fetched
+        conn = MagicMock()
+        conn.cursor.return_value = cursor
+        store = WatermarkStore(str(tmp_path / "wm.json"))
+        runner = ETLRunner(ext, ldr, connection=conn, watermark_store=store)
+        return runner, ext, conn, cursor, store
+
+    def test_requires_watermark_store(self):
+        runner = ETLRunner(_mock_extractor(), _mock_loader(), connection=MagicMock())
+        with pytest.raises(ValueError, match="watermark_store"):
+            runner.run(incremental=True)
+
+    def test_passes_store_to_extractor(self, tmp_path):
+        runner, ext, _, _, store = self._setup(tmp_path)
+        runner.run(entry_points=["billing"], incremental=True)
+        ext.generate_query.assert_called_once_with("billing", None, None, store)
+
+    def test_advances_watermark_after_commit(self, tmp_path):
+        runner, _, conn, _, store = self._setup(tmp_path)
+        conn.commit.side_effect = lambda: commits.append(store.get("billing", "DimDateID_FromDateOfService"))
+        commits = []
+        ep = runner.run(entry_points=["billing"], incremental=True).results[0]
+        assert ep.errors == []
+        assert (ep.rows_extracted, ep.rows_loaded) == (25, 25)
+        assert commits == [None]
+        assert store.get("billing", "DimDateID_FromDateOfService") == 20250110
+
+    def test_failed_load_keeps_watermark(self, tmp_path):
+        runner, _, conn, cursor, store = self._setup(tmp_path)
+        store.advance("billing", "DimDateID_FromDateOfService", 20250101)
+        cursor.execute.side_effect = RuntimeError("insert failed")
+        result = runner.run(entry_points=["billing"], incremental=True)
+        assert "Load failed" in result.results[0].errors[0]
+        conn.rollback.assert_called_once()
+        assert store.get("billing", "DimDateID_FromDateOfService") == 20250101
+
+    def test_failed_commit_keeps_watermark(self, tmp_path):
+        runner, _, conn, _, store = self._setup(tmp_path)
+        conn.commit.side_effect = RuntimeError("deadlock")
+        result = runner.run(entry_points=["billing"], incremental=True)
+        assert result.success is False
+        assert store.get("billing", "DimDateID_FromDateOfService") is None
+
+    def test_no_new_rows_keeps_watermark(self, tmp_path):
+        runner, _, _, _, store = self._setup(tmp_path, fetched=(0, None))
+        result = runner.run(entry_points=["billing"], incremental=True)
+        assert result.success is True
+        assert store.to_dict() == {}
+
+
+def _staged_load(target_table="KEL_Patient") -> StagedLoadCommand:
+    return StagedLoadCommand(
+        target_table=target_table,
+        staging_table=f"#Stage_{target_table}",
+        create_sql="CREATE STAGING",
+        insert_sql="INSERT STAGING",
+        load_sql="MERGE TARGET",
+        drop_sql="DROP STAGING",
+        column_map={"PatientIdentifier": "PatientId"},
+    )
+
+
+class TestRunBulk:
+    def _setup(self, rows=((1,), (2,), (3,))):
+        ldr = _mock_loader()
+        ldr.generate_staged_load.return_value = _staged_load()
+        source_cursor = MagicMock()
+        source_cursor.description = [("PatientId",)]
+        remaining = list(rows)
+
+        def fetchmany(n):
+            batch = remaining[:n]
+            del remaining[:n]
+            return batch
+
+        source_cursor.fetchmany.side_effect = fetchmany
+        source = MagicMock()
+        source.cursor.return_value = source_cursor
+        cursor = MagicMock()
+        cursor.rowcount = len(rows)
+        target = MagicMock()
+        target.cursor.return_value = cursor
+        runner = ETLRunner(_mock_extractor(), ldr, connection=target, source_connection=source)
+        return runner, ldr, source_cursor, target, cursor
+
+    def test_requires_source_connection(self):
+        runner = ETLRunner(_mock_extractor(), _mock_loader(), connection=MagicMock())
+        with pytest.raises(ValueError, match="source_connection"):
+            runner.run(bulk=BulkLoadOptions())
+
+    def test_concurrent_requires_source_pool(self):
+        runner = ETLRunner(_mock_extractor(), _mock_loader(), connection_factory=MagicMock,
+                           source_connection=MagicMock())
+        with pytest.raises(ValueError, match="ConnectionPool"):
+            runner.run(bulk=BulkLoadOptions(), max_workers=2)
+
+    def test_streams_chunks_into_staging_then_merges(self):
+        runner, _, source_cursor, target, cursor = self._setup()
+        result = runner.run(entry_points=["billing"], bulk=BulkLoadOptions(chunk_size=2))
+        ep = result.results[0]
+        assert ep.errors == []
+        assert (ep.rows_extracted, ep.rows_loaded) == (3, 3)
+        source_cursor.execute.assert_called_once_with(_make_extract_query().sql)
+        assert [c.args[0] for c in cursor.execute.call_args_list] == [
+            "CREATE STAGING", "MERGE TARGET", "DROP STAGING",
+        ]
+        assert [c.args[1] for c in cursor.executemany.call_args_list] == [[(1,), (2,)], [(3,)]]
+        target.commit.assert_called_once()
+
+    def test_merge_key_looked_up_by_target_table(self):
+        runner, ldr, _, _, _ = self._setup()
+        runner.run(entry_points=["billing"],
+                   bulk=BulkLoadOptions(merge_keys={"KEL_Patient": ["PatientIdentifier"]}))
+        ldr.generate_staged_load.assert_called_once_with(_make_extract_query(), ["PatientIdentifier"])
+
+    def test_copy_failure_rolls_back(self):
+        runner, _, _, target, cursor = self._setup()
+        cursor.executemany.side_effect = RuntimeError("conversion failed")
+        result = runner.run(entry_points=["billing"], bulk=BulkLoadOptions())
+        assert "Bulk load failed" in result.results[0].errors[0]
+        target.rollback.assert_called_once()
+        target.commit.assert_not_called()
+
+    def test_source_pool_borrowed(self):
+        runner, ldr, source_cursor, target, _ = self._setup()
+        source = MagicMock()
+        source.cursor.return_value = source_cursor
+        pool = ConnectionPool(lambda: source, health_check=False)
+        runner = ETLRunner(_mock_extractor(), ldr, connection=target, source_connection=pool)
+        assert runner.run(entry_points=["billing"], bulk=BulkLoadOptions()).success is True
+        assert pool.stats().idle == 1
+
+    def test_incremental_watermark_from_copied_rows(self, tmp_path):
+        _, ldr, source_cursor, target, _ = self._setup(rows=((1, 20250102), (2, 20250105)))
+        source_cursor.description = [("PatientId",), ("_WatermarkDateKey",)]
+        query = _make_extract_query()
+        query.incremental = True
+        ext = _mock_extractor()
+        ext.generate_query.return_value = query
+        store = WatermarkStore(str(tmp_path / "wm.json"))
+        runner = ETLRunner(ext, ldr, connection=target, source_connection=MagicMock(
+            cursor=MagicMock(return_value=source_cursor)), watermark_store=store)
+        result = runner.run(entry_points=["billing"], incremental=True, bulk=BulkLoadOptions())
+        assert result.success is True
+        assert store.get("billing", "DimDateID_FromDateOfService") == 20250105
+
+
+class TestRunBatchedMerge:
+    def _runner(self, fetched=(10, 4, 6, None, 0)):
+        ldr = _mock_loader()
+        ldr.generate_batched_merge.return_value = _make_load_command()
+        cursor = MagicMock()
+        cursor.fetchone.return_value = fetched
+        conn = MagicMock()
+        conn.cursor.return_value = cursor
+        return ETLRunner(_mock_extractor(), ldr, connection=conn), ldr, conn
+
+    def test_tables_with_merge_keys_use_batched_merge(self):
+        runner, ldr, conn = self._runner()
+        options = BatchedMergeOptions(merge_keys={"KEL_Patient": ["PatientIdentifier"]}, batch_size=250)
+        ep = runner.run(entry_points=["billing"], batched_merge=options).results[0]
+        assert ep.errors == []
+        ldr.generate_batched_merge.assert_called_once_with(_make_extract_query(), ["PatientIdentifier"], 250)
+        assert (ep.rows_extracted, ep.rows_loaded, ep.rows_skipped) == (10, 10, 0)
+        conn.commit.assert_called_once()
+
+    def test_reports_rows_skipped_for_null_keys(self):
+        runner, _, _ = self._runner(fetched=(10, 4, 3, None, 3))
+        options = BatchedMergeOptions(merge_keys={"KEL_Patient": ["PatientIdentifier"]})
+        ep = runner.run(entry_points=["billing"], batched_merge=options).results[0]
+        assert (ep.rows_loaded, ep.rows_skipped) == (7, 3)
+
+    def test_tables_without_keys_use_default_load(self):
+        runner, ldr, conn = self._runner()
+        conn.cursor.return_value.fetchall.return_value = []
+        runner.run(entry_points=["billing"], batched_merge=BatchedMergeOptions(merge_keys={"Other": ["Id"]}))
+        ldr.generate_batched_merge.assert_not_called()
+        ldr.generate_insert.assert_called()
+
+    def test_load_failure_rolls_back(self):
+        runner, _, conn = self._runner()
+        conn.cursor.return_value.execute.side_effect = RuntimeError("duplicate key")
+        options = BatchedMergeOptions(merge_keys={"KEL_Patient": ["PatientIdentifier"]})
+        result = runner.run(entry_points=["billing"], batched_merge=options)
+        assert "Load failed" in result.results[0].errors[0]
+        conn.rollback.assert_called_once()
+
+
+class TestBoundParameters:
+    def _query(self):
+        query = _make_extract_query()
+        query.sql = "SELECT a FROM t WHERE d >= DATEADD(DAY, -CAST(? AS INT), GETDATE())"
+        query.params = (30,)
+        query.param_names = ("lookback_days",)
+        return query
+
+    def test_extract_and_load_bind_params(self):
+        ext = _mock_extractor()
+        ext.generate_query.return_value = self._query()
+        cursor = MagicMock()
+        cursor.fetchall.return_value = []
+        conn = MagicMock()
+        conn.cursor.return_value = cursor
+        ETLRunner(ext, _mock_loader(), connection=conn).run(entry_points=["billing"])
+        assert [c.args for c in cursor.execute.call_args_list] == [
+            (self._query().sql, (30,)),
+            (_make_load_command().sql, (30,)),
+        ]
+
+    def test_incremental_and_bulk_bind_params(self, tmp_path):
+        query = self._query()
+        query.incremental = True
+        ext = _mock_extractor()
+        ext.generate_query.return_value = query
+        ldr = _mock_loader()
+        ldr.generate_incremental_insert.return_value = _make_load_command()
+        cursor = MagicMock()
+        cursor.fetchone.return_value = (0, None)
+        conn = MagicMock()
+        conn.cursor.return_value = cursor
+        store = WatermarkStore(str(tmp_path / "wm.json"))
+        ETLRunner(ext, ldr, connection=conn, watermark_store=store).run(
+            entry_points=["billing"], incremental=True)
+        cursor.execute.assert_called_once_with(_make_load_command().sql, (30,))
+
+        source_cursor = MagicMock(description=[("PatientId",)])
+        source_cursor.fetchmany.return_value = []
+        ldr.generate_staged_load.return_value = _staged_load()
+        runner = ETLRunner(ext, ldr, connection=conn,
+                           source_connection=MagicMock(cursor=MagicMock(return_value=source_cursor)),
+                           watermark_store=store)
+        runner.run(entry_points=["billing"], incremental=True, bulk=BulkLoadOptions())
+        source_cursor.execute.assert_called_once_with(query.sql, (30,))
+
+    def test_export_inlines_params(self, tmp_path):
+        ext = _mock_extractor()
+        ext.generate_query.return_value = self._query()
+        ldr = _mock_loader()
+        ldr.generate_insert.return_value = LoadCommand(
+            target_table="KEL_Patient", sql=f"INSERT INTO KEL_Patient SELECT * FROM ({self._query().sql}) AS src",
+            column_map={},
+        )
+        ETLRunner(ext, ldr).export_sql(str(tmp_path), entry_points=["billing"])
+        content = (tmp_path / "billing_etl.sql").read_text()
+        assert "?" not in content
+        assert content.count("-CAST(30 AS INT)") == 2
@@ -0,0 +1,58 @@
+# tests/etl/test_watermark.py
+import json
+import threading
+
+from etl.pipeline.watermark import Watermark, WatermarkStore
+
+
+class TestWatermarkStore:
+    def test_empty_store(self, tmp_path):
+        store = WatermarkStore(str(tmp_path / "wm.json"))
+        assert store.get("billing", "DimDateID") is None
+        assert not (tmp_path / "wm.json").exists()
+
+    def test_advance_persists(self, tmp_path):
+        path = str(tmp_path / "wm.json")
+        assert WatermarkStore(path).advance("billing", "DimDateID", 20250110) is True
+        reloaded = WatermarkStore(path)
+        assert reloaded.get("billing", "DimDateID") == 20250110
+        with open(path, encoding="utf-8") as f:
+            assert json.load(f) == {"billing": {"date_key": "DimDateID", "value": 20250110}}
+
+    def test_never_moves_backwards(self, tmp_path):
+        store = WatermarkStore(str(tmp_path / "wm.json"))
+        store.advance("billing", "DimDateID", 20250110)
+        assert store.advance("billing", "DimDateID", 20250101) is False
+        assert store.get("billing", "DimDateID") == 20250110
+
+    def test_other_date_key_returns_none(self, tmp_path):
+        store = WatermarkStore(str(tmp_path / "wm.json"))
+        store.advance("billing", "DimDateID", 20250110)
+        assert store.get("billing", "DimDateID_Posted") is None
+        # Switching date key replaces the watermark
+        assert store.advance("billing", "DimDateID_Posted", 20240101) is True
+        assert store.to_dict() == {"billing": Watermark("DimDateID_Posted", 20240101)}
+
+    def test_reset(self, tmp_path):
+        path = str(tmp_path / "wm.json")
+        store = WatermarkStore(path)
+        store.advance("a", "D", 1)
+        store.advance("b", "D", 2)
+        store.reset("a")
+        assert WatermarkStore(path).to_dict() == {"b": Watermark("D", 2)}
+        store.reset()
+        assert WatermarkStore(path).to_dict() == {}
+
+    def test_concurrent_advances(self, tmp_path):
+        path = str(tmp_path / "wm.json")
+        store = WatermarkStore(path)
+        threads = [
+            threading.Thread(target=store.advance, args=(f"ep{i}", "D", i))
+            for i in range(10)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(WatermarkStore(path).to_dict()) == 10
+        assert [p.name for p in tmp_path.iterdir()] == ["wm.json"]
@@ -0,0 +1,274 @@
+"""Tests for the asyncio query layer with mocked pyodbc."""
+
+import asyncio
+import sys
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+if 'pyodbc' not in sys.modules:
+    _mock_pyodbc = MagicMock()
+    _mock_pyodbc.Error = type('Error', (Exception,), {})
+    sys.modules['pyodbc'] = _mock_pyodbc
+
+import pyodbc
+
+from sql.aria_integration.async_query import AsyncDatatable, AsyncQueryExecutor
+from sql.aria_integration.queried_datatable import Datatable, QueryHandle
+from sql.connection.pool import ConnectionPool
+
+
+class _Table(Datatable):
+    """A Datatable exposing the public methods AsyncDatatable forwards to."""
+
+    def get_data(self, num_results=None):
+        return self._get_data(num_results=num_results)
+
+    def get_batches(self, chunk_size=None):
+        return self._get_batches(chunk_size=chunk_size)
+
+    def get_columnar(self, num_results=None):
+        return self._get_columnar(num_results=num_results)
+
+
+class _BlockingCursor:
+    """A cursor whose execute blocks until cancel() is called."""
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self.started = threading.Event()
+        self.arraysize = 1
+
+    def execute(self, *args):
+        self.started.set()
+        self.cancelled.wait(5)
+        raise pyodbc.Error("Operation canceled")
+
+    def cancel(self):
+        self.cancelled.set()
+
+
+def _table(tmp_path, cursor, max_size=2):
+    query_file = tmp_path / "test.sql"
+    query_file.write_text("SELECT 1")
+    conn = MagicMock()
+    conn.cursor.return_value = cursor
+    pool = ConnectionPool(lambda: conn, max_size=max_size, health_check=False)
+    return _Table(pool, str(query_file)), pool
+
+
+def _rows_cursor(batches):
+    cursor = MagicMock()
+    cursor.execute.side_effect = lambda *args: iter([("r1",), ("r2",)])
+    cursor.fetchmany.side_effect = list(batches) + [[]]
+    return cursor
+
+
+class TestAsyncQueryExecutor:
+    """Tests for AsyncQueryExecutor."""
+
+    def test_runs_call_on_worker(self):
+        async def main():
+            async with AsyncQueryExecutor(max_workers=1) as executor:
+                return await executor.run(threading.current_thread)
+
+        assert asyncio.run(main()).name.startswith("o3-query")
+
+    def test_for_pool_matches_pool_size(self):
+        pool = ConnectionPool(MagicMock, max_size=3, health_check=False)
+        executor = AsyncQueryExecutor.for_pool(pool)
+        assert executor.max_workers == 3
+        executor.shutdown()
+
+    def test_invalid_max_workers(self):
+        with pytest.raises(ValueError, match="max_workers must be >= 1"):
+            AsyncQueryExecutor(max_workers=0)
+
+    def test_timeout_cancels_handle(self):
+        handle = QueryHandle()
+        release = threading.Event()
+
+        async def main():
+            async with AsyncQueryExecutor(max_workers=1) as executor:
+                try:
+                    await executor.run(release.wait, 5, timeout=0.05, handle=handle)
+                finally:
+                    release.set()
+
+        with pytest.raises(TimeoutError, match="0.05 seconds"):
+            asyncio.run(main())
+        assert handle.cancelled
+
+
+class TestQueryHandle:
+    """Tests for QueryHandle cursor registration."""
+
+    def test_registers_cursors_opened_while_active(self, tmp_path):
+        cursor = _rows_cursor([])
+        table, _ = _table(tmp_path, cursor)
+        handle = QueryHandle()
+        with handle.activate():
+            list(table.get_data())
+        handle.cancel()
+        cursor.cancel.assert_called_once()
+
+    def test_cancelled_handle_rejects_new_cursors(self, tmp_path):
+        table, _ = _table(tmp_path, _rows_cursor([]))
+        handle = QueryHandle()
+        handle.cancel()
+        with handle.activate(), pytest.raises(RuntimeError, match="cancelled"):
+            list(table.get_data())
+
+
+class TestAsyncDatatable:
+    """Tests for AsyncDatatable."""
+
+    def test_requires_connection_pool(self, tmp_path):
+        query_file = tmp_path / "test.sql"
+        query_file.write_text("SELECT 1")
+        with pytest.raises(TypeError, match="ConnectionPool"):
+            AsyncDatatable(_Table(MagicMock(), str(query_file)), AsyncQueryExecutor())
+
+    def test_fetch_returns_all_rows(self, tmp_path):
+        table, pool = _table(tmp_path, _rows_cursor([]))
+
+        async def main():
+            async with AsyncQueryExecutor(max_workers=2) as executor:
+                return await AsyncDatatable(table, executor).fetch()
+
+        assert asyncio.run(main()) == [("r1",), ("r2",)]
+        assert pool.stats().idle == 1
+
+    def test_fetches_overlap(self, tmp_path):
+        table, _ = _table(tmp_path, _rows_cursor([]))
+
+        async def main():
+            async with AsyncQueryExecutor(max_workers=2) as executor:
+                patient = AsyncDatatable(table, executor)
+                return await asyncio.gather(patient.fetch(), patient.fetch())
+
+        assert asyncio.run(main()) == [[("r1",), ("r2",)]] * 2
+
+    def test_batches_yield_each_fetch(self, tmp_path):
+        table, pool = _table(tmp_path, _rows_cursor([[("a",)], [("b",)]]))
+
+        async def main():
+            async with AsyncQueryExecutor(max_workers=1) as executor:
+                return [batch async for batch in AsyncDatatable(table, executor).batches(chunk_size=1)]
+
+        assert asyncio.run(main()) == [[("a",)], [("b",)]]
+        assert pool.stats().idle == 1
+
+    def test_leaving_batches_early_returns_connection(self, tmp_path):
+        table, pool = _table(tmp_path, _rows_cursor([[("a",)], [("b",)]]))
+
+        async def main():
+            async with AsyncQueryExecutor(max_workers=1) as executor:
+                batches = AsyncDatatable(table, executor).batches(chunk_size=1)
+                async for _ in batches:
+                    break
+                await batches.aclose()
+
+        asyncio.run(main())
+        assert pool.stats().idle == 1
+
+    def test_open_batch_iterators_do_not_starve_fetches(self, tmp_path):
+        query_file = tmp_path / "test.sql"
+        query_file.write_text("SELECT 1")
+
+        def connect():
+            conn = MagicMock()
+            conn.cursor.side_effect = lambda: _rows_cursor([[("a",)], [("b",)]])
+            return conn
+
+        pool = ConnectionPool(connect, max_size=2, health_check=False, acquire_timeout=1)
+        table = _Table(pool, str(query_file))
+
+        async def main():
+            async with AsyncQueryExecutor.for_pool(pool) as executor:
+                patient = AsyncDatatable(table, executor)
+                opened = []
+                release = asyncio.Event()
+
+                async def consume():
+                    batches = []
+                    async for batch in patient.batches(chunk_size=1, timeout=5):
+                        batches.append(batch)
+                        opened.append(batch)
+                        await release.wait()
+                    return batches
+
+                iterators = [asyncio.ensure_future(consume()) for _ in range(3)]
+                # Let as many iterators as allowed open and hold their connections
+                while not opened:
+                    await asyncio.sleep(0.01)
+                await asyncio.sleep(0.05)
+                fetched = await asyncio.wait_for(
+                    asyncio.gather(*(patient.fetch(timeout=5) for _ in range(4))), 10
+                )
+                release.set()
+                return await asyncio.wait_for(asyncio.gather(*iterators), 10), fetched
+
+        batches, fetched = asyncio.run(main())
+        assert batches == [[[("a",)], [("b",)]]] * 3
+        assert fetched == [[("r1",), ("r2",)]] * 4
+        assert pool.stats().timeouts == 0
+
+    def test_iterator_slots_leave_a_connection_free(self):
+        pool = ConnectionPool(MagicMock(), max_size=3)
+        executor = AsyncQueryExecutor(max_workers=4)
+        try:
+            assert executor.iterator_slots(pool) is executor.iterator_slots(pool)
+            assert executor.iterator_slots(pool)._value == 2
+        finally:
+            executor.shutdown()
+        single = AsyncQueryExecutor(max_workers=1)
+        try:
+            assert single.iterator_slots(pool)._value == 1
+        finally:
+            single.shutdown()
+
+    def test_timeout_cancels_statement_and_frees_worker(self, tmp_path):
+        cursor = _BlockingCursor()
+        table, pool = _table(tmp_path, cursor)
+
+        async def main():
+            async with AsyncQueryExecutor(max_workers=1) as executor:
+                patient = AsyncDatatable(table, executor)
+                with pytest.raises(TimeoutError):
+                    await patient.fetch(timeout=0.05)
+                # The single worker is free again once the statement was cancelled
+                return await executor.run(lambda: "next", timeout=5)
+
+        assert asyncio.run(main()) == "next"
+        assert cursor.cancelled.is_set()
+        assert pool.stats().idle == 1
+
+    def test_task_cancellation_cancels_statement(self, tmp_path):
+        cursor = _BlockingCursor()
+        table, _ = _table(tmp_path, cursor)
+
+        async def main():
+            async with AsyncQueryExecutor(max_workers=1) as executor:
+                task = asyncio.ensure_future(AsyncDatatable(table, executor).fetch())
+                while not cursor.started.is_set():
+                    await asyncio.sleep(0.01)
+                task.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+
+        asyncio.run(main())
+        assert cursor.cancelled.is_set()
+
+    def test_columnar(self, tmp_path):
+        pytest.importorskip("numpy")
+        cursor = _rows_cursor([[(1,), (2,)]])
+        cursor.description = [("Age", int)]
+        table, _ = _table(tmp_path, cursor)
+
+        async def main():
+            async with AsyncQueryExecutor(max_workers=1) as executor:
+                return await AsyncDatatable(table, executor).columnar()
+
+        assert asyncio.run(main())["Age"].tolist() == [1, 2]
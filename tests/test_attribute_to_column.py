@@ -8,6 +8,7 @@ import pytest
 from helpers.enums import SupportedSQLServers
 from sql.data_model_to_sql.attribute_to_column import (
     AttributeToSQLColumn,
+    clear_column_resolution_cache,
 )
 
 
@@ -393,3 +394,77 @@ class TestUnsupportedSQLServer:
         attr = _make_attribute()
         with pytest.raises(ValueError):
             AttributeToSQLColumn(attr, False, "INVALID")
+
+
+class TestForVariant:
+    """for_variant reuses the resolved data type and recomputes nullability."""
+
+    def test_matches_direct_construction(self):
+        attr = _make_attribute(value_data_type="Integer", allow_null="No for systems allowing PHI. "
+                                                                      "Yes for systems not allowing PHI")
+        base = AttributeToSQLColumn(attr, True, SupportedSQLServers.MSSQL)
+        for sql_type in (SupportedSQLServers.MSSQL, SupportedSQLServers.PSQL):
+            for phi in (True, False):
+                variant = base.for_variant(phi, sql_type)
+                direct = AttributeToSQLColumn(attr, phi, sql_type)
+                assert variant.column_creation_text == direct.column_creation_text
+
+    def test_skips_data_type_resolution(self):
+        attr = _make_attribute(value_data_type="Decimal")
+        base = AttributeToSQLColumn(attr, True, SupportedSQLServers.MSSQL)
+        attr.value_data_type = "Quaternion"
+        assert base.for_variant(False, SupportedSQLServers.PSQL).column_data_type == "Decimal"
+
+    def test_mrn_nullability_follows_phi_flag(self):
+        attr = _make_attribute(string_code="Patient_MRN")
+        base = AttributeToSQLColumn(attr, True, SupportedSQLServers.MSSQL)
+        assert base.column_nullable == "NOT NULL"
+        assert base.for_variant(False, SupportedSQLServers.MSSQL).column_nullable == "NULL"
+
+    def test_invalid_server_type_raises(self):
+        base = AttributeToSQLColumn(_make_attribute(), False, SupportedSQLServers.MSSQL)
+        with pytest.raises(ValueError):
+            base.for_variant(False, "INVALID")
+
+
+class TestResolutionCache:
+    """Column resolution is computed once per attribute and reused."""
+
+    def test_data_type_resolved_once(self):
+        attr = _make_attribute(value_data_type="Integer")
+        AttributeToSQLColumn(attr, True, SupportedSQLServers.MSSQL)
+        attr.value_data_type = "Boolean"
+        assert AttributeToSQLColumn(attr, False, SupportedSQLServers.PSQL).column_data_type == "Integer"
+
+    def test_clear_cache_resolves_again(self):
+        attr = _make_attribute(value_data_type="Integer")
+        AttributeToSQLColumn(attr, True, SupportedSQLServers.MSSQL)
+        attr.value_data_type = "Boolean"
+        clear_column_resolution_cache()
+        assert AttributeToSQLColumn(attr, True, SupportedSQLServers.MSSQL).column_data_type == "Boolean"
+
+    def test_column_text_per_dialect_and_phi(self):
+        attr = _make_attribute(string_code="Patient_MRN", value_data_type="String")
+        mssql_phi = AttributeToSQLColumn(attr, True, SupportedSQLServers.MSSQL).column_creation_text
+        psql_no_phi = AttributeToSQLColumn(attr, False, SupportedSQLServers.PSQL).column_creation_text
+        assert mssql_phi == "MRN varchar(max) NOT NULL"
+        assert psql_no_phi == "MRN text NULL"
+        assert AttributeToSQLColumn(attr, True, SupportedSQLServers.MSSQL).column_creation_text is mssql_phi
+
+    def test_unresolvable_type_not_cached(self):
+        attr = _make_attribute(value_data_type="Quaternion", value_name="Rotation")
+        with pytest.raises(ValueError):
+            AttributeToSQLColumn(attr, False, SupportedSQLServers.MSSQL)
+        attr.value_data_type = "Integer"
+        assert AttributeToSQLColumn(attr, False, SupportedSQLServers.MSSQL).column_data_type == "Integer"
+
+    def test_nullable_warning_emitted_for_cached_resolutions(self):
+        attr = _make_attribute(allow_null="SomeUnknownValue")
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            base = AttributeToSQLColumn(attr, False, SupportedSQLServers.MSSQL)
+            col = AttributeToSQLColumn(attr, False, SupportedSQLServers.PSQL)
+            base.for_variant(False, SupportedSQLServers.PSQL)
+            null_warnings = [x for x in w if "Defaulting to NULL" in str(x.message)]
+            assert len(null_warnings) == 3
+        assert col.column_nullable == "NULL"
@@ -63,6 +63,11 @@ class TestBuildParser:
         args = parser.parse_args(["-i", "in.json", "-o", "out.sql"])
         assert args.include_patient_hash is False
 
+    def test_cache_dir_default_none(self):
+        parser = _build_parser()
+        args = parser.parse_args(["-i", "in.json", "-o", "out.sql"])
+        assert args.cache_dir is None
+
 
 _SCHEMA_PATH = os.path.join(
     os.path.dirname(__file__), '..', 'src', 'Resources', 'O3_20250128.json'
@@ -165,3 +170,31 @@ class TestMainIntegration:
             assert "FOREIGN KEY" in content
         finally:
             os.unlink(output_path)
+
+    @pytest.mark.skipif(
+        not os.path.exists(_SCHEMA_PATH),
+        reason="Schema file O3_20250128.json not available in Resources/"
+    )
+    def test_cache_dir_reused_across_runs(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_dir = os.path.join(tmpdir, "cache")
+            first = os.path.join(tmpdir, "first.sql")
+            second = os.path.join(tmpdir, "second.sql")
+
+            assert main(["-i", _SCHEMA_PATH, "-o", first, "--clean", "--cache-dir", cache_dir]) == 0
+            assert len(os.listdir(cache_dir)) == 1
+            assert main(["-i", _SCHEMA_PATH, "-o", second, "--clean", "--cache-dir", cache_dir]) == 0
+
+            with open(first) as f1, open(second) as f2:
+                assert f1.read() == f2.read()
+
+    @pytest.mark.skipif(
+        not os.path.exists(_SCHEMA_PATH),
+        reason="Schema file O3_20250128.json not available in Resources/"
+    )
+    def test_dash_output_writes_to_stdout(self, capsys):
+        result = main(["-i", _SCHEMA_PATH, "-o", "-", "-s", "psql", "--clean"])
+        assert result == 0
+        captured = capsys.readouterr()
+        assert "CREATE TABLE" in captured.out
+        assert "SQL written to" not in captured.out
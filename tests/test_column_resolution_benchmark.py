@@ -0,0 +1,89 @@
+"""
+Micro-benchmark of the cached column resolution in AttributeToSQLColumn on the real schema.
+
+The reuse checks always run; the timed comparison is opt-in with ``pytest --run-benchmarks``
+and reports the speedup as the ``column_resolution_speedup`` test property.
+"""
+
+import pathlib
+import time
+import warnings
+
+import pytest
+
+from api.data_model import O3DataModel
+from helpers.enums import SupportedSQLServers
+from sql.data_model_to_sql.attribute_to_column import AttributeToSQLColumn, clear_column_resolution_cache
+from sql.data_model_to_sql.table_generator import KeyElementTableCreator
+
+_JSON_PATH = pathlib.Path(__file__).parent.parent / 'src' / 'Resources' / 'O3_20250128_Fixed.json'
+_ROUNDS = 10
+
+
+@pytest.fixture(scope="module")
+def model():
+    return O3DataModel(str(_JSON_PATH), clean=True)
+
+
+def _build_all_variants(model):
+    return [
+        KeyElementTableCreator(sql_type, ke, phi_allowed=phi).sql_table()
+        for sql_type in SupportedSQLServers
+        for phi in (True, False)
+        for ke in model.key_elements.values()
+    ]
+
+
+def _build_all_columns(model):
+    return [
+        AttributeToSQLColumn(attr, phi, sql_type).column_creation_text
+        for sql_type in SupportedSQLServers
+        for phi in (True, False)
+        for ke in model.key_elements.values()
+        for attr in ke.list_attributes
+    ]
+
+
+def _best_cold_and_warm(build):
+    """Best uncached and cached times, interleaved so both see the same machine load."""
+    cold = warm = float('inf')
+    for _ in range(_ROUNDS):
+        clear_column_resolution_cache()
+        start = time.perf_counter()
+        build()
+        cold = min(cold, time.perf_counter() - start)
+        start = time.perf_counter()
+        build()
+        warm = min(warm, time.perf_counter() - start)
+    return cold, warm
+
+
+class TestColumnResolutionBenchmark:
+    def test_cached_tables_match_uncached(self, model):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            clear_column_resolution_cache()
+            assert _build_all_variants(model) == _build_all_variants(model)
+
+    def test_second_resolution_reuses_cached_columns(self, model):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            clear_column_resolution_cache()
+            first = _build_all_columns(model)
+            second = _build_all_columns(model)
+            clear_column_resolution_cache()
+            rebuilt = _build_all_columns(model)
+
+        assert all(cached is original for cached, original in zip(second, first, strict=True))
+        assert rebuilt == first
+        assert not any(fresh is original for fresh, original in zip(rebuilt, first, strict=True))
+
+    @pytest.mark.benchmark
+    def test_cached_resolution_speedup(self, model, record_property):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            cold, warm = _best_cold_and_warm(lambda: _build_all_columns(model))
+
+        speedup = cold / warm
+        record_property("column_resolution_speedup", round(speedup, 2))
+        assert speedup > 1.0, f"cached {warm * 1000:.1f} ms vs uncached {cold * 1000:.1f} ms"
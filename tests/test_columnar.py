@@ -0,0 +1,161 @@
+"""Tests for columnar result materialization."""
+
+import datetime
+import decimal
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+if 'pyodbc' not in sys.modules:
+    _mock_pyodbc = MagicMock()
+    _mock_pyodbc.Error = type('Error', (Exception,), {})
+    sys.modules['pyodbc'] = _mock_pyodbc
+
+from sql.aria_integration.columnar import ColumnarBuilder, ColumnarTable
+from sql.aria_integration.queried_datatable import Datatable
+
+DESCRIPTION = [
+    ("PatientId", str),
+    ("Age", int),
+    ("Dose", decimal.Decimal),
+    ("Treated", datetime.datetime),
+    ("Born", datetime.date),
+    ("Active", bool),
+]
+
+ROWS = [
+    ("A1", 40, decimal.Decimal("1.5"), datetime.datetime(2024, 1, 2, 3), datetime.date(1980, 5, 1), True),
+    ("A2", None, None, None, None, None),
+    (None, 62, decimal.Decimal("2.0"), datetime.datetime(2024, 2, 1), datetime.date(1962, 1, 1), False),
+]
+
+
+def _table(rows=ROWS, capacity=1):
+    builder = ColumnarBuilder(DESCRIPTION, capacity)
+    for row in rows:
+        builder.append([row])
+    return builder.build()
+
+
+class TestColumnarBuilder:
+    """Typed buffers filled from row batches."""
+
+    def test_column_dtypes(self):
+        table = _table()
+        assert table["Age"].dtype == np.int64
+        assert table["Dose"].dtype == object
+        assert table["Treated"].dtype == np.dtype("datetime64[us]")
+        assert table["Born"].dtype == np.dtype("datetime64[D]")
+        assert table["Active"].dtype == np.bool_
+
+    def test_values(self):
+        table = _table()
+        assert table.names == [name for name, _ in DESCRIPTION]
+        assert len(table) == 3
+        assert table["Age"].tolist() == [40, 0, 62]
+        assert table["Dose"][0] == decimal.Decimal("1.5")
+        assert table["Treated"][0] == np.datetime64("2024-01-02T03:00:00")
+        assert table["PatientId"][0] == "A1"
+
+    def test_null_masks(self):
+        table = _table()
+        assert table.null_mask("Age").tolist() == [False, True, False]
+        assert table.null_mask("PatientId").tolist() == [False, False, True]
+        assert table["Dose"][1] is None
+        assert np.isnat(table["Treated"][1])
+
+    def test_buffers_grow_and_trim(self):
+        builder = ColumnarBuilder(DESCRIPTION, 2)
+        builder.append(ROWS * 3)
+        table = builder.build()
+        assert builder.rows == 9
+        assert table["Age"].shape == (9,)
+        assert table.null_mask("Age").sum() == 3
+
+    def test_empty_result_keeps_columns(self):
+        table = ColumnarBuilder(DESCRIPTION, 10).build()
+        assert len(table) == 0
+        assert table.names == [name for name, _ in DESCRIPTION]
+
+    def test_unknown_types_use_object_columns(self):
+        builder = ColumnarBuilder([("Blob", bytes)], 1)
+        builder.append([(b"\x00",)])
+        assert builder.build()["Blob"].dtype == object
+
+
+class TestColumnarTable:
+    """Slicing, filtering and persistence."""
+
+    def test_slice_returns_views(self):
+        table = _table()
+        head = table[:2]
+        assert len(head) == 2
+        assert np.shares_memory(head["Age"], table["Age"])
+        assert head.null_mask("Age").tolist() == [False, True]
+
+    def test_filter_by_mask(self):
+        table = _table()
+        adults = table.filter(table["Age"] > 50)
+        assert adults["Age"].tolist() == [62]
+        assert adults.null_mask("PatientId").tolist() == [True]
+
+    def test_filter_by_indexes(self):
+        assert _table()[np.array([2, 0])]["Age"].tolist() == [62, 40]
+
+    def test_unknown_column_raises(self):
+        with pytest.raises(KeyError, match="No column 'Missing'"):
+            _table()["Missing"]
+
+    def test_mismatched_lengths_raise(self):
+        with pytest.raises(ValueError, match="same length"):
+            ColumnarTable({"a": np.zeros(2), "b": np.zeros(3)})
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        table = _table()
+        path = tmp_path / "cohort.npz"
+        table.save(str(path))
+        loaded = ColumnarTable.load(str(path))
+
+        assert loaded.names == table.names
+        assert loaded["Age"].tolist() == table["Age"].tolist()
+        assert loaded["PatientId"][2] is None
+        assert loaded["PatientId"][0] == "A1"
+        assert loaded.null_mask("Age").tolist() == [False, True, False]
+
+    def test_nbytes_counts_buffers(self):
+        table = _table()
+        assert table.nbytes >= table["Age"].nbytes + table["Dose"].nbytes
+
+
+class TestDatatableColumnar:
+    """Datatable._get_columnar reads fetchmany batches into a ColumnarTable."""
+
+    def _datatable(self, tmp_path, batches):
+        query_file = tmp_path / "test.sql"
+        query_file.write_text("SELECT 1")
+        conn = MagicMock()
+        cursor = conn.cursor.return_value
+        cursor.description = DESCRIPTION
+        cursor.fetchmany.side_effect = list(batches) + [[]]
+        return Datatable(conn, str(query_file)), cursor
+
+    def test_reads_all_batches(self, tmp_path):
+        dt, cursor = self._datatable(tmp_path, [ROWS[:2], ROWS[2:]])
+        table = dt._get_columnar(chunk_size=2)
+        assert len(table) == 3
+        assert table["Age"].tolist() == [40, 0, 62]
+        assert dt.last_fetch_stats.batches == 2
+
+    def test_num_results_limits_fetch(self, tmp_path):
+        dt, cursor = self._datatable(tmp_path, [ROWS[:2]])
+        table = dt._get_columnar(num_results=2, chunk_size=5)
+        assert len(table) == 2
+        cursor.fetchmany.assert_called_once_with(2)
+
+    def test_forwards_params(self, tmp_path):
+        dt, cursor = self._datatable(tmp_path, [])
+        assert len(dt._get_columnar(params=("123",))) == 0
+        cursor.execute.assert_called_once_with(dt.query, ("123",))
@@ -0,0 +1,228 @@
+"""Tests for the thread-safe ConnectionPool."""
+
+import sys
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Mock pyodbc with a real Error class so later Datatable tests can catch it
+if 'pyodbc' not in sys.modules:
+    _mock_pyodbc = MagicMock()
+    _mock_pyodbc.Error = type('Error', (Exception,), {})
+    sys.modules['pyodbc'] = _mock_pyodbc
+
+from sql.connection.mssql import MSSQLConnection
+from sql.connection.pool import ConnectionPool
+
+
+class _Factory:
+    """Connection factory recording every connection it opens."""
+
+    def __init__(self):
+        self.connections: list[MagicMock] = []
+
+    def __call__(self):
+        conn = MagicMock(name=f"conn{len(self.connections)}")
+        self.connections.append(conn)
+        return conn
+
+
+class TestConstruction:
+    def test_rejects_invalid_sizes(self):
+        with pytest.raises(ValueError, match="max_size"):
+            ConnectionPool(_Factory(), max_size=0)
+        with pytest.raises(ValueError, match="min_size"):
+            ConnectionPool(_Factory(), min_size=3, max_size=2)
+
+    def test_min_size_opened_up_front(self):
+        factory = _Factory()
+        pool = ConnectionPool(factory, min_size=2)
+        assert len(factory.connections) == 2
+        assert pool.stats().idle == 2
+
+    def test_accepts_mssql_connection(self):
+        server = SimpleNamespace(connection=MagicMock())
+        pool = ConnectionPool(server, health_check=False)
+        with pool.connection() as conn:
+            assert conn is server.connection.return_value
+
+    def test_for_server_uses_mssql_connection(self):
+        with patch.object(MSSQLConnection, 'create_connection') as create:
+            pool = ConnectionPool.for_server('O3', max_size=3)
+        create.assert_called_once_with('O3')
+        assert pool.max_size == 3
+
+
+class TestBorrowing:
+    def test_reuses_returned_connection(self):
+        factory = _Factory()
+        pool = ConnectionPool(factory)
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+        assert first is second
+        stats = pool.stats()
+        assert (stats.misses, stats.hits) == (1, 1)
+        assert stats.hit_rate == 0.5
+
+    def test_rolls_back_on_release(self):
+        pool = ConnectionPool(_Factory())
+        with pool.connection() as conn:
+            pass
+        conn.rollback.assert_called_once()
+
+    def test_failed_rollback_discards_connection(self):
+        factory = _Factory()
+        pool = ConnectionPool(factory)
+        with pool.connection() as conn:
+            conn.rollback.side_effect = RuntimeError("link down")
+        conn.close.assert_called_once()
+        assert pool.stats().size == 0
+
+    def test_discard(self):
+        pool = ConnectionPool(_Factory())
+        conn = pool.acquire()
+        pool.release(conn, discard=True)
+        conn.close.assert_called_once()
+        assert pool.stats().size == 0
+
+    def test_release_of_foreign_connection_raises(self):
+        pool = ConnectionPool(_Factory())
+        with pytest.raises(ValueError, match="not borrowed"):
+            pool.release(MagicMock())
+
+    def test_failed_connect_frees_slot(self):
+        pool = ConnectionPool(MagicMock(side_effect=RuntimeError("login failed")), max_size=1)
+        with pytest.raises(RuntimeError):
+            pool.acquire()
+        assert pool.stats().size == 0
+
+
+class TestLimits:
+    def test_times_out_when_exhausted(self):
+        pool = ConnectionPool(_Factory(), max_size=1)
+        held = pool.acquire()
+        with pytest.raises(TimeoutError):
+            pool.acquire(timeout=0.01)
+        stats = pool.stats()
+        assert (stats.waits, stats.timeouts) == (1, 1)
+        assert stats.wait_seconds > 0
+        pool.release(held)
+
+    def test_waiter_gets_released_connection(self):
+        pool = ConnectionPool(_Factory(), max_size=1, health_check=False)
+        held = pool.acquire()
+        borrowed = []
+        waiter = threading.Thread(target=lambda: borrowed.append(pool.acquire(timeout=5)))
+        waiter.start()
+        time.sleep(0.05)
+        pool.release(held)
+        waiter.join()
+        assert borrowed == [held]
+        assert pool.stats().waits == 1
+
+    def test_never_exceeds_max_size(self):
+        factory = _Factory()
+        pool = ConnectionPool(factory, max_size=3, health_check=False)
+
+        def work():
+            for _ in range(20):
+                with pool.connection(timeout=5):
+                    time.sleep(0.001)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(factory.connections) <= 3
+        stats = pool.stats()
+        assert stats.hits + stats.misses == 160
+        assert stats.size == stats.idle == len(factory.connections)
+
+
+class TestExpiry:
+    def test_idle_timeout_closes_connection(self):
+        factory = _Factory()
+        pool = ConnectionPool(factory, idle_timeout=0.01)
+        with pool.connection() as first:
+            pass
+        time.sleep(0.03)
+        with pool.connection() as second:
+            pass
+        assert first is not second
+        first.close.assert_called_once()
+        assert pool.stats().expired == 1
+
+    def test_idle_timeout_keeps_min_size(self):
+        factory = _Factory()
+        pool = ConnectionPool(factory, min_size=1, idle_timeout=0.01)
+        time.sleep(0.03)
+        with pool.connection() as conn:
+            pass
+        assert conn is factory.connections[0]
+        assert pool.stats().expired == 0
+
+    def test_max_lifetime_closes_on_release(self):
+        pool = ConnectionPool(_Factory(), max_lifetime=0.01)
+        with pool.connection() as conn:
+            time.sleep(0.03)
+        conn.close.assert_called_once()
+        stats = pool.stats()
+        assert (stats.expired, stats.size) == (1, 0)
+
+
+class TestHealthCheck:
+    def test_unhealthy_connection_replaced(self):
+        factory = _Factory()
+        pool = ConnectionPool(factory)
+        with pool.connection() as first:
+            pass
+        first.cursor.return_value.execute.side_effect = RuntimeError("gone")
+        with pool.connection() as second:
+            pass
+        assert second is not first
+        first.close.assert_called_once()
+        stats = pool.stats()
+        assert stats.health_check_failures == 1
+        assert stats.size == 1
+
+    def test_health_check_runs_select_1(self):
+        pool = ConnectionPool(_Factory())
+        with pool.connection() as conn:
+            pass
+        with pool.connection():
+            pass
+        conn.cursor.return_value.execute.assert_called_with("SELECT 1")
+
+    def test_disabled(self):
+        pool = ConnectionPool(_Factory(), health_check=False)
+        with pool.connection() as conn:
+            pass
+        with pool.connection():
+            pass
+        conn.cursor.assert_not_called()
+
+
+class TestClose:
+    def test_close_closes_idle_and_stops_lending(self):
+        factory = _Factory()
+        with ConnectionPool(factory, min_size=2) as pool:
+            pass
+        for conn in factory.connections:
+            conn.close.assert_called_once()
+        with pytest.raises(RuntimeError, match="closed"):
+            pool.acquire()
+
+    def test_borrowed_connection_closed_on_return(self):
+        pool = ConnectionPool(_Factory())
+        conn = pool.acquire()
+        pool.close()
+        conn.close.assert_not_called()
+        pool.release(conn)
+        conn.close.assert_called_once()
+        assert pool.stats().size == 0
@@ -15,8 +15,9 @@ if 'pyodbc' not in sys.modules:
     _mock_pyodbc.Error = type('Error', (Exception,), {})
     sys.modules['pyodbc'] = _mock_pyodbc
 
-from sql.aria_integration.queried_datatable import Datatable
+from sql.aria_integration.queried_datatable import Datatable, FetchStats
 import sql.aria_integration.queried_datatable as datatable_module
+from sql.connection.pool import ConnectionPool
 
 
 class TestDatatableInit:
@@ -244,3 +245,98 @@ class TestPathResolution:
         mock_conn = MagicMock()
         dt = Datatable(mock_conn, str(query_file))
         assert dt.query_location == str(query_file)
+
+
+class TestDatatableWithConnectionPool:
+    """A Datatable given a ConnectionPool borrows a connection per query."""
+
+    def _pool(self):
+        conn = MagicMock()
+        conn.cursor.return_value.execute.return_value = iter(["r1", "r2"])
+        return conn, ConnectionPool(lambda: conn, max_size=1, health_check=False)
+
+    def test_generator_returns_connection_when_exhausted(self, tmp_path):
+        query_file = tmp_path / "test.sql"
+        query_file.write_text("SELECT 1")
+        conn, pool = self._pool()
+        dt = Datatable(pool, str(query_file))
+
+        rows = dt._get_data()
+        assert pool.stats().idle == 0
+        assert list(rows) == ["r1", "r2"]
+        assert pool.stats().idle == 1
+        conn.rollback.assert_called_once()
+
+    def test_batch_returns_connection(self, tmp_path):
+        query_file = tmp_path / "test.sql"
+        query_file.write_text("SELECT 1")
+        conn, pool = self._pool()
+        conn.cursor.return_value.execute.return_value = MagicMock()
+        conn.cursor.return_value.execute.return_value.fetchmany.return_value = ["r1"]
+        dt = Datatable(pool, str(query_file))
+
+        assert dt._get_data(num_results=1) == ["r1"]
+        assert pool.stats().idle == 1
+
+
+class TestChunkedFetch:
+    """Tests for Datatable._get_batches."""
+
+    def _datatable(self, tmp_path, batches, **kwargs):
+        query_file = tmp_path / "test.sql"
+        query_file.write_text("SELECT 1")
+        conn = MagicMock()
+        conn.cursor.return_value.fetchmany.side_effect = list(batches) + [[]]
+        return Datatable(conn, str(query_file), **kwargs), conn.cursor.return_value
+
+    def test_yields_fetchmany_batches(self, tmp_path):
+        dt, cursor = self._datatable(tmp_path, [[("a",), ("b",)], [("c",)]])
+        assert list(dt._get_batches(chunk_size=2)) == [[("a",), ("b",)], [("c",)]]
+        cursor.fetchmany.assert_called_with(2)
+        assert cursor.arraysize == 2
+
+    def test_chunk_size_defaults_to_arraysize(self, tmp_path):
+        dt, cursor = self._datatable(tmp_path, [[("a",)]], arraysize=250)
+        list(dt._get_batches())
+        cursor.fetchmany.assert_called_with(250)
+
+    def test_forwards_params(self, tmp_path):
+        dt, cursor = self._datatable(tmp_path, [])
+        list(dt._get_batches(params=("123",)))
+        cursor.execute.assert_called_once_with(dt.query, ("123",))
+
+    def test_records_fetch_stats(self, tmp_path):
+        dt, _ = self._datatable(tmp_path, [[("a",), ("b",)], [("c",)]])
+        assert dt.last_fetch_stats is None
+        list(dt._get_batches(chunk_size=2))
+
+        stats = dt.last_fetch_stats
+        assert (stats.rows, stats.batches, stats.arraysize) == (3, 2, 2)
+        assert stats.bytes > 0
+        assert stats.seconds >= 0
+
+    def test_stats_updated_while_iterating(self, tmp_path):
+        dt, _ = self._datatable(tmp_path, [[("a",)], [("b",)]])
+        batches = dt._get_batches(chunk_size=1)
+        next(batches)
+        assert dt.last_fetch_stats.rows == 1
+
+    def test_wraps_error_with_query_path(self, tmp_path):
+        dt, cursor = self._datatable(tmp_path, [])
+        cursor.execute.side_effect = sys.modules['pyodbc'].Error("boom")
+        with pytest.raises(RuntimeError, match="test.sql"):
+            list(dt._get_batches())
+
+    def test_invalid_sizes_raise(self, tmp_path):
+        query_file = tmp_path / "test.sql"
+        query_file.write_text("SELECT 1")
+        with pytest.raises(ValueError, match="arraysize must be >= 1"):
+            Datatable(MagicMock(), str(query_file), arraysize=0)
+        with pytest.raises(ValueError, match="chunk_size must be >= 1"):
+            Datatable(MagicMock(), str(query_file))._get_batches(chunk_size=0)
+
+    def test_rates(self):
+        stats = FetchStats(rows=100, bytes=4000, seconds=2.0)
+        assert stats.rows_per_second == 50
+        assert stats.bytes_per_second == 2000
+        assert FetchStats().rows_per_second == 0.0
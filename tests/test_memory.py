@@ -0,0 +1,13 @@
+"""Tests for row memory accounting in helpers.memory."""
+import sys
+
+from helpers import row_bytes
+
+
+class TestRowBytes:
+    def test_counts_row_and_values(self):
+        row = ("A1", 40, None)
+        assert row_bytes(row) == sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+
+    def test_larger_values_weigh_more(self):
+        assert row_bytes(("x" * 1000,)) > row_bytes(("x",))
@@ -0,0 +1,142 @@
+"""Tests for the on-disk O3DataModel cache in api/model_cache.py."""
+import os
+import pathlib
+import shutil
+from unittest.mock import patch
+
+import pytest
+
+import api.model_cache as model_cache
+from api.data_model import O3DataModel
+from api.model_cache import clear_model_cache, load_cached_model, model_cache_key
+from api.workflow import create_model
+
+_SCHEMA_PATH = pathlib.Path(__file__).parent.parent / 'src' / 'Resources' / 'O3_20250128_Fixed.json'
+
+
+@pytest.fixture
+def schema(tmp_path):
+    """A private copy of the real schema so tests can modify it."""
+    path = tmp_path / "schema.json"
+    shutil.copy(_SCHEMA_PATH, path)
+    return path
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return tmp_path / "cache"
+
+
+def _cache_files(cache_dir):
+    return sorted(p.name for p in cache_dir.glob("o3_model_*.pickle"))
+
+
+class TestModelCacheKey:
+    def test_key_is_stable(self, schema):
+        assert model_cache_key(str(schema), True) == model_cache_key(str(schema), True)
+
+    def test_key_depends_on_clean_flag(self, schema):
+        assert model_cache_key(str(schema), True) != model_cache_key(str(schema), False)
+
+    def test_key_depends_on_contents(self, schema):
+        before = model_cache_key(str(schema), True)
+        schema.write_text(schema.read_text() + "\n")
+        assert model_cache_key(str(schema), True) != before
+
+    def test_key_depends_on_library_version(self, schema):
+        before = model_cache_key(str(schema), True)
+        with patch.object(model_cache, "library_version", return_value="99.0.0"):
+            assert model_cache_key(str(schema), True) != before
+
+    def test_missing_file_raises(self, tmp_path):
+        with pytest.raises(FileNotFoundError, match="Path not found"):
+            model_cache_key(str(tmp_path / "missing.json"), True)
+
+
+class TestLoadCachedModel:
+    def test_first_load_writes_cache(self, schema, cache_dir):
+        model = load_cached_model(str(schema), str(cache_dir), clean=True)
+        assert isinstance(model, O3DataModel)
+        assert len(_cache_files(cache_dir)) == 1
+
+    def test_second_load_skips_parsing(self, schema, cache_dir):
+        load_cached_model(str(schema), str(cache_dir), clean=True)
+        with patch.object(O3DataModel, "_create_key_elements", side_effect=AssertionError("parsed again")):
+            model = load_cached_model(str(schema), str(cache_dir), clean=True)
+        assert isinstance(model, O3DataModel)
+
+    def test_cached_model_matches_parsed_model(self, schema, cache_dir):
+        load_cached_model(str(schema), str(cache_dir), clean=True)
+        cached = load_cached_model(str(schema), str(cache_dir), clean=True)
+        parsed = O3DataModel(str(schema), clean=True)
+
+        assert list(cached.key_elements) == list(parsed.key_elements)
+        for name, ke in parsed.key_elements.items():
+            cached_ke = cached.key_elements[name]
+            assert [a.value_name for a in cached_ke.list_attributes] == [a.value_name for a in ke.list_attributes]
+            assert [a.value_data_type for a in cached_ke.list_attributes] == \
+                [a.value_data_type for a in ke.list_attributes]
+        assert cached.value_data_types == parsed.value_data_types
+        assert list(cached.standard_value_lists) == list(parsed.standard_value_lists)
+
+    def test_back_references_preserved(self, schema, cache_dir):
+        load_cached_model(str(schema), str(cache_dir), clean=True)
+        cached = load_cached_model(str(schema), str(cache_dir), clean=True)
+        for ke in cached.key_elements.values():
+            for attr in ke.list_attributes:
+                assert attr.key_element is ke
+                for sv in attr.standard_values_list:
+                    assert sv.attribute is attr
+
+    def test_json_file_points_at_requested_path(self, schema, cache_dir, tmp_path):
+        load_cached_model(str(schema), str(cache_dir), clean=True)
+        other = tmp_path / "copy.json"
+        shutil.copy(schema, other)
+        model = load_cached_model(str(other), str(cache_dir), clean=True)
+        assert model.json_file == other
+        assert len(_cache_files(cache_dir)) == 1
+
+    def test_clean_flag_cached_separately(self, schema, cache_dir):
+        load_cached_model(str(schema), str(cache_dir), clean=True)
+        load_cached_model(str(schema), str(cache_dir), clean=False)
+        assert len(_cache_files(cache_dir)) == 2
+
+    def test_changed_schema_invalidates(self, schema, cache_dir):
+        load_cached_model(str(schema), str(cache_dir), clean=True)
+        schema.write_text(schema.read_text() + "\n")
+        load_cached_model(str(schema), str(cache_dir), clean=True)
+        assert len(_cache_files(cache_dir)) == 2
+
+    def test_corrupt_cache_is_rebuilt(self, schema, cache_dir, caplog):
+        load_cached_model(str(schema), str(cache_dir), clean=True)
+        cache_file = cache_dir / _cache_files(cache_dir)[0]
+        cache_file.write_bytes(b"not a pickle")
+
+        model = load_cached_model(str(schema), str(cache_dir), clean=True)
+        assert isinstance(model, O3DataModel)
+        assert "unreadable" in caplog.text
+
+    def test_missing_schema_raises(self, tmp_path, cache_dir):
+        with pytest.raises(FileNotFoundError):
+            load_cached_model(str(tmp_path / "missing.json"), str(cache_dir), clean=True)
+
+
+class TestClearModelCache:
+    def test_removes_cache_files(self, schema, cache_dir):
+        load_cached_model(str(schema), str(cache_dir), clean=True)
+        load_cached_model(str(schema), str(cache_dir), clean=False)
+        assert clear_model_cache(str(cache_dir)) == 2
+        assert _cache_files(cache_dir) == []
+
+    def test_missing_directory(self, tmp_path):
+        assert clear_model_cache(str(tmp_path / "nope")) == 0
+
+
+class TestCreateModelCacheDir:
+    def test_create_model_uses_cache(self, schema, cache_dir):
+        create_model(str(schema), clean=True, cache_dir=str(cache_dir))
+        assert len(_cache_files(cache_dir)) == 1
+
+    def test_create_model_without_cache_dir_writes_nothing(self, schema, cache_dir):
+        create_model(str(schema), clean=True)
+        assert not os.path.exists(cache_dir)
@@ -0,0 +1,136 @@
+"""Memory layout of the O3 base entities: slots, string interning, and a memory comparison on the real schema."""
+
+import gc
+import pathlib
+import tracemalloc
+
+import pytest
+
+from api.data_model import O3DataModel
+from base.o3_attribute import O3Attribute
+from base.o3_element import O3Element
+from base.o3_relationship import O3Relationship
+from base.o3_standard_value import O3StandardValue
+
+_JSON_PATH = pathlib.Path(__file__).parent.parent / 'src' / 'Resources' / 'O3_20250128_Fixed.json'
+
+# Fields that are interned on the slotted classes
+_INTERNED_FIELDS = frozenset({
+    'value_type', 'value_priority', 'more_than_one_value_allowed', 'value_data_type', 'standard_values_use',
+    'reference_system_for_values', 'allow_null_values', 'subject_element', 'relationship_category',
+    'predicate_element', 'cardinality',
+})
+
+
+@pytest.fixture(scope="module")
+def model():
+    return O3DataModel(str(_JSON_PATH), clean=True)
+
+
+def _entities(model):
+    """Every attribute, standard value and relationship in the model."""
+    for ke in model.key_elements.values():
+        yield from ke.relationships
+        for attr in ke.list_attributes:
+            yield attr
+            yield from attr.standard_values_list
+
+
+def _slot_names(obj):
+    return [name for cls in type(obj).__mro__ for name in cls.__dict__.get('__slots__', ())
+            if name != '__weakref__']
+
+
+class _DictBacked:
+    """
+    Synthetic stand-in for the dict-backed layout: a plain object holding the same fields in an
+    instance dict. It is not the pre-slots classes themselves, so the comparison isolates the
+    slots and interning change rather than reproducing the old classes byte for byte.
+    """
+
+
+def _copy_string(value):
+    # json.loads creates a separate string object for every occurrence of a value
+    return value.encode().decode() if isinstance(value, str) else value
+
+
+def _dict_backed_copy(obj):
+    copy = _DictBacked()
+    for name in _slot_names(obj):
+        value = getattr(obj, name)
+        setattr(copy, name, _copy_string(value) if name in _INTERNED_FIELDS else value)
+    return copy
+
+
+def _slotted_copy(obj):
+    copy = object.__new__(type(obj))
+    for name in _slot_names(obj):
+        setattr(copy, name, getattr(obj, name))
+    return copy
+
+
+def _traced_bytes(build):
+    """Bytes still allocated after build() returns, as seen by tracemalloc."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+class TestSlots:
+    @pytest.mark.parametrize("cls", [O3Element, O3Attribute, O3StandardValue, O3Relationship])
+    def test_classes_declare_slots(self, cls):
+        assert '__slots__' in cls.__dict__
+
+    def test_entities_have_no_instance_dict(self, model):
+        for entity in _entities(model):
+            assert not hasattr(entity, '__dict__')
+
+    def test_unknown_attribute_rejected(self, model):
+        attr = next(iter(model.key_elements.values())).list_attributes[0]
+        with pytest.raises(AttributeError):
+            attr.not_a_field = 1
+
+    def test_key_element_cached_properties_still_work(self, model):
+        for ke in model.key_elements.values():
+            assert ke.child_of_relationships is ke.child_of_relationships
+
+
+class TestInterning:
+    @pytest.mark.parametrize("field", ['value_priority', 'allow_null_values', 'value_data_type'])
+    def test_repeated_values_share_one_object(self, model, field):
+        by_value = {}
+        for ke in model.key_elements.values():
+            for attr in ke.list_attributes:
+                value = getattr(attr, field)
+                assert by_value.setdefault(value, value) is value
+
+    def test_relationship_categories_share_one_object(self, model):
+        categories = {}
+        for ke in model.key_elements.values():
+            for rel in ke.relationships:
+                category = rel.relationship_category
+                assert categories.setdefault(category, category) is category
+
+
+class TestMemoryBenchmark:
+    def test_slotted_layout_smaller_than_dict_backed(self, model, record_property):
+        """
+        Compares copies of every entity in the slotted layout against ``_DictBacked`` copies with
+        un-interned strings, as ``json.loads`` produced them. The saving is an estimate against that
+        stand-in, not a measurement of the previous classes.
+        """
+        entities = list(_entities(model))
+
+        before = _traced_bytes(lambda: [_dict_backed_copy(e) for e in entities])
+        after = _traced_bytes(lambda: [_slotted_copy(e) for e in entities])
+
+        record_property("dict_backed_bytes", before)
+        record_property("slotted_bytes", after)
+        assert after < before
@@ -85,3 +85,19 @@ class TestPatientGetData:
         list(gen)
 
         mock_cursor.execute.assert_called_once_with(patient.query)
+
+    def test_get_batches_uses_chunk_size(self, tmp_path, monkeypatch):
+        queries_dir = tmp_path / "queries"
+        (queries_dir / "Aura").mkdir(parents=True)
+        (queries_dir / "Aura" / "patient.sql").write_text("SELECT 1")
+        monkeypatch.setattr(datatable_module, "_QUERIES_DIR", queries_dir)
+
+        mock_conn = MagicMock()
+        mock_cursor = mock_conn.cursor.return_value
+        mock_cursor.fetchmany.side_effect = [[("row1",), ("row2",)], []]
+
+        patient = Patient(mock_conn)
+        assert list(patient.get_batches(chunk_size=2)) == [[("row1",), ("row2",)]]
+        mock_cursor.execute.assert_called_once_with(patient.query)
+        mock_cursor.fetchmany.assert_called_with(2)
+        assert patient.last_fetch_stats.rows == 2
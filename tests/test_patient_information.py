@@ -109,3 +109,124 @@ class TestPatientInformationGetDataWithNumResults:
         assert isinstance(result, list)
         mock_cursor.execute.assert_called_once_with(pi.query, ('12345',))
         mock_cursor.execute.return_value.fetchmany.assert_called_once_with(10)
+
+
+class TestPatientInformationGetBatches:
+    """Tests for PatientInformation.get_batches."""
+
+    def test_passes_mrn_and_chunk_size(self, tmp_path, monkeypatch):
+        queries_dir = tmp_path / "queries"
+        (queries_dir / "Aura").mkdir(parents=True)
+        (queries_dir / "Aura" / "patient_information.sql").write_text(
+            "SELECT * FROM t WHERE id = ?"
+        )
+        monkeypatch.setattr(datatable_module, "_QUERIES_DIR", queries_dir)
+
+        mock_conn = MagicMock()
+        mock_cursor = mock_conn.cursor.return_value
+        mock_cursor.fetchmany.side_effect = [[("row1",)], []]
+
+        pi = PatientInformation(mock_conn, arraysize=50)
+        assert list(pi.get_batches('12345')) == [[("row1",)]]
+        mock_cursor.execute.assert_called_once_with(pi.query, ('12345',))
+        mock_cursor.fetchmany.assert_called_with(50)
+
+    def test_empty_mrn_raises_value_error(self, tmp_path, monkeypatch):
+        queries_dir = tmp_path / "queries"
+        (queries_dir / "Aura").mkdir(parents=True)
+        (queries_dir / "Aura" / "patient_information.sql").write_text("SELECT 1")
+        monkeypatch.setattr(datatable_module, "_QUERIES_DIR", queries_dir)
+
+        with pytest.raises(ValueError, match="mrn must be a non-empty string"):
+            PatientInformation(MagicMock()).get_batches('')
+
+
+class TestPatientInformationGetDataForMrns:
+    """Tests for PatientInformation.get_data_for_mrns."""
+
+    @pytest.fixture
+    def queries_dir(self, tmp_path, monkeypatch):
+        queries_dir = tmp_path / "queries"
+        (queries_dir / "Aura").mkdir(parents=True)
+        (queries_dir / "Aura" / "patient_information.sql").write_text(
+            "SELECT * FROM t WHERE id = ?"
+        )
+        (queries_dir / "Aura" / "patient_information_batch.sql").write_text(
+            "SELECT m.Mrn, t.* FROM #PatientMrn m JOIN t ON t.id = m.Mrn"
+        )
+        monkeypatch.setattr(datatable_module, "_QUERIES_DIR", queries_dir)
+        return queries_dir
+
+    @staticmethod
+    def _connection(*batches):
+        """A connection whose batch query returns the given row lists in turn."""
+        results = iter(batches)
+        cursor = MagicMock()
+
+        def execute(sql, *args):
+            return iter(next(results)) if sql.startswith("SELECT") else cursor
+
+        cursor.execute.side_effect = execute
+        conn = MagicMock()
+        conn.cursor.return_value = cursor
+        return conn, cursor
+
+    def test_groups_rows_by_mrn(self, queries_dir):
+        conn, _ = self._connection([("1", "a"), ("1", "b"), ("2", "c")])
+        result = list(PatientInformation(conn).get_data_for_mrns(["1", "2"]))
+        assert result == [("1", [("1", "a"), ("1", "b")]), ("2", [("2", "c")])]
+
+    def test_sends_mrns_in_batches(self, queries_dir):
+        conn, cursor = self._connection([("1", "a")], [("3", "c")])
+        list(PatientInformation(conn).get_data_for_mrns(["1", "2", "3"], batch_size=2))
+
+        assert cursor.fast_executemany is True
+        inserts = [c.args[1] for c in cursor.executemany.call_args_list]
+        assert inserts == [[("1",), ("2",)], [("3",)]]
+        assert conn.cursor.call_count == 1
+
+    def test_mrns_without_rows_yield_empty_lists(self, queries_dir):
+        conn, _ = self._connection([("2", "b")])
+        result = dict(PatientInformation(conn).get_data_for_mrns(["1", "2"]))
+        assert result == {"1": [], "2": [("2", "b")]}
+
+    def test_duplicate_mrns_queried_once(self, queries_dir):
+        conn, cursor = self._connection([("1", "a")], [])
+        result = list(PatientInformation(conn).get_data_for_mrns(["1", "1", "1"], batch_size=1))
+        assert result == [("1", [("1", "a")])]
+        assert cursor.executemany.call_count == 1
+
+    def test_collation_equal_spellings_each_yielded(self, queries_dir):
+        conn, cursor = self._connection([("ab12", "a"), ("AB12", "a"), ("A1 ", "b")])
+        result = list(PatientInformation(conn).get_data_for_mrns(["ab12", "AB12", "A1 "]))
+
+        # The temp table has no unique key on Mrn, so collation-equal spellings do not collide
+        assert "PRIMARY KEY" not in PatientInformation._CREATE_MRN_TABLE.split("Mrn NVARCHAR")[1]
+        assert cursor.executemany.call_args.args[1] == [("ab12",), ("AB12",), ("A1 ",)]
+        assert result == [
+            ("ab12", [("ab12", "a")]),
+            ("AB12", [("AB12", "a")]),
+            ("A1 ", [("A1 ", "b")]),
+        ]
+
+    def test_temp_table_created_and_dropped(self, queries_dir):
+        conn, cursor = self._connection([])
+        list(PatientInformation(conn).get_data_for_mrns(["1"]))
+        statements = [c.args[0] for c in cursor.execute.call_args_list]
+        assert "CREATE TABLE #PatientMrn" in statements[0]
+        assert statements[-1] == PatientInformation._DROP_MRN_TABLE
+
+    def test_empty_mrn_raises_value_error(self, queries_dir):
+        conn, _ = self._connection()
+        with pytest.raises(ValueError, match="mrn must be a non-empty string"):
+            list(PatientInformation(conn).get_data_for_mrns(["1", ""]))
+
+    def test_invalid_batch_size_raises(self, queries_dir):
+        with pytest.raises(ValueError, match="batch_size must be >= 1"):
+            PatientInformation(MagicMock()).get_data_for_mrns(["1"], batch_size=0)
+
+    def test_pyodbc_error_wrapped(self, queries_dir):
+        conn, cursor = self._connection()
+        cursor.executemany.side_effect = sys.modules['pyodbc'].Error("boom")
+        with pytest.raises(RuntimeError, match="patient_information_batch.sql"):
+            list(PatientInformation(conn).get_data_for_mrns(["1"]))
@@ -0,0 +1,239 @@
+"""Tests for the Datatable result cache."""
+
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+if 'pyodbc' not in sys.modules:
+    _mock_pyodbc = MagicMock()
+    _mock_pyodbc.Error = type('Error', (Exception,), {})
+    sys.modules['pyodbc'] = _mock_pyodbc
+
+from sql.aria_integration.queried_datatable import Datatable
+from sql.aria_integration.result_cache import CacheKey, ResultCache, SQLiteResultStore
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _XorCipher:
+    """Reversible stand-in for Fernet."""
+
+    def encrypt(self, data):
+        return bytes(b ^ 0x5A for b in data)
+
+    def decrypt(self, token):
+        return bytes(b ^ 0x5A for b in token)
+
+
+ROWS = [("A1", 40), ("A2", 62)]
+
+
+def _key(params=("1",), num_results=None):
+    return CacheKey.for_query("SELECT 1", params, num_results)
+
+
+class TestCacheKey:
+    """Tests for CacheKey."""
+
+    def test_differs_by_query_params_and_limit(self):
+        base = _key()
+        assert base == _key()
+        assert base != CacheKey.for_query("SELECT 2", ("1",))
+        assert base != _key(params=("2",))
+        assert base != _key(num_results=10)
+
+
+class TestResultCache:
+    """Tests for the in-memory tier."""
+
+    def test_miss_then_hit(self):
+        cache = ResultCache()
+        assert cache.get(_key()) is None
+        cache.put(_key(), ROWS, elapsed=2.5)
+        assert cache.get(_key()) == ROWS
+
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+        assert stats.hit_rate == 0.5
+        assert stats.saved_seconds == 2.5
+        assert stats.bytes > 0
+
+    def test_entries_expire_after_ttl(self):
+        clock = _Clock()
+        cache = ResultCache(ttl=60, clock=clock)
+        cache.put(_key(), ROWS, elapsed=1.0)
+        clock.now += 61
+        assert cache.get(_key()) is None
+        assert cache.stats().expired == 1
+        assert cache.stats().entries == 0
+
+    def test_lru_eviction_by_bytes(self):
+        cache = ResultCache()
+        cache.put(_key(("1",)), ROWS, elapsed=1.0)
+        entry_bytes = cache.stats().bytes
+        cache = ResultCache(max_bytes=entry_bytes * 2)
+        cache.put(_key(("1",)), ROWS, elapsed=1.0)
+        cache.put(_key(("2",)), ROWS, elapsed=1.0)
+        cache.get(_key(("1",)))
+        cache.put(_key(("3",)), ROWS, elapsed=1.0)
+
+        assert cache.get(_key(("2",))) is None
+        assert cache.get(_key(("1",))) == ROWS
+        assert cache.stats().evictions == 1
+        assert cache.stats().bytes <= entry_bytes * 2
+
+    def test_oversized_results_not_cached(self):
+        cache = ResultCache(max_bytes=10)
+        cache.put(_key(), ROWS, elapsed=1.0)
+        assert cache.stats().entries == 0
+
+    def test_invalidate_by_params_and_query(self):
+        cache = ResultCache()
+        for params in (("1",), ("2",)):
+            cache.put(_key(params), ROWS, elapsed=1.0)
+            cache.put(_key(params, num_results=5), ROWS, elapsed=1.0)
+
+        assert cache.invalidate(_key().query_hash, _key(("1",)).params_hash) == 2
+        assert cache.get(_key(("2",))) == ROWS
+        assert cache.invalidate(_key().query_hash) == 2
+        assert cache.stats().entries == 0
+
+    def test_invalid_settings(self):
+        with pytest.raises(ValueError, match="max_bytes"):
+            ResultCache(max_bytes=0)
+        with pytest.raises(ValueError, match="ttl"):
+            ResultCache(ttl=0)
+
+
+class TestSQLiteTier:
+    """Tests for the on-disk tier."""
+
+    def test_disk_hit_after_memory_cleared(self, tmp_path):
+        store = SQLiteResultStore(str(tmp_path / "results.db"))
+        ResultCache(disk=store).put(_key(), ROWS, elapsed=3.0, contains_phi=False)
+
+        cache = ResultCache(disk=store)
+        assert cache.get(_key()) == ROWS
+        assert cache.get(_key()) == ROWS
+        stats = cache.stats()
+        assert (stats.hits, stats.disk_hits, stats.saved_seconds) == (2, 1, 6.0)
+
+    def test_disk_hit_keeps_column_names(self, tmp_path):
+        class _Row(tuple):
+            cursor_description = (("PatientId", str), ("Age", int))
+
+        store = SQLiteResultStore(str(tmp_path / "results.db"))
+        ResultCache(disk=store).put(_key(), [_Row(row) for row in ROWS], elapsed=1.0, contains_phi=False)
+
+        rows = ResultCache(disk=store).get(_key())
+        assert rows == ROWS
+        assert [(row.PatientId, row.Age) for row in rows] == ROWS
+
+    def test_phi_not_written_to_unencrypted_disk(self, tmp_path):
+        store = SQLiteResultStore(str(tmp_path / "results.db"))
+        ResultCache(disk=store).put(_key(), ROWS, elapsed=1.0, contains_phi=True)
+        assert ResultCache(disk=store).get(_key()) is None
+
+    def test_phi_written_encrypted(self, tmp_path):
+        path = tmp_path / "results.db"
+        store = SQLiteResultStore(str(path), cipher=_XorCipher())
+        ResultCache(disk=store).put(_key(), ROWS, elapsed=1.0, contains_phi=True)
+
+        assert b"A1" not in path.read_bytes()
+        assert ResultCache(disk=store).get(_key()) == ROWS
+
+    def test_disk_entries_expire(self, tmp_path):
+        clock = _Clock()
+        store = SQLiteResultStore(str(tmp_path / "results.db"))
+        ResultCache(ttl=60, disk=store, clock=clock).put(_key(), ROWS, elapsed=1.0, contains_phi=False)
+        clock.now += 61
+        assert ResultCache(disk=store, clock=clock).get(_key()) is None
+
+    def test_disk_lru_bounded_by_bytes(self, tmp_path):
+        clock = _Clock()
+        store = SQLiteResultStore(str(tmp_path / "results.db"), max_bytes=100)
+        cache = ResultCache(disk=store, clock=clock)
+        for i in range(5):
+            clock.now += 1
+            cache.put(_key((str(i),)), ROWS, elapsed=1.0, contains_phi=False)
+
+        fresh = ResultCache(disk=store, clock=clock)
+        assert fresh.get(_key(("4",))) == ROWS
+        assert fresh.get(_key(("0",))) is None
+
+    def test_invalidate_reaches_disk(self, tmp_path):
+        store = SQLiteResultStore(str(tmp_path / "results.db"))
+        cache = ResultCache(disk=store)
+        cache.put(_key(), ROWS, elapsed=1.0, contains_phi=False)
+        cache.invalidate(_key().query_hash)
+        assert ResultCache(disk=store).get(_key()) is None
+
+
+class TestDatatableResultCache:
+    """Datatable._get_data consults the cache before querying."""
+
+    def _datatable(self, tmp_path, cache):
+        query_file = tmp_path / "test.sql"
+        query_file.write_text("SELECT * FROM t WHERE id = ?")
+        conn = MagicMock()
+        cursor = conn.cursor.return_value
+        cursor.execute.side_effect = lambda *args: iter(ROWS)
+        cursor.execute.return_value.fetchmany.return_value = ROWS[:1]
+        return Datatable(conn, str(query_file), result_cache=cache), cursor
+
+    def test_generator_results_cached_once_read(self, tmp_path):
+        cache = ResultCache()
+        dt, cursor = self._datatable(tmp_path, cache)
+
+        assert list(dt._get_data(params=("1",))) == ROWS
+        assert list(dt._get_data(params=("1",))) == ROWS
+        assert cursor.execute.call_count == 1
+        assert cache.stats().hits == 1
+
+    def test_partially_read_generator_not_cached(self, tmp_path):
+        cache = ResultCache()
+        dt, cursor = self._datatable(tmp_path, cache)
+
+        next(dt._get_data(params=("1",)))
+        list(dt._get_data(params=("1",)))
+        assert cursor.execute.call_count == 2
+
+    def test_num_results_cached_separately(self, tmp_path):
+        cache = ResultCache()
+        dt, cursor = self._datatable(tmp_path, cache)
+        cursor.execute.side_effect = None
+
+        assert dt._get_data(num_results=1, params=("1",)) == ROWS[:1]
+        assert dt._get_data(num_results=1, params=("1",)) == ROWS[:1]
+        assert cursor.execute.call_count == 1
+
+    def test_invalidate_cache_forces_requery(self, tmp_path):
+        cache = ResultCache()
+        dt, cursor = self._datatable(tmp_path, cache)
+
+        list(dt._get_data(params=("1",)))
+        list(dt._get_data(params=("2",)))
+        assert dt.invalidate_cache(params=("1",)) == 1
+        list(dt._get_data(params=("1",)))
+        list(dt._get_data(params=("2",)))
+        assert cursor.execute.call_count == 3
+
+    def test_phi_flag_keeps_results_off_plain_disk(self, tmp_path):
+        store = SQLiteResultStore(str(tmp_path / "results.db"))
+        dt, _ = self._datatable(tmp_path, ResultCache(disk=store))
+        list(dt._get_data(params=("1",)))
+        assert ResultCache(disk=store).get(CacheKey.for_query(dt.query, ("1",))) is None
+
+    def test_without_cache_queries_every_time(self, tmp_path):
+        dt, cursor = self._datatable(tmp_path, None)
+        list(dt._get_data(params=("1",)))
+        list(dt._get_data(params=("1",)))
+        assert cursor.execute.call_count == 2
+        assert dt.invalidate_cache() == 0
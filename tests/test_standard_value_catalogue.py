@@ -0,0 +1,85 @@
+"""Tests for the columnar standard value catalogue in api/standard_value_catalogue.py."""
+import pathlib
+from unittest.mock import MagicMock
+
+import pytest
+
+from api.data_model import O3DataModel
+from api.standard_value_catalogue import StandardValueCatalogue
+from base.o3_standard_value import O3StandardValue
+
+_JSON_PATH = pathlib.Path(__file__).parent.parent / 'src' / 'Resources' / 'O3_20250128_Fixed.json'
+
+
+def _make_standard_value(ke_code, attr_code, item_str):
+    key_element = MagicMock()
+    key_element.string_code = ke_code
+    attribute = MagicMock()
+    attribute.string_code = attr_code
+    return O3StandardValue(key_element, attribute, item_str)
+
+
+class TestStandardValueCatalogue:
+    def setup_method(self):
+        self.values = [
+            _make_standard_value("Patient", "Patient_Gender", "Male {100}"),
+            _make_standard_value("Patient", "Patient_Gender", "Female {101}"),
+            _make_standard_value("Course", "Course_Intent", "Curative {200}"),
+        ]
+        self.catalogue = StandardValueCatalogue(self.values)
+
+    def test_columns_are_parallel(self):
+        assert len(self.catalogue) == 3
+        assert self.catalogue.key_elements == ("Patient", "Patient", "Course")
+        assert self.catalogue.attributes == ("Patient_Gender", "Patient_Gender", "Course_Intent")
+        assert self.catalogue.value_names == ("Male", "Female", "Curative")
+        assert self.catalogue.numeric_codes == ("100", "101", "200")
+
+    def test_lookup_by_numeric_code(self):
+        assert self.catalogue.by_numeric_code("101") is self.values[1]
+        assert self.catalogue.row_for_numeric_code("200") == 2
+
+    def test_lookup_by_attribute_and_value_name(self):
+        assert self.catalogue.by_value("Course_Intent", "Curative") is self.values[2]
+        assert self.catalogue.row_for_value("Patient_Gender", "Male") == 0
+
+    def test_missing_lookups_return_none(self):
+        assert self.catalogue.by_numeric_code("999") is None
+        assert self.catalogue.by_value("Course_Intent", "Male") is None
+
+    def test_first_row_wins_on_duplicates(self):
+        duplicate = _make_standard_value("Course", "Course_Intent", "Palliative {100}")
+        catalogue = StandardValueCatalogue(self.values + [duplicate])
+        assert catalogue.by_numeric_code("100") is self.values[0]
+
+    def test_empty_catalogue(self):
+        catalogue = StandardValueCatalogue([])
+        assert len(catalogue) == 0
+        assert catalogue.by_numeric_code("100") is None
+
+    def test_to_numpy(self):
+        pytest.importorskip("numpy")
+        records = self.catalogue.to_numpy()
+        assert records.shape == (3,)
+        assert list(records["numeric_code"]) == ["100", "101", "200"]
+        assert records[2]["key_element"] == "Course"
+
+
+class TestModelCatalogue:
+    @pytest.fixture(scope="class")
+    def model(self):
+        return O3DataModel(str(_JSON_PATH), clean=True)
+
+    def test_built_once(self, model):
+        assert model.standard_value_catalogue is model.standard_value_catalogue
+
+    def test_matches_standard_value_lists(self, model):
+        flattened = [v for values in model.standard_value_lists.values() for v in values]
+        assert list(model.standard_value_catalogue.values) == flattened
+
+    def test_every_value_found_by_attribute_and_name(self, model):
+        catalogue = model.standard_value_catalogue
+        for value in catalogue.values:
+            found = catalogue.by_value(value.attribute.string_code, value.value_name)
+            assert found.attribute is value.attribute
+            assert found.value_name == value.value_name
@@ -1,4 +1,5 @@
 from helpers.string_helpers import (
+    intern_string,
     leave_letters_numbers_spaces_underscores_dashes,
     leave_only_letters_numbers_or_underscore,
 )
@@ -47,3 +48,13 @@ class TestLeaveLettersNumbersSpacesUnderscoresDashes:
         assert leave_letters_numbers_spaces_underscores_dashes("some_value") == "some_value"
 
 
+class TestInternString:
+    def test_equal_strings_share_one_object(self):
+        a = "".join(["Val", "ue"])
+        b = "".join(["Va", "lue"])
+        assert a is not b
+        assert intern_string(a) is intern_string(b)
+
+    def test_non_strings_returned_unchanged(self):
+        assert intern_string(None) is None
+        assert intern_string(5) == 5
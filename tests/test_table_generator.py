@@ -6,6 +6,7 @@ from helpers.enums import SupportedSQLServers
 from sql.data_model_to_sql.table_generator import (
     CustomTable,
     KeyElementTableCreator,
+    LookupTableCreator,
     PatientIdentifierHash,
     SQLTable,
 )
@@ -227,3 +228,40 @@ class TestPatientIdentifierHash:
         table = PatientIdentifierHash(SupportedSQLServers.MSSQL, "PatientHash")
         assert "MRNHash" in table.static_columns
         assert "MRN" not in table.static_columns
+
+
+def _mock_standard_value(code):
+    value = MagicMock()
+    value.key_element.string_code = "Patient"
+    value.attribute.string_code = "Patient_Gender"
+    value.value_name = f"Value {code}"
+    value.numeric_code = str(code)
+    return value
+
+
+class TestLookupTableInsertCommands:
+    """Tests for batched INSERT generation on the lookup table."""
+
+    def setup_method(self):
+        self.table = LookupTableCreator(SupportedSQLServers.MSSQL, [_mock_standard_value(i) for i in range(5)])
+
+    def test_batches_rows(self):
+        commands = self.table.insert_commands(batch_size=2)
+        inserts = [c for c in commands if c.startswith("INSERT INTO")]
+        assert [c.count("'db_creation'") for c in inserts] == [2, 2, 1]
+
+    def test_index_first_and_newline_last(self):
+        commands = self.table.insert_commands(batch_size=2)
+        assert commands[0] == self.table.static_columns["index"]
+        assert commands[-1] == "\n"
+
+    def test_iter_matches_list(self):
+        assert list(self.table.iter_insert_commands(3)) == self.table.insert_commands(3)
+
+    def test_no_items_yields_no_inserts(self):
+        table = LookupTableCreator(SupportedSQLServers.PSQL, [])
+        assert table.insert_commands() == [table.static_columns["index"], "\n"]
+
+    def test_rejects_non_positive_batch_size(self):
+        with pytest.raises(ValueError, match="batch_size"):
+            self.table.insert_commands(batch_size=0)
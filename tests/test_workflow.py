@@ -1,22 +1,29 @@
 """Tests for the workflow orchestration functions in api/workflow.py."""
+import io
 import os
 import tempfile
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from api.standard_value_catalogue import StandardValueCatalogue
 from api.workflow import (
+    ALL_DDL_VARIANTS,
     create_individual_standard_value_tables,
+    create_key_element_table_variants,
     create_key_element_tables,
     create_model,
     create_standard_value_lookup_table,
     create_tables,
     foreign_key_constraints,
     get_table_names_from_relationships,
+    iter_ddl,
     validate_names_in_relationships,
+    write_sql_stream,
     write_sql_to_text,
 )
 from helpers.enums import SupportedSQLServers
+from sql.data_model_to_sql.table_generator import PatientIdentifierHash
 
 
 def _mock_relationship(subject="Patient", category="ChildElement-Of", predicate="Diagnosis"):
@@ -42,6 +49,9 @@ def _mock_model(key_elements=None, standard_value_lists=None):
     model = MagicMock()
     model.key_elements = key_elements or {}
     model.standard_value_lists = standard_value_lists or {}
+    model.standard_value_catalogue = StandardValueCatalogue(
+        value for values in model.standard_value_lists.values() for value in values
+    )
     return model
 
 
@@ -234,6 +244,107 @@ _SCHEMA_PATH = os.path.join(
 )
 
 
+class TestWriteSqlStream:
+    def test_writes_to_path(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "out.sql")
+            count = write_sql_stream(iter(["CREATE TABLE t1;\n", "CREATE TABLE t2;\n"]), path)
+            with open(path) as f:
+                assert f.read() == "CREATE TABLE t1;\nCREATE TABLE t2;\n"
+        assert count == 2
+
+    def test_writes_to_stream_without_closing(self):
+        stream = io.StringIO()
+        write_sql_stream(["SELECT 1;\n"], stream)
+        assert not stream.closed
+        assert stream.getvalue() == "SELECT 1;\n"
+
+    def test_rejects_read_mode(self):
+        with pytest.raises(ValueError, match="write_mode must be 'w' or 'a'"):
+            write_sql_stream(["SELECT 1;"], "/tmp/test.sql", write_mode='r')
+
+    def test_consumes_generator_lazily(self):
+        stream = io.StringIO()
+        written = []
+
+        def commands():
+            for i in range(3):
+                # Everything yielded so far is already in the stream
+                written.append(stream.getvalue())
+                yield f"-- {i}\n"
+
+        write_sql_stream(commands(), stream)
+        assert written == ["", "-- 0\n", "-- 0\n-- 1\n"]
+
+
+_FIXED_SCHEMA_PATH = os.path.join(
+    os.path.dirname(__file__), '..', 'src', 'Resources', 'O3_20250128_Fixed.json'
+)
+
+
+class TestIterDdl:
+    @pytest.fixture(scope="class")
+    def model(self):
+        return create_model(_FIXED_SCHEMA_PATH, clean=True)
+
+    @pytest.mark.parametrize("sql_type", [SupportedSQLServers.MSSQL, SupportedSQLServers.PSQL])
+    def test_matches_list_based_generation(self, model, sql_type):
+        expected = list(create_tables(model, sql_type, True).values())
+        lookup = create_standard_value_lookup_table(model, sql_type)
+        expected.append(lookup.sql_table())
+        expected.extend(lookup.insert_commands())
+        patient_hash = PatientIdentifierHash(sql_type, "PatientIdentifierHash")
+        expected.extend([patient_hash.sql_table(), patient_hash.foreign_key])
+        expected.extend(foreign_key_constraints(model, sql_type))
+
+        actual = list(iter_ddl(model, sql_type, True, include_lookup=True, include_patient_hash=True))
+        assert actual == expected
+
+    def test_optional_sections_excluded_by_default(self, model):
+        commands = list(iter_ddl(model, SupportedSQLServers.MSSQL, False))
+        assert not any("StandardValuesLookup" in c for c in commands)
+        assert not any("PatientIdentifierHash" in c for c in commands)
+
+    def test_tables_before_foreign_keys(self, model):
+        commands = list(iter_ddl(model, SupportedSQLServers.MSSQL, False))
+        first_fk = next(i for i, c in enumerate(commands) if "FOREIGN KEY" in c)
+        assert all("CREATE TABLE" not in c for c in commands[first_fk:])
+
+
+class TestCreateKeyElementTableVariants:
+    @pytest.fixture(scope="class")
+    def model(self):
+        return create_model(_FIXED_SCHEMA_PATH, clean=True)
+
+    @pytest.fixture(scope="class")
+    def expected(self, model):
+        return {
+            (sql_type, phi, name): sql
+            for sql_type, phi in ALL_DDL_VARIANTS
+            for name, sql in create_key_element_tables(model, sql_type, phi).items()
+        }
+
+    def test_matches_per_variant_generation(self, model, expected):
+        result = create_key_element_table_variants(model)
+        assert result == expected
+        assert list(result) == list(expected)
+
+    def test_process_pool_matches_in_process(self, model, expected):
+        assert create_key_element_table_variants(model, workers=2) == expected
+
+    def test_subset_of_variants(self, model, expected):
+        result = create_key_element_table_variants(model, variants=[(SupportedSQLServers.PSQL, False)])
+        assert {key[:2] for key in result} == {(SupportedSQLServers.PSQL, False)}
+        assert all(result[key] == expected[key] for key in result)
+
+    def test_no_variants(self, model):
+        assert create_key_element_table_variants(model, variants=[]) == {}
+
+    def test_rejects_zero_workers(self, model):
+        with pytest.raises(ValueError, match="workers must be >= 1"):
+            create_key_element_table_variants(model, workers=0)
+
+
 class TestCreateModel:
     @pytest.mark.skipif(
         not os.path.exists(_SCHEMA_PATH),